@@ -0,0 +1,320 @@
+"""
+Read-only HTTP JSON API over the bot's grade analytics.
+
+Serves the same precomputed caches the commands use (course aggregates, the
+section cube, instructor profiles, the grade query backend), so a web frontend
+gets identical numbers without going through Discord. It runs inside the bot's
+event loop when API_PORT is set, or standalone:
+
+    python api.py --port 8080
+
+Every historical response depends only on the grade data, so:
+  - the ETag is the dataset version and Last-Modified is the newest grade
+    file's mtime; a matching If-None-Match / If-Modified-Since gets a 304
+  - serialized bodies are cached per (path, query, version) together with a
+    pre-gzipped copy, so a repeat request is a dict lookup and no re-encoding
+
+Endpoints (all GET, ?campus=UMNTC optional):
+  /api/version
+  /api/courses/{course}                 GPA, distribution, course summary
+  /api/courses/{course}/instructors     per-instructor GPA for the course
+  /api/courses/{course}/sections        past sections, easiest/hardest, spread
+  /api/courses/{course}/live            this term's sections from Schedule Builder
+  /api/search?q=algorithms
+  /api/instructors?q=orban              best-matching instructor's profile
+"""
+import argparse
+import gzip
+import json
+import time
+from email.utils import formatdate, parsedate_to_datetime
+
+from aiohttp import web
+
+import metrics
+
+# Bodies smaller than this aren't worth gzipping
+GZIP_MIN_BYTES = 512
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _json_default(value):
+    # numpy scalars from the aggregate arrays
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def encode(payload):
+    """(json bytes, gzipped bytes or None)"""
+    body = json.dumps(payload, default=_json_default, separators=(",", ":")).encode()
+    return body, gzip.compress(body, 5) if len(body) >= GZIP_MIN_BYTES else None
+
+
+# ============================
+# PAYLOADS
+# ============================
+
+def course_payload(bot, course, campus):
+    aggregates = bot.campus_aggregates(campus)
+    row = aggregates.row(course)
+    if row < 0:
+        raise NotFound(f"{course} not found at {bot.campus_name(campus)}")
+
+    counts = aggregates.counts[row]
+    return {
+        'course': course,
+        'campus': campus,
+        'gpa': round(float(aggregates.gpa[row]), 3),
+        'students': aggregates.students[row],
+        'graded': aggregates.graded[row],
+        'sections': aggregates.sections[row],
+        'instructors': aggregates.instructors[row],
+        'terms': aggregates.terms[row],
+        'first_term': bot.terms.term_name(aggregates.first_term[row]) if aggregates.terms[row] else None,
+        'last_term': bot.terms.term_name(aggregates.last_term[row]) if aggregates.terms[row] else None,
+        'most_common_grade': aggregates.mode(row),
+        'distribution': {grade: int(count) for grade, count in zip(bot.GRADE_ORDER, counts)},
+    }
+
+
+def instructors_payload(bot, course, campus):
+    if bot.campus_aggregates(campus).row(course) < 0:
+        raise NotFound(f"{course} not found at {bot.campus_name(campus)}")
+    rows = sorted(bot.grade_queries.instructor_gpas(campus, course), key=lambda x: (-x[1], x[0]))
+    return {
+        'course': course,
+        'campus': campus,
+        'instructors': [
+            {'name': name, 'gpa': round(gpa, 3), 'graded': graded, 'sections': sections}
+            for name, gpa, graded, sections in rows
+        ],
+    }
+
+
+def sections_payload(bot, course, campus):
+    cube = bot.section_cubes.get(campus)
+    window = cube.rows(course) if cube is not None else slice(0, 0)
+    if window.stop == window.start:
+        raise NotFound(f"No sections of {course} at {bot.campus_name(campus)}")
+
+    def section(row):
+        return {
+            'term': bot.terms.term_name(cube.terms[row]),
+            'section': cube.section_names[cube.sections[row]],
+            'component': cube.component(row),
+            'instructor': cube.instructor_names[cube.instructors[row]],
+            'gpa': round(float(cube.gpa[row]), 3),
+            'graded': cube.graded[row],
+            'students': cube.students[row],
+        }
+
+    summary = cube.summary(course)
+    return {
+        'course': course,
+        'campus': campus,
+        'summary': None if summary is None else {
+            'sections': summary['sections'],
+            'gpa': round(summary['gpa'], 3),
+            'std': round(summary['std'], 3),
+            'easiest': section(summary['easiest']),
+            'hardest': section(summary['hardest']),
+            'explained': {key: round(value, 3) for key, value in summary['explained'].items()},
+        },
+        'sections': [section(row) for row in range(window.start, window.stop)],
+    }
+
+
+def search_payload(bot, keyword, campus):
+    keyword = keyword.strip().upper()
+    if not keyword:
+        raise BadRequest("q is required")
+    return {
+        'query': keyword,
+        'campus': campus,
+        'results': [{'course': course, 'description': descr}
+                    for course, descr in bot.grade_queries.search_courses(campus, keyword)],
+    }
+
+
+def instructor_payload(bot, name, campus):
+    index = bot.instructor_indexes.get(campus)
+    matches = index.resolve(name) if index is not None and name.strip() else []
+    if not matches:
+        raise NotFound(f"No instructor matching {name!r} at {bot.campus_name(campus)}")
+
+    i = matches[0]
+    rows = index.rows(i)
+    return {
+        'name': index.names[i],
+        'campus': campus,
+        'gpa': round(float(index.lifetime_gpa[i]), 3),
+        'graded': index.lifetime_graded[i],
+        'courses': sorted((
+            {'course': index.courses[r], 'gpa': round(float(index.gpa[r]), 3), 'graded': index.graded[r],
+             'terms': index.term_count[r], 'last_term': bot.terms.term_name(index.last_term[r])}
+            for r in range(rows.start, rows.stop) if index.graded[r]
+        ), key=lambda c: -c['graded']),
+        'also_matched': [index.names[j] for j in matches[1:]],
+    }
+
+
+# ============================
+# HTTP
+# ============================
+
+class GradeAPI:
+    def __init__(self, bot, cache_size=4096):
+        self.bot = bot
+        self.cache = bot.EmbedCache(cache_size, name='api')
+
+    def campus(self, request):
+        campus = request.query.get('campus', self.bot.DEFAULT_CAMPUS).upper()
+        if campus not in self.bot.CAMPUSES:
+            raise BadRequest(f"unknown campus {campus}")
+        return campus
+
+    def validators(self):
+        """(ETag, Last-Modified timestamp) for the loaded dataset"""
+        return f'W/"{self.bot.data_version}"', int(self.bot.data_modified)
+
+    @staticmethod
+    def not_modified(request, etag, modified):
+        match = request.headers.get('If-None-Match')
+        if match is not None:
+            return etag in (tag.strip() for tag in match.split(",")) or match.strip() == "*"
+        since = request.headers.get('If-Modified-Since')
+        if since:
+            try:
+                return parsedate_to_datetime(since).timestamp() >= modified
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def error(endpoint, status, message):
+        metrics.API_REQUESTS.inc(endpoint=endpoint, status=str(status))
+        return web.json_response({'error': message}, status=status)
+
+    def respond(self, request, body, gzipped, headers):
+        headers = {**headers, 'Vary': "Accept-Encoding"}
+        if gzipped is not None and "gzip" in request.headers.get('Accept-Encoding', ""):
+            headers['Content-Encoding'] = "gzip"
+            body = gzipped
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+    def historical(self, endpoint, build):
+        """Handler for a response that depends only on the grade data"""
+        async def handler(request):
+            with metrics.API_LATENCY.time(endpoint=endpoint):
+                if not self.bot.data_ready.is_set():
+                    metrics.API_REQUESTS.inc(endpoint=endpoint, status="503")
+                    return web.json_response({'error': "grade data is still loading"}, status=503,
+                                             headers={'Retry-After': "5"})
+
+                # Resolve the response before honouring validators, so a bad campus or a
+                # missing course is an error even on a conditional request
+                try:
+                    campus = self.campus(request)
+                    key = (endpoint, campus, request.match_info.get('course', ""),
+                           request.query.get('q', ""), self.bot.data_version)
+                    cached = self.cache.get(key)
+                    if cached is None:
+                        cached = encode(build(request, campus))
+                        self.cache.put(key, cached)
+                except BadRequest as e:
+                    return self.error(endpoint, 400, str(e))
+                except NotFound as e:
+                    return self.error(endpoint, 404, str(e))
+
+                etag, modified = self.validators()
+                headers = {'ETag': etag, 'Last-Modified': formatdate(modified, usegmt=True),
+                           'Cache-Control': "public, max-age=300"}
+                if self.not_modified(request, etag, modified):
+                    metrics.API_REQUESTS.inc(endpoint=endpoint, status="304")
+                    return web.Response(status=304, headers=headers)
+
+                metrics.API_REQUESTS.inc(endpoint=endpoint, status="200")
+                return self.respond(request, *cached, headers)
+        return handler
+
+    def course(self, request):
+        return self.bot.normalize_course(request.match_info['course'])
+
+    async def version(self, request):
+        return web.json_response({
+            'version': self.bot.data_version,
+            'ready': self.bot.data_ready.is_set(),
+            'modified': formatdate(self.bot.data_modified, usegmt=True) if self.bot.data_modified else None,
+            'campuses': self.bot.CAMPUSES,
+        })
+
+    async def live_sections(self, request):
+        # Live seat counts change by the minute, so no ETag; the bot's live cache absorbs repeats
+        with metrics.API_LATENCY.time(endpoint="live"):
+            try:
+                campus = self.campus(request)
+            except BadRequest as e:
+                return self.error("live", 400, str(e))
+            course = self.course(request)
+            subject, _, catalog_nbr = course.partition(" ")
+            reads = self.bot.watch_stale_reads()
+            sections = await self.bot.get_course_sections_async(subject, catalog_nbr, campus)
+            if isinstance(sections, dict):
+                sections = sections.get('sections', [])
+            if not sections:
+                return self.error("live", 404, f"{course} has no sections this term")
+
+            # as_of is set when Schedule Builder is unavailable and these are the last seats seen
+            body, gzipped = encode({'course': course, 'campus': campus, 'term': self.bot.get_current_term(),
+                                    'as_of': formatdate(min(reads), usegmt=True) if reads else None,
+                                    'sections': sections})
+            metrics.API_REQUESTS.inc(endpoint="live", status="200")
+            return self.respond(request, body, gzipped, {'Cache-Control': f"max-age={self.bot.live_cache.ttl}"})
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get("/api/version", self.version)
+        app.router.add_get("/api/courses/{course}", self.historical(
+            "course", lambda request, campus: course_payload(self.bot, self.course(request), campus)))
+        app.router.add_get("/api/courses/{course}/instructors", self.historical(
+            "instructors", lambda request, campus: instructors_payload(self.bot, self.course(request), campus)))
+        app.router.add_get("/api/courses/{course}/sections", self.historical(
+            "sections", lambda request, campus: sections_payload(self.bot, self.course(request), campus)))
+        app.router.add_get("/api/courses/{course}/live", self.live_sections)
+        app.router.add_get("/api/search", self.historical(
+            "search", lambda request, campus: search_payload(self.bot, request.query.get('q', ""), campus)))
+        app.router.add_get("/api/instructors", self.historical(
+            "instructor", lambda request, campus: instructor_payload(self.bot, request.query.get('q', ""), campus)))
+        return app
+
+
+async def start_api_server(bot, host="127.0.0.1", port=8080):
+    """Serve the API from inside the bot's event loop; returns the AppRunner"""
+    runner = web.AppRunner(GradeAPI(bot).make_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade analytics JSON API without the Discord bot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    import main as bot
+    start = time.perf_counter()
+    bot.load_data()
+    bot.data_ready.set()
+    print(f"🌐 Grade API on http://{args.host}:{args.port}/api/version ({time.perf_counter() - start:.1f}s to load)")
+    web.run_app(GradeAPI(bot).make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
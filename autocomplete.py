@@ -0,0 +1,93 @@
+"""
+Prefix completion for slash-command autocomplete.
+
+Keys are normalized (upper case, spaces and punctuation dropped) and kept in a
+sorted list, so every completion is a bisect for the [prefix, prefix + ZZZ)
+range followed by a popularity ranking of that range. Very short prefixes
+match thousands of keys, so their top results are precomputed at build time;
+longer prefixes narrow the range down to a handful of keys and are ranked on
+the fly. Both paths stay well under a millisecond.
+"""
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+
+_STRIP = re.compile(r"[^0-9A-Z]")
+
+
+def normalize_key(text):
+    """'csci 11' -> 'CSCI11', so spacing and case never matter"""
+    return _STRIP.sub("", text.upper())
+
+
+class PrefixIndex:
+    def __init__(self, limit=25, precompute_depth=2):
+        self.limit = limit
+        self.precompute_depth = precompute_depth
+        self.keys = []
+        self.values = []
+        self.scores = []
+        self.top = {}
+
+    def __len__(self):
+        return len(set(self.values))
+
+    @classmethod
+    def build(cls, entries, limit=25, precompute_depth=2):
+        """
+        entries: iterable of (display value, popularity, extra search keys).
+        The display value is always searchable; extra keys let e.g. '1133'
+        find 'CSCI 1133'.
+        """
+        index = cls(limit, precompute_depth)
+        rows = {}
+        for value, popularity, aliases in entries:
+            for key in {normalize_key(value), *(normalize_key(a) for a in aliases)}:
+                if not key:
+                    continue
+                current = rows.get((key, value))
+                if current is None or popularity > current:
+                    rows[(key, value)] = popularity
+
+        ordered = sorted(rows.items())
+        index.keys = [key for (key, _), _ in ordered]
+        index.values = [value for (_, value), _ in ordered]
+        index.scores = [score for _, score in ordered]
+
+        prefixes = {key[:depth] for key in index.keys for depth in range(precompute_depth + 1)}
+        for prefix in prefixes:
+            index.top[prefix] = index._rank(prefix, limit)
+        return index
+
+    def _range(self, prefix):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_right(self.keys, prefix + "\uffff", lo)
+        return lo, hi
+
+    def _rank(self, prefix, limit):
+        lo, hi = self._range(prefix)
+        # Exact key matches first, then by popularity, then alphabetically
+        best = heapq.nsmallest(
+            limit * 2, range(lo, hi),
+            key=lambda i: (self.keys[i] != prefix, -self.scores[i], self.values[i])
+        )
+        results = []
+        seen = set()
+        for i in best:
+            if self.values[i] not in seen:
+                seen.add(self.values[i])
+                results.append(self.values[i])
+                if len(results) == limit:
+                    break
+        return results
+
+    def complete(self, text, limit=None):
+        """Top completions for whatever the user has typed so far"""
+        limit = limit or self.limit
+        prefix = normalize_key(text)
+        cached = self.top.get(prefix)
+        if cached is not None and limit <= self.limit:
+            return cached[:limit]
+        if len(prefix) <= self.precompute_depth:
+            return []
+        return self._rank(prefix, limit)
@@ -0,0 +1,122 @@
+"""
+HTTP JSON API load benchmark
+
+Starts api.GradeAPI in-process on a free port over the full CLASS_DATA corpus
+and drives it with concurrent aiohttp clients using a mix of course, instructor,
+section, search and instructor-profile requests. Each pass is run three ways:
+  cold         first request for every URL (builds and encodes the payload)
+  warm         the same URLs again (served from the encoded-body cache)
+  conditional  warm, with If-None-Match set (304s, no body)
+and reports throughput, p50/p95/p99 latency and bytes on the wire, with and
+without gzip.
+
+Usage:
+    python bench_api.py
+    python bench_api.py -n 5000 -c 64
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from aiohttp import ClientSession, TCPConnector, web
+
+from bench_commands import percentile
+
+
+def build_urls(bot, count, campus, seed):
+    rng = random.Random(seed)
+    courses = bot.course_aggregates[campus].courses
+    instructors = bot.instructor_indexes[campus].names
+    words = ["ALGORITHMS", "WRITING", "INTRO", "BIOLOGY", "CHEM", "HISTORY", "DESIGN", "STATISTICS"]
+
+    urls = []
+    for _ in range(count):
+        kind = rng.random()
+        course = rng.choice(courses).replace(" ", "%20")
+        if kind < 0.45:
+            urls.append(f"/api/courses/{course}")
+        elif kind < 0.65:
+            urls.append(f"/api/courses/{course}/instructors")
+        elif kind < 0.8:
+            urls.append(f"/api/courses/{course}/sections")
+        elif kind < 0.9:
+            urls.append(f"/api/search?q={rng.choice(words)}")
+        else:
+            urls.append(f"/api/instructors?q={rng.choice(instructors).split()[-1]}")
+    return urls
+
+
+async def run_pass(base, urls, concurrency, gzip_ok, etag=None):
+    """(seconds, [latency], statuses, body bytes)"""
+    headers = {'Accept-Encoding': "gzip" if gzip_ok else "identity"}
+    if etag:
+        headers['If-None-Match'] = etag
+
+    queue = iter(urls)
+    latencies = []
+    statuses = {}
+    wire_bytes = 0
+
+    async with ClientSession(connector=TCPConnector(limit=concurrency), auto_decompress=False) as session:
+        async def worker():
+            nonlocal wire_bytes
+            for url in queue:
+                start = time.perf_counter()
+                async with session.get(base + url, headers=headers) as response:
+                    body = await response.read()
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+                wire_bytes += len(body)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start, latencies, statuses, wire_bytes
+
+
+async def serve(api, bot, port=0):
+    """Start a fresh GradeAPI (empty response cache); returns (runner, port)"""
+    runner = web.AppRunner(api.GradeAPI(bot).make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+async def run(args):
+    import api
+    import main as bot
+    bot.load_data()
+    bot.data_ready.set()
+
+    urls = build_urls(bot, args.requests, args.campus, args.seed)
+    etag = f'W/"{bot.data_version}"'
+
+    print(f"\n{len(urls):,} requests per pass, {len(set(urls)):,} distinct URLs, {args.concurrency} clients\n")
+    print(f"{'pass':<26}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'MB':>8}  statuses")
+    for gzip_ok in (False, True):
+        # A new server per encoding, so its cold pass really starts from an empty cache
+        runner, port = await serve(api, bot)
+        try:
+            for label, conditional in (("cold", False), ("warm", False), ("conditional", True)):
+                seconds, latencies, statuses, wire = await run_pass(
+                    f"http://127.0.0.1:{port}", urls, args.concurrency, gzip_ok, etag if conditional else None)
+                name = f"{label} ({'gzip' if gzip_ok else 'identity'})"
+                print(f"{name:<26}{len(urls) / seconds:>9,.0f}{percentile(latencies, 50) * 1e3:>9.2f}"
+                      f"{percentile(latencies, 95) * 1e3:>9.2f}{percentile(latencies, 99) * 1e3:>9.2f}"
+                      f"{wire / 1e6:>8.2f}  {dict(sorted(statuses.items()))}")
+        finally:
+            await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the grade JSON API")
+    parser.add_argument("-n", "--requests", type=int, default=3000)
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("--campus", default="UMNTC")
+    parser.add_argument("--seed", type=int, default=1133)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+Command-level benchmark suite
+
+Imports the bot's command callbacks (without connecting to Discord) and drives
+them through a FakeContext over the full CLASS_DATA corpus with a realistic
+query mix. Reports p50/p95/p99 latency and per-call allocations, and saves the
+results as JSON so runs can be compared across commits.
+
+The response cache is cleared before every call, so grade, stats, easy and the
+other cached commands are timed building their response; --warm keeps it and
+times repeat queries answered from the cache instead.
+
+Usage:
+    python bench_commands.py
+    python bench_commands.py -n 500 --commands grade stats
+    python bench_commands.py --warm
+    python bench_commands.py --compare bench_results/commands-<old sha>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from fake_discord import FakeContext
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BASE_DIR, "bench_results")
+
+COMMANDS = ["grade", "stats", "instructor", "search", "easy", "compare"]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+# ============================
+# QUERY MIX
+# ============================
+
+class QueryMix:
+    """Generates realistic arguments for each command from the grade data"""
+
+    def __init__(self, df, seed=1133, miss_rate=0.05):
+        self.rng = random.Random(seed)
+        self.miss_rate = miss_rate
+
+        # Users ask about big intro courses far more often than small seminars,
+        # so weight course picks by how many students have taken them
+        totals = df.groupby('FULL_NAME')['GRADE_HDCNT'].sum()
+        totals = totals[totals > 0]
+        self.courses = totals.index.tolist()
+        self.weights = totals.tolist()
+
+        by_dept = {}
+        for course in self.courses:
+            by_dept.setdefault(course.split()[0], []).append(course)
+        self.by_dept = {dept: courses for dept, courses in by_dept.items() if len(courses) > 1}
+
+        words = set()
+        for descr in df.drop_duplicates(subset=['FULL_NAME'])['DESCR'].dropna():
+            words.update(w.strip("():,&") for w in descr.split() if len(w) >= 5)
+        self.keywords = sorted(w for w in words if w.isalpha())
+        self.subjects = sorted(df['SUBJECT'].dropna().unique())
+
+    def course(self):
+        course = self.rng.choices(self.courses, weights=self.weights)[0]
+        roll = self.rng.random()
+        if roll < self.miss_rate:
+            # Typo'd catalog number, the most common failed lookup
+            return course[:-1]
+        if roll < 0.3:
+            # People type in lowercase with sloppy spacing
+            return f"  {course.lower()} "
+        return course
+
+    def args(self, command):
+        if command in ("grade", "stats", "instructor"):
+            return (), {'course_name': self.course()}
+        if command == "search":
+            roll = self.rng.random()
+            if roll < 0.2:
+                return (), {'keyword': self.rng.choice(self.subjects)}
+            return (), {'keyword': self.rng.choice(self.keywords).lower()}
+        if command == "easy":
+            return (self.rng.choice([5, 10, 10, 10, 15, 25]),), {}
+        if command == "compare":
+            course = self.course()
+            dept = course.split()[0].upper() if course.split() else ""
+            if dept in self.by_dept and self.rng.random() < 0.7:
+                other = self.rng.choice(self.by_dept[dept])
+            else:
+                other = self.course()
+            return (), {'args': f"{course}, {other}"}
+        raise ValueError(f"No query mix for {command}")
+
+
+# ============================
+# RUNNER
+# ============================
+
+async def run_command(command, ctx, args, kwargs):
+    ctx.reset()
+    await command.callback(ctx, *args, **kwargs)
+
+
+async def bench_command(name, command, mix, iterations, alloc_samples, warmup, cache=None):
+    """Time command over the query mix; cache, if given, is cleared before every call"""
+    ctx = FakeContext()
+    calls = [mix.args(name) for _ in range(iterations)]
+
+    def cold():
+        if cache is not None:
+            cache.clear()
+
+    for args, kwargs in calls[:warmup]:
+        cold()
+        await run_command(command, ctx, args, kwargs)
+
+    latencies = []
+    replies = {'embed': 0, 'text': 0, 'none': 0}
+    errors = 0
+    for args, kwargs in calls:
+        cold()
+        start = time.perf_counter()
+        try:
+            await run_command(command, ctx, args, kwargs)
+        except Exception as e:
+            errors += 1
+            print(f"  ⚠️ {name}{args or ''}{kwargs or ''} raised {e!r}")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if ctx.embeds:
+            replies['embed'] += 1
+        elif ctx.sent:
+            replies['text'] += 1
+        else:
+            replies['none'] += 1
+
+    # Allocation pass runs separately because tracing distorts the timings
+    peaks = []
+    allocated = []
+    tracemalloc.start()
+    for args, kwargs in calls[:alloc_samples]:
+        cold()
+        tracemalloc.clear_traces()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        try:
+            await run_command(command, ctx, args, kwargs)
+        except Exception:
+            pass
+        after, peak = tracemalloc.get_traced_memory()
+        peaks.append((peak - before) / 1024)
+        allocated.append((after - before) / 1024)
+    tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'replies': replies,
+        'latency_ms': {
+            'mean': statistics.fmean(latencies),
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': max(latencies),
+        },
+        'alloc_kib': {
+            'samples': len(peaks),
+            'peak_mean': statistics.fmean(peaks) if peaks else 0.0,
+            'peak_p95': percentile(peaks, 95),
+            'retained_mean': statistics.fmean(allocated) if allocated else 0.0,
+        },
+    }
+
+
+def print_table(results):
+    print(f"\n{'command':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'peak KiB':>11}{'errors':>8}")
+    for name, r in results['commands'].items():
+        lat = r['latency_ms']
+        print(f"{name:<12}{lat['p50']:>10.2f}{lat['p95']:>10.2f}{lat['p99']:>10.2f}{lat['max']:>10.2f}"
+              f"{r['alloc_kib']['peak_mean']:>11.1f}{r['errors']:>8}")
+
+
+def compare_results(old, new, threshold):
+    """Print per-command deltas; returns True if anything regressed past the threshold"""
+    print(f"\nComparing against {old.get('commit')} ({old.get('timestamp')})")
+    if old.get('embed_cache', 'warm') != new['embed_cache']:
+        print(f"⚠️ Comparing a {old.get('embed_cache', 'warm')}-cache run with a {new['embed_cache']}-cache run")
+    regressed = False
+    for name, r in new['commands'].items():
+        if name not in old.get('commands', {}):
+            continue
+        before = old['commands'][name]['latency_ms']
+        after = r['latency_ms']
+        deltas = []
+        for key in ('p50', 'p95', 'p99'):
+            change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            if change > threshold:
+                regressed = True
+            deltas.append(f"{key} {before[key]:.2f}→{after[key]:.2f} ({change:+.0f}%)")
+        print(f"  {name:<12}" + " | ".join(deltas))
+    if regressed:
+        print(f"❌ Regression over {threshold:.0f}% detected")
+    return regressed
+
+
+async def run(args):
+    load_start = time.perf_counter()
+    import main
+    main.load_data(rows=True)
+    main.data_ready.set()
+    load_seconds = time.perf_counter() - load_start
+
+    mix = QueryMix(main.df, seed=args.seed)
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'rows': len(main.df),
+        'courses': int(main.df['FULL_NAME'].nunique()),
+        'load_seconds': load_seconds,
+        'seed': args.seed,
+        'embed_cache': "warm" if args.warm else "cold",
+        'commands': {},
+    }
+
+    for name in args.commands:
+        command = main.bot.get_command(name)
+        if command is None:
+            print(f"⚠️ No command named {name}, skipping")
+            continue
+        print(f"⏱️ {name} x{args.iterations}...")
+        results['commands'][name] = await bench_command(
+            name, command, mix, args.iterations, args.alloc_samples, args.warmup,
+            cache=None if args.warm else main.embed_cache)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bot commands with a fake Discord context")
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--alloc-samples", type=int, default=50)
+    parser.add_argument("--commands", nargs="+", default=COMMANDS)
+    parser.add_argument("--seed", type=int, default=1133)
+    parser.add_argument("--warm", action="store_true", help="keep the response cache between calls")
+    parser.add_argument("-o", "--output", help="JSON output path (default bench_results/commands-<sha>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print_table(results)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"commands-{results['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Saved {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        if compare_results(old, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Grade-distribution layout benchmark
+
+Builds the per-course grade cache both ways from the real CLASS_DATA corpus:
+  dict    the old layout, {campus: {course: (gpa, {grade string: count})}}
+  matrix  main.CourseAggregates, a dense courses x 12 int32 matrix plus a
+          course-id map and a GPA array
+and reports the memory each one holds and the time for the lookups the bot
+commands do (one course, a department, GPA rankings, percentages and modes
+for every course).
+
+The per-course summary (sections, instructors, terms offered) isn't part of
+either grade layout, so the matrix is built without it and the summary pass
+is reported on its own line.
+
+Usage:
+    python bench_grade_layout.py
+    python bench_grade_layout.py -n 2000 --campus UMNDL
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def build_dict_layout(df, grade_points):
+    """The gpa_cache the bot used to keep"""
+    counts = df.groupby(['CAMPUS', 'FULL_NAME', 'CRSE_GRADE_OFF'], sort=False)['GRADE_HDCNT'].sum()
+    cache = {}
+    for (campus, course, grade), count in counts.items():
+        cache.setdefault(campus, {}).setdefault(course, {})[grade] = int(count)
+
+    for courses in cache.values():
+        for course, grade_dist in courses.items():
+            total_points = 0
+            total_students = 0
+            for grade, count in grade_dist.items():
+                if grade in grade_points:
+                    total_points += grade_points[grade] * count
+                    total_students += count
+            courses[course] = (total_points / total_students if total_students > 0 else 0, grade_dist)
+    return cache
+
+
+def dict_value_bytes(courses):
+    """Bytes in the per-course (gpa, {grade: count}) values, not counting the shared keys"""
+    total = 0
+    for gpa, dist in courses.values():
+        total += sys.getsizeof((gpa, dist)) + sys.getsizeof(gpa) + sys.getsizeof(dist)
+        # Small ints are shared singletons, so only bigger counts cost anything
+        total += sum(sys.getsizeof(count) for count in dist.values() if count > 256)
+    return total
+
+
+def array_bytes(agg):
+    return sum(a.nbytes for a in (agg.counts, agg.gpa, agg.students, agg.graded, agg.easiest, agg.hardest))
+
+
+def measure_build(build):
+    """(result, bytes still allocated once build() returns, seconds)"""
+    # An untraced run first, so state pandas caches on the frame isn't charged to this layout
+    build()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    # Temporaries caught in reference cycles would otherwise count as held
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before, seconds
+
+
+def time_per_call(fn, args, repeat=3):
+    """Best-of-repeat mean microseconds per call of fn over args"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            fn(arg)
+        best = min(best, (time.perf_counter() - start) / len(args))
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the dict and matrix grade-cache layouts")
+    parser.add_argument("-n", "--lookups", type=int, default=5000)
+    parser.add_argument("--campus", default="UMNTC")
+    parser.add_argument("--seed", type=int, default=1133)
+    args = parser.parse_args()
+
+    import main as bot
+    bot.load_data(rows=True)
+    df = bot.df
+
+    old, old_bytes, old_seconds = measure_build(lambda: build_dict_layout(df, bot.GRADE_POINTS))
+    new, new_bytes, new_seconds = measure_build(lambda: bot.build_course_aggregates(df, with_summaries=False))
+    # Timed without tracemalloc, which slows the nunique passes down about tenfold
+    start = time.perf_counter()
+    summaries = bot.build_course_summaries(df)
+    summary_seconds = time.perf_counter() - start
+    # What CourseAggregates keeps of it: one int32 per course per summary column
+    summary_bytes = len(summaries) * len(bot.SUMMARY_COLUMNS) * np.dtype(np.int32).itemsize
+
+    if args.campus not in new:
+        sys.exit(f"No data for campus {args.campus}")
+    old_courses = old[args.campus]
+    agg = new[args.campus]
+    order = bot.GRADE_ORDER
+
+    rng = random.Random(args.seed)
+    names = [rng.choice(agg.courses) for _ in range(args.lookups)]
+    subjects = [name.split()[0] for name in names[:max(1, args.lookups // 10)]]
+
+    # Same answers both ways before timing anything
+    for name in names[:200]:
+        gpa, dist = old_courses[name]
+        row = agg.row(name)
+        assert abs(gpa - agg.gpa[row]) < 1e-9, name
+        assert [dist.get(g, 0) for g in order] == agg.counts[row].tolist(), name
+
+    def old_lookup(name):
+        gpa, dist = old_courses[name]
+        total = sum(dist.values())
+        return gpa, [(g, dist[g] / total) for g in order if dist.get(g)]
+
+    def new_lookup(name):
+        row = agg.row(name)
+        counts = agg.counts[row]
+        return agg.gpa[row], counts * 100.0 / max(int(counts.sum()), 1)
+
+    def old_department(subject):
+        rated = [(c, g) for c, (g, _) in old_courses.items() if c.startswith(subject + " ") and g > 0]
+        return sorted(rated, key=lambda x: x[1], reverse=True)[:30]
+
+    def new_department(subject):
+        rows = agg.subject_rows(subject)
+        rows = rows[agg.gpa[rows] > 0]
+        return rows[np.argsort(-agg.gpa[rows], kind='stable')][:30]
+
+    def old_ranking(limit):
+        ranked = sorted(old_courses.items(), key=lambda x: x[1][0], reverse=True)
+        return [(c, g) for c, (g, _) in ranked if g > 0][:limit]
+
+    def new_ranking(limit):
+        return agg.easiest[:limit]
+
+    def old_all_stats(_):
+        out = {}
+        for course, (gpa, dist) in old_courses.items():
+            graded = sum(dist.get(g, 0) for g in order)
+            mode = max(order, key=lambda g: dist.get(g, 0)) if graded else None
+            out[course] = (graded, [dist.get(g, 0) / graded if graded else 0 for g in order], mode)
+        return out
+
+    def new_all_stats(_):
+        pct = agg.percentages(slice(None))
+        modes = np.argmax(agg.counts, axis=1)
+        return agg.graded, pct, modes
+
+    rows = [
+        ("one course: GPA + distribution", time_per_call(old_lookup, names), time_per_call(new_lookup, names)),
+        ("department ranked by GPA", time_per_call(old_department, subjects), time_per_call(new_department, subjects)),
+        ("easiest 25 on the campus", time_per_call(old_ranking, [25] * 20), time_per_call(new_ranking, [25] * 20)),
+        ("percentages + mode, all courses", time_per_call(old_all_stats, [None] * 3),
+         time_per_call(new_all_stats, [None] * 3)),
+    ]
+
+    old_total = sum(len(c) for c in old.values())
+    print(f"\n{old_total:,} courses across {len(old)} campuses; lookups on {args.campus} ({len(agg):,} courses)\n")
+    print(f"{'layout':<10}{'memory':>12}{'build s':>10}")
+    print(f"{'dict':<10}{old_bytes / 1024:>9,.0f} KiB{old_seconds:>10.2f}")
+    print(f"{'matrix':<10}{new_bytes / 1024:>9,.0f} KiB{new_seconds:>10.2f}")
+    print(f"memory: {old_bytes / max(new_bytes, 1):.1f}x smaller overall (course names and the id map are "
+          f"needed either way)")
+    print(f"course summaries, a separate pass: {summary_bytes / 1024:,.0f} KiB of arrays, "
+          f"built in {summary_seconds:.2f}s")
+    old_values = sum(dict_value_bytes(c) for c in old.values())
+    new_values = sum(array_bytes(a) for a in new.values())
+    print(f"grade storage alone: dict values {old_values / 1024:,.0f} KiB vs arrays {new_values / 1024:,.0f} KiB, "
+          f"{old_values / max(new_values, 1):.1f}x smaller\n")
+
+    print(f"{'operation':<34}{'dict µs':>12}{'matrix µs':>12}{'speedup':>9}")
+    for label, before, after in rows:
+        print(f"{label:<34}{before:>12,.1f}{after:>12,.1f}{before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
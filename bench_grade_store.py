@@ -0,0 +1,77 @@
+"""
+Grade query backend benchmark
+
+Runs the same per-course questions the commands ask through both
+grade_store backends, built from the real CLASS_DATA corpus:
+  pandas  boolean masks over the per-campus DataFrames (the default)
+  sqlite  parameterized queries against the indexed store file
+and reports what each one holds in memory or on disk, the SQLite build time,
+and the time per query.
+
+Usage:
+    python bench_grade_store.py
+    python bench_grade_store.py -n 500 --campus UMNDL
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bench_grade_layout import time_per_call
+from grade_store import FrameGrades, SqliteGrades
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the pandas and SQLite grade query backends")
+    parser.add_argument("-n", "--lookups", type=int, default=1000)
+    parser.add_argument("--campus", default="UMNTC")
+    parser.add_argument("--seed", type=int, default=1133)
+    args = parser.parse_args()
+
+    import main as bot
+    bot.load_data(rows=True)
+
+    frames = FrameGrades(bot.campus_frames, bot.GRADE_POINTS)
+    if args.campus not in bot.campus_frames:
+        sys.exit(f"No data for campus {args.campus}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "grades.sqlite3")
+        start = time.perf_counter()
+        store = SqliteGrades.build(bot.df, path, bot.data_version, bot.GRADE_POINTS)
+        build_seconds = time.perf_counter() - start
+        store_bytes = os.path.getsize(path)
+
+        courses = bot.course_aggregates[args.campus].courses
+        rng = random.Random(args.seed)
+        names = [rng.choice(courses) for _ in range(args.lookups)]
+        subjects = [name.split()[0] for name in names[:max(1, args.lookups // 10)]]
+        keywords = ["ALGORITHMS", "WRITING", "INTRO", "1133", "BIOLOGY"] * 4
+
+        def per_course(query):
+            return lambda name: query(args.campus, name)
+
+        rows = []
+        for label, query, inputs in [
+            ("instructor GPAs for a course", "instructor_gpas", names[:max(1, args.lookups // 5)]),
+            ("department course list", "subject_courses", subjects),
+            ("keyword search", "search_courses", keywords),
+        ]:
+            rows.append((label, time_per_call(per_course(getattr(frames, query)), inputs),
+                         time_per_call(per_course(getattr(store, query)), inputs)))
+
+    frame_bytes = sum(int(frame.memory_usage(deep=True).sum()) for frame in bot.campus_frames.values())
+    print(f"\n{len(bot.df):,} grade rows; queries on {args.campus} ({len(courses):,} courses)\n")
+    print(f"pandas frames in memory: {frame_bytes / 1e6:,.1f} MB")
+    print(f"sqlite store on disk:    {store_bytes / 1e6:,.1f} MB, built in {build_seconds:.1f}s "
+          f"(reused on restart while the CSVs are unchanged)\n")
+
+    print(f"{'query':<32}{'pandas µs':>12}{'sqlite µs':>12}{'speedup':>9}")
+    for label, before, after in rows:
+        print(f"{label:<32}{before:>12,.1f}{after:>12,.1f}{before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Concurrent load test for the whole bot
+
+Where bench_commands.py times one command at a time through its callback, this
+drives the bot the way the gateway does: messages from many fake users in many
+fake guilds are handed to bot.dispatch('message'), so every one goes through
+on_message, the throttle, the fair dispatcher, checks, hooks and the command,
+all concurrently on one event loop. Schedule Builder is the local mock
+(synthesized responses, optional injected latency and errors) running on its
+own thread, so it doesn't add to the bot's event-loop lag.
+
+Arrivals are open-loop (Poisson at --rate messages/second), so a slow bot
+builds up a backlog instead of quietly slowing the generator down. Every
+--interval seconds it prints throughput, latency percentiles, commands in
+flight, event-loop lag and RSS, then a per-command summary at the end.
+
+Usage:
+    python bench_load.py
+    python bench_load.py --users 500 --guilds 50 --rate 200 --duration 60
+    python bench_load.py --upstream-latency-ms 150 --upstream-error-rate 0.05
+"""
+import argparse
+import asyncio
+import contextvars
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+
+from discord.ext import commands
+
+from bench_commands import QueryMix, percentile
+from fake_discord import FakeChannel, FakeGuild, FakeIncomingMessage, FakeUser
+
+# Relative frequency of each command in the traffic mix
+COMMAND_WEIGHTS = {
+    'grade': 30, 'instructor': 10, 'search': 10, 'schedule': 10, 'stats': 8, 'sections': 8,
+    'full': 6, 'compare': 5, 'bestinstructor': 4, 'easy': 3, 'pick': 3, 'openandeasy': 1,
+}
+
+
+def rss_mb():
+    """Current resident set size (peak on platforms without /proc)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+class LoadContext(commands.Context):
+    """A real commands.Context whose replies go to a FakeChannel instead of Discord"""
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def defer(self, **kwargs):
+        pass
+
+    def typing(self, **kwargs):
+        return self.channel.typing()
+
+
+class LoadChannel(FakeChannel):
+    """Counts what was sent without keeping it, so the channel doesn't grow over the run"""
+
+    async def send(self, content=None, **kwargs):
+        message = await super().send(content, **kwargs)
+        self.sent.clear()
+        return message
+
+    def typing(self):
+        return _NoTyping()
+
+
+class _NoTyping:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def message_text(command, mix):
+    """'!command args' for one request from the query mix"""
+    if command in ('grade', 'stats', 'instructor', 'search', 'easy', 'compare'):
+        args, kwargs = mix.args(command)
+        return " ".join(["!" + command, *map(str, args), *map(str, kwargs.values())])
+    if command == 'pick':
+        return f"!pick {mix.rng.choice(mix.subjects)} {mix.rng.choice(['easy', 'easy', 'hard'])}"
+    if command == 'openandeasy':
+        return f"!openandeasy {mix.rng.choice([5, 10])}"
+    return f"!{command} {mix.course()}"
+
+
+def start_mock_thread(args, fixture_dir):
+    """Run the mock Schedule Builder on its own event loop thread; returns its URL"""
+    from mock_schedulebuilder import MockConfig, start_mock_server
+
+    config = MockConfig(fixture_dir=fixture_dir, synthesize=True, latency_ms=args.upstream_latency_ms,
+                        jitter_ms=args.upstream_latency_ms / 2, error_rate=args.upstream_error_rate)
+    started = threading.Event()
+    result = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        _, result['url'] = loop.run_until_complete(start_mock_server(config))
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="mock-schedulebuilder", daemon=True).start()
+    started.wait()
+    return result['url']
+
+
+# The message on_message is handling in the current task
+current_message = contextvars.ContextVar('current_message', default=None)
+
+
+class LoadRun:
+    def __init__(self):
+        self.pending = {}        # message id -> (command, sent at)
+        self.accepted = set()    # pending message ids the dispatcher queued (the rest were throttled)
+        self.latencies = {}      # command -> [seconds]
+        self.errors = {}         # command -> count
+        self.window = []         # latencies finished since the last report
+        self.loop_lag = []       # event-loop lag samples since the last report
+        self.sent = 0
+        self.done = 0
+
+    def finish(self, ctx, failed):
+        entry = self.pending.pop(ctx.message.id, None)
+        if entry is None:
+            return
+        self.accepted.discard(ctx.message.id)
+        command, sent_at = entry
+        latency = time.perf_counter() - sent_at
+        self.latencies.setdefault(command, []).append(latency)
+        self.window.append(latency)
+        self.done += 1
+        if failed:
+            self.errors[command] = self.errors.get(command, 0) + 1
+
+
+async def watch_loop_lag(run, interval=0.05):
+    """Sample how late the event loop wakes a sleeping task"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        run.loop_lag.append(loop.time() - start - interval)
+
+
+async def report(run, main, interval, started):
+    print(f"\n{'t s':>5}{'sent':>8}{'done/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'in flight':>11}"
+          f"{'queued':>8}{'lag p99':>9}{'lag max':>9}{'RSS MB':>9}")
+    last_done = 0
+    while True:
+        await asyncio.sleep(interval)
+        window, run.window = run.window, []
+        lag, run.loop_lag = run.loop_lag, []
+        print(f"{time.perf_counter() - started:>5.0f}{run.sent:>8,}{(run.done - last_done) / interval:>8,.0f}"
+              f"{percentile(window, 50) * 1e3:>9.1f}{percentile(window, 95) * 1e3:>9.1f}"
+              f"{percentile(window, 99) * 1e3:>9.1f}{len(run.accepted):>11,}{main.dispatcher.queued:>8,}"
+              f"{percentile(lag, 99) * 1e3:>9.1f}{max(lag, default=0) * 1e3:>9.1f}{rss_mb():>9,.0f}")
+        last_done = run.done
+
+
+async def generate(run, main, mix, args):
+    """Open-loop Poisson arrivals from random users until the duration is up"""
+    rng = random.Random(args.seed)
+    guilds = [FakeGuild(name=f"guild-{i}") for i in range(args.guilds)]
+    users = [(FakeUser(name=f"user-{i}"), guilds[i % len(guilds)]) for i in range(args.users)]
+    channels = {guild.id: LoadChannel() for guild in guilds}
+    commands_, weights = zip(*COMMAND_WEIGHTS.items())
+
+    deadline = time.perf_counter() + args.duration
+    next_at = time.perf_counter()
+    while next_at < deadline:
+        next_at += rng.expovariate(args.rate)
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        user, guild = rng.choice(users)
+        command = rng.choices(commands_, weights)[0]
+        message = FakeIncomingMessage(message_text(command, mix), user, channels[guild.id], guild,
+                                      main.bot._connection)
+        run.pending[message.id] = (command, time.perf_counter())
+        run.sent += 1
+        main.bot.dispatch('message', message)
+
+
+async def run_load(args):
+    import main
+    main.load_data(rows=True)
+    main.data_ready.set()
+
+    fixtures = tempfile.TemporaryDirectory()
+    main.BASE_API_URL = start_mock_thread(args, fixtures.name)
+    if args.no_throttle:
+        main.throttle.user_rate = main.throttle.user_burst = float("inf")
+        main.throttle.guild_rate = main.throttle.guild_burst = float("inf")
+
+    # What the gateway connection would have set up: a running loop and our own user
+    bot = main.bot
+    await bot._async_setup_hook()
+    bot._connection.user = FakeUser(name="umn-bot", bot=True)
+    get_context = bot.get_context
+
+    async def load_context(origin, *, cls=LoadContext):
+        current_message.set(origin.id)
+        return await get_context(origin, cls=cls)
+
+    bot.get_context = load_context
+
+    run = LoadRun()
+    submit = main.dispatcher.submit
+
+    async def tracked_submit(guild_key, job, expensive=False):
+        retry_after = await submit(guild_key, job, expensive)
+        if not retry_after:
+            run.accepted.add(current_message.get())
+        return retry_after
+
+    main.dispatcher.submit = tracked_submit
+    async def on_command_completion(ctx):
+        run.finish(ctx, False)
+
+    async def on_command_error(ctx, error):
+        run.finish(ctx, True)
+
+    bot.add_listener(on_command_completion)
+    bot.add_listener(on_command_error)
+
+    mix = QueryMix(main.campus_df(main.DEFAULT_CAMPUS), seed=args.seed)
+    throttled_before = {scope: main.metrics.THROTTLED.get(scope=scope) for scope in ("user", "guild", "queue")}
+    rss_before = rss_mb()
+
+    print(f"\n🚦 {args.users} users in {args.guilds} guilds, ~{args.rate:g} msg/s for {args.duration:g}s")
+    started = time.perf_counter()
+    background = [asyncio.create_task(watch_loop_lag(run)),
+                  asyncio.create_task(report(run, main, args.interval, started))]
+    await generate(run, main, mix, args)
+
+    # Let in-flight commands finish, up to the drain timeout
+    drain_until = time.perf_counter() + args.drain
+    while run.accepted and time.perf_counter() < drain_until:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    for task in background:
+        task.cancel()
+
+    throttled = {scope: main.metrics.THROTTLED.get(scope=scope) - before
+                 for scope, before in throttled_before.items()}
+    all_latencies = [latency for values in run.latencies.values() for latency in values]
+
+    print(f"\n{'command':<16}{'count':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for command, values in sorted(run.latencies.items(), key=lambda item: -len(item[1])):
+        print(f"{command:<16}{len(values):>8,}{percentile(values, 50) * 1e3:>9.1f}"
+              f"{percentile(values, 95) * 1e3:>9.1f}{percentile(values, 99) * 1e3:>9.1f}"
+              f"{max(values) * 1e3:>9.1f}{run.errors.get(command, 0):>8}")
+    print(f"{'all':<16}{len(all_latencies):>8,}{percentile(all_latencies, 50) * 1e3:>9.1f}"
+          f"{percentile(all_latencies, 95) * 1e3:>9.1f}{percentile(all_latencies, 99) * 1e3:>9.1f}"
+          f"{max(all_latencies, default=0) * 1e3:>9.1f}{sum(run.errors.values()):>8}")
+
+    print(f"\n{run.sent:,} messages, {run.done:,} commands finished in {elapsed:.1f}s "
+          f"({run.done / elapsed:,.0f}/s)")
+    print(f"throttled: {throttled['user']:,} user, {throttled['guild']:,} guild, {throttled['queue']:,} queue full; "
+          f"{len(run.accepted):,} still running after the drain")
+    print(f"RSS {rss_before:,.0f} → {rss_mb():,.0f} MB, "
+          f"Schedule Builder breaker {main.upstream_breaker.state}")
+    fixtures.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the bot through on_message with many fake users")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--guilds", type=int, default=30)
+    parser.add_argument("--rate", type=float, default=100.0, help="messages per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds to wait for in-flight commands")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-throttle", action="store_true", help="disable per-user/guild rate limits")
+    parser.add_argument("--seed", type=int, default=1133)
+    asyncio.run(run_load(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
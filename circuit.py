@@ -0,0 +1,69 @@
+"""
+Circuit breaker for the Schedule Builder API.
+
+closed     requests go through; failure_threshold consecutive failures or
+           timeouts trip the breaker
+open       requests fail fast without touching the network, so a command
+           doesn't wait out a 10 s timeout per lookup during an outage
+half_open  after reset_timeout seconds, one trial request goes through; success
+           closes the breaker, failure opens it for another reset_timeout
+
+Lookups run in worker threads, so every state change happens under a lock.
+"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, on_change=None):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_change = on_change
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            if self.on_change:
+                self.on_change(state)
+
+    @property
+    def is_open(self):
+        return self.state == OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self):
+        """Whether a request may go out now (claims the half-open trial if it's due)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._set_state(HALF_OPEN)
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            trial_failed = self.state == HALF_OPEN
+            self.trial_in_flight = False
+            if trial_failed or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
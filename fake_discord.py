@@ -0,0 +1,137 @@
+"""
+Minimal stand-ins for discord.py objects so commands can run without a gateway.
+
+Used by the benchmark and load-test scripts: commands are called through their
+`.callback` with a FakeContext, or fed to on_message as FakeIncomingMessages,
+and every message they would have sent is captured instead.
+"""
+import itertools
+
+_ids = itertools.count(1)
+
+# Stands in for discord.utils.MISSING: "argument not passed"
+_MISSING = object()
+
+
+class FakeUser:
+    def __init__(self, user_id=None, name="bench-user", bot=False):
+        self.id = user_id or next(_ids)
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.mention = f"<@{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeGuild:
+    def __init__(self, guild_id=None, name="bench-guild"):
+        self.id = guild_id or next(_ids)
+        self.name = name
+
+
+class FakeIncomingMessage:
+    """A user's message as the gateway would deliver it, for driving on_message"""
+
+    def __init__(self, content, author, channel, guild=None, state=None):
+        self.id = next(_ids)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self._state = state
+        self.attachments = []
+        self.mentions = []
+
+
+class FakeMessage:
+    """A message a command sent; edits are recorded on the same object"""
+
+    def __init__(self, channel, content=None, embed=None, embeds=None, file=None, files=None, view=None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = list(embeds or ([embed] if embed is not None else []))
+        self.files = list(files or ([file] if file is not None else []))
+        self.view = view
+        self.edits = 0
+
+    async def edit(self, content=_MISSING, embed=_MISSING, embeds=_MISSING, view=_MISSING, **kwargs):
+        # Like discord.py, an argument that's passed (even as None) replaces the old value
+        self.edits += 1
+        self.channel.api_calls += 1
+        if content is not _MISSING:
+            self.content = content
+        if embeds is not _MISSING:
+            self.embeds = list(embeds or [])
+        elif embed is not _MISSING:
+            self.embeds = [embed] if embed is not None else []
+        if view is not _MISSING:
+            self.view = view
+        return self
+
+    async def delete(self, **kwargs):
+        self.channel.api_calls += 1
+
+
+class FakeChannel:
+    """Collects everything sent to it"""
+
+    def __init__(self, channel_id=None):
+        self.id = channel_id or next(_ids)
+        self.sent = []
+        self.api_calls = 0
+
+    async def send(self, content=None, **kwargs):
+        self.api_calls += 1
+        message = FakeMessage(self, content=content, **{k: v for k, v in kwargs.items()
+                                                          if k in ('embed', 'embeds', 'file', 'files', 'view')})
+        self.sent.append(message)
+        return message
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeContext:
+    """Duck-typed commands.Context that captures output instead of sending it"""
+
+    def __init__(self, author=None, guild=None, channel=None, bot=None):
+        self.author = author or FakeUser()
+        self.guild = guild or FakeGuild()
+        self.channel = channel or FakeChannel()
+        self.bot = bot
+        self.interaction = None
+
+    @property
+    def sent(self):
+        return self.channel.sent
+
+    @property
+    def embeds(self):
+        return [embed for message in self.channel.sent for embed in message.embeds]
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def defer(self, **kwargs):
+        pass
+
+    def typing(self, **kwargs):
+        return _Typing()
+
+    def reset(self):
+        """Start over as if for a new command invocation"""
+        self.channel.sent.clear()
+        self.channel.api_calls = 0
+        self.__dict__.pop('response_message', None)
+        self.__dict__.pop('api_calls', None)
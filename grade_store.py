@@ -0,0 +1,217 @@
+"""
+Grade queries behind one interface, answered either from the in-memory pandas
+frames or from an indexed SQLite file.
+
+Both backends answer the same parameterized questions (per instructor GPAs for
+a course, a department's courses, keyword search), so
+commands don't care which one is active. GRADE_BACKEND picks it:
+
+  pandas  (default) boolean masks over the per-campus DataFrames
+  sqlite  aggregate tables in GRADE_DB_PATH, precomputed at build time from
+          the combined grade rows and keyed by campus and course (plus an
+          index on subject), so every question is a single indexed lookup;
+          the raw rows are only loaded into a temporary table for the build
+
+The SQLite file records the dataset hash and store format it was built from
+and is reused as long as neither has changed, so restarts skip the rebuild. It's written to
+a temporary file and swapped in, so a reader never sees a half-built one.
+"""
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+# Bump whenever the tables change, so stores from an older layout are rebuilt
+FORMAT = 2
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+
+CREATE TABLE courses (
+    campus TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    descr TEXT,
+    PRIMARY KEY (campus, full_name)
+) WITHOUT ROWID;
+CREATE INDEX courses_subject ON courses (campus, subject);
+
+CREATE TABLE course_instructors (
+    campus TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    instructor TEXT NOT NULL,
+    points REAL NOT NULL,
+    graded INTEGER NOT NULL,
+    sections INTEGER NOT NULL,
+    PRIMARY KEY (campus, full_name, instructor)
+) WITHOUT ROWID;
+"""
+
+# Only needed while the aggregates are built, so it stays out of the file
+GRADES = """
+CREATE TEMP TABLE grades (
+    campus TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    section TEXT,
+    instructor TEXT,
+    grade TEXT,
+    count INTEGER NOT NULL
+);
+"""
+
+AGGREGATES = """
+INSERT INTO courses
+SELECT g.campus, g.full_name, MIN(g.subject), d.descr
+FROM grades g LEFT JOIN descriptions d ON d.campus = g.campus AND d.full_name = g.full_name
+GROUP BY g.campus, g.full_name;
+
+INSERT INTO course_instructors
+SELECT g.campus, g.full_name, g.instructor,
+       SUM(COALESCE(p.points, 0) * g.count), SUM(CASE WHEN p.points IS NULL THEN 0 ELSE g.count END),
+       COUNT(DISTINCT g.section)
+FROM grades g LEFT JOIN grade_points p ON p.grade = g.grade
+WHERE g.instructor IS NOT NULL
+GROUP BY g.campus, g.full_name, g.instructor;
+"""
+
+
+class FrameGrades:
+    """The pandas path: masks over {campus: DataFrame}"""
+
+    def __init__(self, campus_frames, grade_points):
+        self.campus_frames = campus_frames
+        self.grade_points = grade_points
+
+    def _course(self, campus, course):
+        frame = self.campus_frames.get(campus)
+        if frame is None:
+            return None
+        rows = frame[frame['FULL_NAME'] == course]
+        return rows if not rows.empty else None
+
+    def instructor_gpas(self, campus, course):
+        """[(instructor, gpa, letter-graded students, sections)] for a course"""
+        rows = self._course(campus, course)
+        if rows is None:
+            return []
+        rows = rows.dropna(subset=['HR_NAME'])
+        points = rows['CRSE_GRADE_OFF'].map(self.grade_points)
+        graded = rows['GRADE_HDCNT'].where(points.notna(), 0)
+        by_instructor = pd.DataFrame({
+            'HR_NAME': rows['HR_NAME'], 'points': points.fillna(0) * rows['GRADE_HDCNT'], 'graded': graded,
+            'CLASS_SECTION': rows['CLASS_SECTION']
+        }).groupby('HR_NAME').agg(points=('points', 'sum'), graded=('graded', 'sum'),
+                                  sections=('CLASS_SECTION', 'nunique'))
+        return [
+            (name, row.points / row.graded if row.graded > 0 else 0, int(row.graded), int(row.sections))
+            for name, row in by_instructor.iterrows()
+        ]
+
+    def subject_courses(self, campus, subject):
+        frame = self.campus_frames.get(campus)
+        if frame is None:
+            return []
+        return sorted(frame.loc[frame['SUBJECT'] == subject, 'FULL_NAME'].unique())
+
+    def search_courses(self, campus, keyword):
+        """[(course, description)] whose name or description contains keyword, sorted by course"""
+        frame = self.campus_frames.get(campus)
+        if frame is None:
+            return []
+        courses = frame.drop_duplicates(subset=['FULL_NAME'])
+        matches = courses[
+            courses['FULL_NAME'].str.contains(keyword, na=False, case=False, regex=False) |
+            courses['DESCR'].str.contains(keyword, na=False, case=False, regex=False)
+        ].sort_values('FULL_NAME')
+        return list(zip(matches['FULL_NAME'], matches['DESCR'].fillna("")))
+
+
+class SqliteGrades:
+    """The SQLite path: parameterized queries against the indexed file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    @property
+    def db(self):
+        # One read-only connection per thread, and per process after a fork
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self.local.conn, self.local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def version(path):
+        """The dataset hash a store file was built from, or None (also for an older store format)"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError:
+            return None
+        return meta.get('version') if meta.get('format') == str(FORMAT) else None
+
+    @classmethod
+    def build(cls, frame, path, version, grade_points):
+        """Write the aggregate tables for the grade rows to path (skipped if it's already this version)"""
+        if cls.version(path) == version:
+            return cls(path)
+
+        tmp = path + ".tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF; PRAGMA temp_store = MEMORY;"
+                               + SCHEMA + GRADES)
+            columns = frame[['CAMPUS', 'SUBJECT', 'FULL_NAME', 'CLASS_SECTION', 'HR_NAME',
+                             'CRSE_GRADE_OFF', 'GRADE_HDCNT']]
+            rows = columns.astype(object).where(columns.notna(), None)
+            conn.executemany("INSERT INTO grades VALUES (?, ?, ?, ?, ?, ?, ?)", rows.itertuples(index=False))
+
+            descriptions = frame.drop_duplicates(subset=['CAMPUS', 'FULL_NAME'])
+            conn.execute("CREATE TEMP TABLE descriptions (campus TEXT, full_name TEXT, descr TEXT)")
+            conn.executemany("INSERT INTO descriptions VALUES (?, ?, ?)", zip(
+                descriptions['CAMPUS'], descriptions['FULL_NAME'],
+                descriptions['DESCR'].astype(object).where(descriptions['DESCR'].notna(), None)
+            ))
+            conn.execute("CREATE TEMP TABLE grade_points (grade TEXT PRIMARY KEY, points REAL)")
+            conn.executemany("INSERT INTO grade_points VALUES (?, ?)", grade_points.items())
+            conn.executescript(AGGREGATES)
+
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [('format', str(FORMAT)), ('version', version)])
+            conn.commit()
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+        os.replace(tmp, path)
+        return cls(path)
+
+    def instructor_gpas(self, campus, course):
+        rows = self.db.execute(
+            "SELECT instructor, points, graded, sections FROM course_instructors WHERE campus = ? AND full_name = ?",
+            (campus, course)
+        )
+        return [(name, points / graded if graded > 0 else 0, graded, sections)
+                for name, points, graded, sections in rows]
+
+    def subject_courses(self, campus, subject):
+        rows = self.db.execute(
+            "SELECT full_name FROM courses WHERE campus = ? AND subject = ? ORDER BY full_name", (campus, subject)
+        )
+        return [name for name, in rows]
+
+    def search_courses(self, campus, keyword):
+        # LIKE is case-insensitive for ASCII; escape its wildcards so the keyword matches literally
+        pattern = "%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self.db.execute(
+            "SELECT full_name, COALESCE(descr, '') FROM courses WHERE campus = ? "
+            "AND (full_name LIKE ? ESCAPE '\\' OR descr LIKE ? ESCAPE '\\') ORDER BY full_name",
+            (campus, pattern, pattern)
+        )
+        return rows.fetchall()
@@ -0,0 +1,144 @@
+"""
+Instructor profiles across every course they've taught.
+
+Instructors are keyed by INTERNET_ID where the export has one. Names are read
+from HR_NAME; the 2025 exports call that column NAME and read_grade_rows
+renames it, so every term has the same single name column. Older terms
+(all of Fall 2022 and some rows since) have a name but no ID, so a name-only row
+is folded into the ID that name is listed under elsewhere, and kept as its own
+instructor only when the name never has an ID or is shared by several people.
+
+The per-(instructor, course) grade counts are stored as one matrix sorted by
+instructor, so a profile is a contiguous slice; lifetime totals are
+precomputed. Name lookups go exact name -> Internet ID -> every query word
+matching the start of a name word -> difflib close matches.
+"""
+import difflib
+import re
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+_TITLES = re.compile(r"^(prof(essor)?|dr|mr|mrs|ms)\.?\s+")
+
+
+def name_key(name):
+    """'Prof. Jane  Doe' -> 'jane doe'"""
+    key = " ".join(str(name).lower().replace(",", " ").split())
+    return _TITLES.sub("", key)
+
+
+def instructor_keys(frame):
+    """INTERNET_ID for each row, falling back to a 'name:' key when no single ID goes with the name"""
+    names = frame['HR_NAME'].fillna("Unknown")
+    if 'INTERNET_ID' not in frame:
+        return "name:" + names
+
+    ids = frame['INTERNET_ID']
+    pairs = pd.DataFrame({'name': names, 'id': ids}).dropna().drop_duplicates()
+    per_name = pairs.groupby('name')['id'].agg(['first', 'size'])
+    only_id = per_name.loc[per_name['size'] == 1, 'first']
+    fallback = names.map(only_id).fillna("name:" + names)
+    return ids.fillna(fallback)
+
+
+class InstructorIndex:
+    def __init__(self):
+        self.keys = []
+        self.names = []
+        self.aliases = {}
+        self.alias_words = []
+        self.starts = np.zeros(1, dtype=np.int32)
+        self.courses = []
+        self.counts = np.zeros((0, 0), dtype=np.int32)
+        self.graded = np.zeros(0, dtype=np.int32)
+        self.gpa = np.zeros(0)
+        self.term_count = np.zeros(0, dtype=np.int16)
+        self.last_term = np.zeros(0, dtype=np.int16)
+        self.lifetime_counts = np.zeros((0, 0), dtype=np.int32)
+        self.lifetime_gpa = np.zeros(0)
+        self.lifetime_graded = np.zeros(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, frame, grade_order, grade_points):
+        frame = frame.assign(INSTRUCTOR=instructor_keys(frame), HR_NAME=frame['HR_NAME'].fillna("Unknown"))
+        frame = frame.assign(TERM=pd.to_numeric(frame['TERM'], errors='coerce').fillna(0).astype(np.int16))
+        points = np.array([grade_points[g] for g in grade_order])
+
+        by_course = frame.groupby(['INSTRUCTOR', 'FULL_NAME', 'CRSE_GRADE_OFF'])['GRADE_HDCNT'].sum().unstack(fill_value=0)
+        by_course = by_course.reindex(columns=grade_order, fill_value=0)
+        terms = frame.groupby(['INSTRUCTOR', 'FULL_NAME'])['TERM'].agg(['nunique', 'max']).reindex(by_course.index)
+
+        index = cls()
+        owner = by_course.index.get_level_values('INSTRUCTOR')
+        index.keys = sorted(set(owner))
+        codes = np.searchsorted(index.keys, owner)
+        index.starts = np.searchsorted(codes, np.arange(len(index.keys) + 1)).astype(np.int32)
+
+        index.courses = by_course.index.get_level_values('FULL_NAME').tolist()
+        index.counts = by_course.to_numpy(np.int32)
+        index.graded = index.counts.sum(axis=1, dtype=np.int32)
+        index.gpa = np.divide(index.counts @ points, index.graded, out=np.zeros(len(index.graded)),
+                              where=index.graded > 0)
+        index.term_count = terms['nunique'].to_numpy(np.int16)
+        index.last_term = terms['max'].to_numpy(np.int16)
+
+        index.lifetime_counts = np.add.reduceat(index.counts, index.starts[:-1], axis=0) \
+            if len(index.keys) else np.zeros((0, len(grade_order)), dtype=np.int32)
+        index.lifetime_graded = index.lifetime_counts.sum(axis=1, dtype=np.int32)
+        index.lifetime_gpa = np.divide(index.lifetime_counts @ points, index.lifetime_graded,
+                                       out=np.zeros(len(index.keys)), where=index.lifetime_graded > 0)
+
+        # Display the name from the instructor's latest term; every name they've had is searchable
+        latest = frame.loc[frame.groupby('INSTRUCTOR')['TERM'].idxmax(), ['INSTRUCTOR', 'HR_NAME']]
+        latest = dict(zip(latest['INSTRUCTOR'], latest['HR_NAME']))
+        index.names = [latest[key] for key in index.keys]
+        position = {key: i for i, key in enumerate(index.keys)}
+        for key, name in frame[['INSTRUCTOR', 'HR_NAME']].drop_duplicates().itertuples(index=False):
+            index.aliases.setdefault(name_key(name), set()).add(position[key])
+        index.alias_words = [(alias, alias.split()) for alias in index.aliases]
+        return index
+
+    def to_snapshot(self):
+        state = {key: value for key, value in self.__dict__.items() if key != 'alias_words'}
+        state['aliases'] = {alias: sorted(ids) for alias, ids in self.aliases.items()}
+        return state
+
+    @classmethod
+    def from_snapshot(cls, state):
+        index = cls()
+        index.__dict__.update(state)
+        index.aliases = {alias: set(ids) for alias, ids in state['aliases'].items()}
+        index.alias_words = [(alias, alias.split()) for alias in index.aliases]
+        return index
+
+    def rows(self, i):
+        return slice(int(self.starts[i]), int(self.starts[i + 1]))
+
+    def resolve(self, query, limit=5):
+        """Instructor ids best matching a typed name (or Internet ID), best first"""
+        key = name_key(query)
+        if not key:
+            return []
+        if key in self.aliases:
+            return sorted(self.aliases[key], key=lambda i: -self.lifetime_graded[i])
+
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return [i]
+
+        words = key.split()
+        matches = set()
+        for alias, alias_words in self.alias_words:
+            if all(any(a.startswith(w) for a in alias_words) for w in words):
+                matches |= self.aliases[alias]
+        if not matches:
+            for alias in difflib.get_close_matches(key, self.aliases, n=limit, cutoff=0.75):
+                matches |= self.aliases[alias]
+
+        # Prefer whoever has taught the most students
+        return sorted(matches, key=lambda i: -self.lifetime_graded[i])[:limit]
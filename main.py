@@ -1,10 +1,40 @@
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
 import pandas as pd
+import numpy as np
 import os
+import glob
 import requests
 from datetime import datetime
 import asyncio
+import contextvars
+import hashlib
+import json
+import math
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import api
+import metrics
+from autocomplete import PrefixIndex
+from circuit import CircuitBreaker, CLOSED
+from grade_store import FrameGrades, SqliteGrades
+from instructors import InstructorIndex
+from pagination import PageCache, ResultPages, send_paginated
+import responses
+from responses import respond
+from sampling_profiler import SamplingProfiler
+import snapshot
+from section_cube import SectionCube
+from similar import SimilarityIndex, MIN_STUDENTS
+from throttle import Throttle, FairDispatcher
+import terms
 
 # ============================
 # HARD-CODED TOKEN
@@ -17,7 +47,66 @@ TOKEN = "MTQ3MDYzOTU4ODM1ODc1NDQ5OA.GGL7cx.dbt-BzgU2cbX8o7JpyDghJ5YCBwKJjvBvwZev
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+# ============================
+# THROTTLING
+# ============================
+# Commands that call Schedule Builder; only a few of these run at once
+EXPENSIVE_COMMANDS = {'openandeasy', 'pick', 'bestinstructor', 'full', 'schedule', 'sections'}
+
+# Token buckets: rate is commands per second, burst is how many can be sent back to back
+throttle = Throttle(
+    user_rate=float(os.getenv("USER_COMMAND_RATE", "0.5")),
+    user_burst=float(os.getenv("USER_COMMAND_BURST", "5")),
+    guild_rate=float(os.getenv("GUILD_COMMAND_RATE", "5")),
+    guild_burst=float(os.getenv("GUILD_COMMAND_BURST", "20"))
+)
+
+# Prefix commands run on a fixed pool of workers, taken round-robin across servers
+dispatcher = FairDispatcher(
+    workers=int(os.getenv("MAX_CONCURRENT_COMMANDS", "16")),
+    expensive_limit=int(os.getenv("MAX_EXPENSIVE_COMMANDS", "4")),
+    on_wait=lambda seconds: metrics.DISPATCH_WAIT.observe(seconds)
+)
+metrics.REGISTRY.add_collector(lambda: metrics.DISPATCH_QUEUE_DEPTH.set(dispatcher.queued))
+
+
+class ThrottledTree(app_commands.CommandTree):
+    """Applies the same per-user/per-guild limits to slash commands"""
+
+    async def interaction_check(self, interaction):
+        # Autocomplete fires on every keystroke; only throttle actual invocations
+        if interaction.type is not discord.InteractionType.application_command:
+            return True
+
+        retry_after, scope = throttle.check(interaction.user.id, interaction.guild_id)
+        if retry_after:
+            metrics.THROTTLED.inc(scope=scope)
+            await interaction.response.send_message(
+                f"⏳ Slow down! Try again in {retry_after:.1f}s.", ephemeral=True
+            )
+            return False
+        return True
+
+
+# ============================
+# SHARDING
+# ============================
+# SHARD_COUNT=N runs N shards from this process with AutoShardedBot
+# (SHARD_COUNT=auto lets Discord pick). SHARD_IDS=0,1 limits this process to a
+# subset; shard_launcher.py uses that to spread shards across processes.
+SHARD_COUNT = os.getenv("SHARD_COUNT", "")
+SHARD_IDS = [int(i) for i in os.getenv("SHARD_IDS", "").split(",") if i.strip()] or None
+
+if SHARD_COUNT:
+    bot = commands.AutoShardedBot(
+        command_prefix="!",
+        intents=intents,
+        tree_cls=ThrottledTree,
+        shard_count=None if SHARD_COUNT == "auto" else int(SHARD_COUNT),
+        shard_ids=SHARD_IDS
+    )
+else:
+    bot = commands.Bot(command_prefix="!", intents=intents, tree_cls=ThrottledTree)
 
 # ============================
 # LOAD CSV DATA
@@ -25,460 +114,1622 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CSV_PATH = os.path.join(BASE_DIR, "CLASS_DATA", "combined_clean_data.csv")
 
-print("Loading CSV data...")
-df = pd.read_csv(CSV_PATH, dtype=str, low_memory=False)
-print(f"✅ Loaded {len(df):,} rows")
+# Filled in by load_data() in the background once the bot has connected
+df = None
+
+# Content hash of the loaded grade files; anything derived from df is keyed on it
+data_version = None
+
+# Newest grade file's mtime (Unix seconds), the API's Last-Modified
+data_modified = 0
+
+# Set once the DataFrame and every cache built from it are ready
+data_ready = asyncio.Event()
+
+# Set when the startup load has finished, whether or not it worked; data_error says why it didn't
+data_settled = asyncio.Event()
+data_error = None
+
+# Longest a command waits for the startup load before giving up, so it can't hold a worker forever
+DATA_WAIT_SECONDS = float(os.getenv("DATA_WAIT_SECONDS", "120"))
+
+# Servers use DEFAULT_CAMPUS until an admin picks another one with !campus
+DEFAULT_CAMPUS = os.getenv("DEFAULT_CAMPUS", "UMNTC")
+CAMPUSES = {
+    'UMNTC': "Twin Cities",
+    'UMNDL': "Duluth",
+    'UMNCR': "Crookston",
+    'UMNMO': "Morris",
+    'UMNRO': "Rochester"
+}
+
+# df split by CAMPUS at load time, so a query only scans its own campus's rows
+campus_frames = {}
+
+
+def load_grade_data():
+    """Load the combined grade CSV, or stitch it together from the per-term files"""
+    if os.path.exists(CSV_PATH):
+        return pd.read_csv(CSV_PATH, dtype=str, low_memory=False)
+
+    frames = []
+    for path in grade_data_files():
+        part = pd.read_csv(path, dtype=str, low_memory=False)
+        # Newer exports call the instructor column NAME
+        frames.append(part.rename(columns={'NAME': 'HR_NAME'}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def grade_data_files():
+    if os.path.exists(CSV_PATH):
+        return [CSV_PATH]
+    return sorted(glob.glob(os.path.join(BASE_DIR, "CLASS_DATA", "*_clean*_data.csv")))
+
+
+def dataset_hash():
+    """Hash of the grade files' contents, so a reload of unchanged data keeps its caches"""
+    digest = hashlib.sha1()
+    for path in grade_data_files():
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def read_grade_rows():
+    """The grade rows from the CSVs, with counts and campuses cleaned up"""
+    print("Loading CSV data...")
+    frame = load_grade_data()
+    print(f"✅ Loaded {len(frame):,} rows")
+
+    # Convert grade count to integer
+    frame['GRADE_HDCNT'] = pd.to_numeric(frame['GRADE_HDCNT'], errors='coerce').fillna(0).astype(int)
+
+    # Fall 2022 has no CAMPUS column; its raw export is all Twin Cities
+    if 'CAMPUS' not in frame:
+        frame['CAMPUS'] = None
+    if 'INSTITUTION' in frame:
+        frame['CAMPUS'] = frame['CAMPUS'].fillna(frame['INSTITUTION'])
+    frame['CAMPUS'] = frame['CAMPUS'].fillna("UMNTC")
 
-# Convert grade count to integer
-df['GRADE_HDCNT'] = pd.to_numeric(df['GRADE_HDCNT'], errors='coerce').fillna(0).astype(int)
+    print("✅ Data processed")
+    return frame
+
+
+def load_data(rows=False):
+    """
+    Load the grade data and build every cache from it (blocking, run off the event loop).
+
+    With unchanged CSVs the derived data comes back from the snapshot, and the
+    rows themselves are only parsed if something still reads them: the pandas
+    backend, a SQLite store that needs rebuilding, or rows=True (benchmarks).
+    """
+    global df, data_version, data_modified, campus_frames
+
+    version = dataset_hash()
+    modified = max((os.path.getmtime(path) for path in grade_data_files()), default=0)
+    restored = restore_snapshot(version)
+
+    if rows or not restored or GRADE_BACKEND != "sqlite" or SqliteGrades.version(GRADE_DB_PATH) != version:
+        frame = read_grade_rows()
+        df = frame
+        campus_frames = {campus: part for campus, part in frame.groupby('CAMPUS', sort=False)}
+        print("✅ Partitioned by campus: " + ", ".join(f"{c} {len(p):,}" for c, p in sorted(campus_frames.items())))
+    else:
+        frame = None
+        df = None
+        campus_frames = {}
+        print("✅ Snapshot and grade store are current, skipping the CSVs")
+
+    build_grade_queries(frame, version)
+    if not restored:
+        precompute_gpas()
+        build_section_cubes()
+        build_instructor_indexes()
+        build_popularity()
+        save_snapshot(version)
+    build_autocomplete()
+    build_similar_courses(version)
+
+    # Publish the new version last so nothing caches old output under it
+    if version != data_version:
+        data_modified = modified
+        data_version = version
+        embed_cache.clear()
+    print(f"✅ Dataset version {data_version}")
+
+
+async def warm_up():
+    """Build the grade data in a worker thread so the gateway connection isn't held up"""
+    if data_version is not None:
+        # Already loaded before the fork by shard_launcher.py
+        data_settled.set()
+        data_ready.set()
+        return
+
+    global data_error
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(load_data)
+    except Exception as e:
+        data_error = f"{type(e).__name__}: {e}"
+        print(f"❌ Loading grade data failed, grade commands are unavailable until !reload works: {data_error}")
+        traceback.print_exc()
+        return
+    finally:
+        data_settled.set()
+    data_ready.set()
+    print(f"✅ Grade data ready in {time.perf_counter() - start:.1f}s")
+
+
+def campus_df(campus):
+    """The grade rows for one campus (empty if there are none)"""
+    frame = campus_frames.get(campus)
+    return frame if frame is not None else df.iloc[0:0]
+
+
+class GradeDataUnavailable(commands.CheckFailure):
+    """The grade data failed to load, or is taking too long; the message is shown to the user"""
+
+
+def requires_data():
+    """Command check that waits (up to DATA_WAIT_SECONDS) for the background data load instead of failing"""
+    async def predicate(ctx):
+        if not data_ready.is_set():
+            if data_error is None:
+                await respond(ctx, "⏳ Warming up the grade data, your answer is on its way...")
+                try:
+                    await asyncio.wait_for(data_settled.wait(), DATA_WAIT_SECONDS)
+                except asyncio.TimeoutError:
+                    raise GradeDataUnavailable("⏳ The grade data is still loading, please try again in a minute.")
+            if not data_ready.is_set():
+                raise GradeDataUnavailable("❌ The grade data couldn't be loaded, so grade commands are "
+                                           "unavailable right now. Live schedule commands still work.")
+        return True
+    return commands.check(predicate)
+
+
+# ============================
+# GUILD SETTINGS
+# ============================
+GUILD_SETTINGS_PATH = os.getenv("GUILD_SETTINGS_PATH", os.path.join(BASE_DIR, "guild_settings.json"))
+
+
+def load_guild_settings():
+    """{guild id (str): {setting: value}} from the settings file"""
+    try:
+        with open(GUILD_SETTINGS_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Error reading guild settings: {e}")
+        return {}
+
+
+def save_guild_setting(guild_id, name, value):
+    """Update one guild's setting on disk and in memory"""
+    global guild_settings
+
+    # Re-read first: with shard_launcher.py other processes write this file too
+    settings = load_guild_settings()
+    settings.setdefault(str(guild_id), {})[name] = value
+
+    tmp_path = GUILD_SETTINGS_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, GUILD_SETTINGS_PATH)
+    guild_settings = settings
+
+
+guild_settings = load_guild_settings()
+
+
+def guild_campus(guild_id):
+    if guild_id is None:
+        return DEFAULT_CAMPUS
+    return guild_settings.get(str(guild_id), {}).get('campus', DEFAULT_CAMPUS)
+
+
+def ctx_campus(ctx):
+    """The campus a command's results should come from"""
+    return guild_campus(ctx.guild.id if ctx.guild else None)
+
+
+def campus_name(campus):
+    return CAMPUSES.get(campus, campus)
 
-print("✅ Data processed")
 
 # ============================
 # CACHE FOR PERFORMANCE
 # ============================
-gpa_cache = {}
+# {campus: CourseAggregates}, the per-course grade totals every historical command reads
+course_aggregates = {}
+
+# Letter grades in display order; W/S/N/P and friends don't count toward GPA
+GRADE_ORDER = ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'F']
+
+SUMMARY_COLUMNS = ('sections', 'instructors', 'terms', 'first_term', 'last_term')
+
+
+class CourseAggregates:
+    """
+    One campus's per-course totals as parallel arrays; row i describes courses[i].
+
+    A dense (courses x 12 letter grades) int32 matrix replaces a dict of grade
+    strings per course, so totals, percentages, modes and GPA rankings are all
+    array operations, and the whole campus fits in a few hundred KB. Courses are
+    sorted by name, which keeps a department's courses in one contiguous block.
+    """
+
+    def __init__(self, courses, counts, students, summary=None):
+        self.courses = courses
+        self.ids = {course: i for i, course in enumerate(courses)}
+        self.counts = counts          # int32 (courses x GRADE_ORDER) letter-grade counts
+        self.students = students      # int32 total headcount, including W/S/N
+        self.graded = counts.sum(axis=1, dtype=np.int32)
+        points = counts @ GRADE_POINT_VECTOR
+        self.gpa = np.divide(points, self.graded, out=np.zeros(len(courses)), where=self.graded > 0)
+        self.modes = np.argmax(counts, axis=1).astype(np.int8) if len(courses) else np.zeros(0, dtype=np.int8)
+
+        # The rest of the course summary: distinct section codes and instructors,
+        # terms offered, and the first and last term codes (e.g. 1229)
+        summary = summary if summary is not None else {}
+        zeros = np.zeros(len(courses), dtype=np.int32)
+        for column in SUMMARY_COLUMNS:
+            setattr(self, column, summary.get(column, zeros))
+
+        # Rows with a GPA, best first / worst first; ties go alphabetically
+        rated = np.flatnonzero(self.gpa > 0).astype(np.int32)
+        self.easiest = rated[np.lexsort((rated, -self.gpa[rated]))]
+        self.hardest = rated[np.lexsort((rated, self.gpa[rated]))]
+
+    def __len__(self):
+        return len(self.courses)
+
+    def to_snapshot(self):
+        return {'courses': self.courses, 'counts': self.counts, 'students': self.students,
+                'summary': {column: getattr(self, column) for column in SUMMARY_COLUMNS}}
+
+    @classmethod
+    def from_snapshot(cls, state):
+        return cls(state['courses'], state['counts'], state['students'], state['summary'])
+
+    def row(self, name):
+        return self.ids.get(name, -1)
+
+    def rows(self, names):
+        """Row ids for course names, -1 where a course isn't known"""
+        return np.array([self.ids.get(name, -1) for name in names], dtype=np.int64)
+
+    def subject_rows(self, subject):
+        """Rows of every course in a subject, e.g. 'CSCI' -> CSCI 1001 ... CSCI 8980"""
+        prefix = subject + " "
+        lo = bisect_left(self.courses, prefix)
+        hi = bisect_left(self.courses, prefix + "\uffff", lo)
+        return np.arange(lo, hi)
+
+    def percentages(self, rows):
+        counts = self.counts[rows]
+        return counts * 100.0 / np.maximum(counts.sum(axis=-1, keepdims=True), 1)
+
+    def mode(self, row):
+        """
+        Most common letter grade, or None without any. Only A-F count, so a course
+        that is mostly S/N or has many W's still shows its typical letter grade.
+        """
+        return GRADE_ORDER[self.modes[row]] if self.graded[row] else None
+
+    def offered(self, row):
+        """'9 terms (Fall 2022 - Fall 2025)'"""
+        count = int(self.terms[row])
+        if count == 0:
+            return "Unknown"
+        span = terms.term_name(self.first_term[row])
+        if self.last_term[row] != self.first_term[row]:
+            span += f" - {terms.term_name(self.last_term[row])}"
+        return f"{count} term{'s' if count != 1 else ''} ({span})"
+
+
+def campus_aggregates(campus):
+    aggregates = course_aggregates.get(campus)
+    return aggregates if aggregates is not None else EMPTY_AGGREGATES
+
+
+class EmbedCache:
+    """LRU cache of ready-to-send command responses"""
+
+    def __init__(self, maxsize=2048, name='embed'):
+        self.maxsize = maxsize
+        self.name = name
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        payload = self.entries.get(key)
+        if payload is not None:
+            self.entries.move_to_end(key)
+        metrics.record_cache(self.name, payload is not None)
+        return payload
+
+    def put(self, key, payload):
+        self.entries[key] = payload
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+embed_cache = EmbedCache(int(os.getenv("EMBED_CACHE_SIZE", "2048")))
+
+
+class LiveCache:
+    """
+    Schedule Builder responses, fresh for ttl seconds. Expired entries are kept
+    for stale_ttl more, as a fallback while Schedule Builder is slow or down.
+    """
+
+    def __init__(self, ttl=300, maxsize=4096, stale_ttl=6 * 3600):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """The value if it's still fresh, else None"""
+        entry = self.entries.get(key)
+        fresh = entry is not None and entry[0] >= time.monotonic()
+        metrics.record_cache('live', fresh)
+        return entry[2] if fresh else None
+
+    def get_stale(self, key):
+        """(value, wall-clock time it was fetched, seconds since it expired), or None past stale_ttl"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expired_for = time.monotonic() - entry[0]
+        if expired_for > self.stale_ttl:
+            self.entries.pop(key, None)
+            return None
+        return entry[2], entry[1], expired_for
+
+    def put(self, key, value, ttl=None):
+        self.entries[key] = (time.monotonic() + (ttl or self.ttl), time.time(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+
+# Keyed by (type, campus, term, subject, catalog number), so campuses and terms never share entries
+live_cache = LiveCache(ttl=int(os.getenv("LIVE_CACHE_TTL", "300")), maxsize=int(os.getenv("LIVE_CACHE_SIZE", "8192")),
+                       stale_ttl=int(os.getenv("LIVE_STALE_TTL", str(6 * 3600))))
+
+# Course descriptions and term catalogs barely change, so they're kept much
+# longer than seat counts; that's what lets the next term be pre-warmed
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", str(6 * 3600)))
+
+# Full result lists behind paginated !search/!department/!sections messages,
+# kept for PAGE_TTL seconds after the message is sent
+page_cache = PageCache(ttl=int(os.getenv("PAGE_TTL", "600")))
+
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.67,
+    'B+': 3.33, 'B': 3.0, 'B-': 2.67,
+    'C+': 2.33, 'C': 2.0, 'C-': 1.67,
+    'D+': 1.33, 'D': 1.0, 'F': 0.0
+}
+GRADE_POINT_VECTOR = np.array([GRADE_POINTS[g] for g in GRADE_ORDER])
+
+EMPTY_AGGREGATES = CourseAggregates([], np.zeros((0, len(GRADE_ORDER)), dtype=np.int32), np.zeros(0, dtype=np.int32))
+
+
+def build_course_summaries(frame):
+    """SUMMARY_COLUMNS for every (campus, course), the rest of what the course commands show"""
+    return frame.assign(TERM=pd.to_numeric(frame['TERM'], errors='coerce')).groupby(['CAMPUS', 'FULL_NAME']).agg(
+        sections=('CLASS_SECTION', 'nunique'), instructors=('HR_NAME', 'nunique'),
+        terms=('TERM', 'nunique'), first_term=('TERM', 'min'), last_term=('TERM', 'max')
+    ).fillna(0)
+
+
+def build_course_aggregates(frame, with_summaries=True):
+    """{campus: CourseAggregates} from the grade rows (summary columns left at 0 without with_summaries)"""
+    # One grouped pass, pivoted to one row per course and one column per grade
+    counts = frame.groupby(['CAMPUS', 'FULL_NAME', 'CRSE_GRADE_OFF'])['GRADE_HDCNT'].sum()
+    by_course = counts.unstack('CRSE_GRADE_OFF', fill_value=0)
+
+    # Everything else the course commands show, in a second grouped pass
+    summary = build_course_summaries(frame) if with_summaries else None
+
+    aggregates = {}
+    for campus, table in by_course.groupby(level='CAMPUS', sort=False):
+        table = table.droplevel('CAMPUS').sort_index()
+        totals = None
+        if summary is not None:
+            totals = summary.loc[campus].reindex(table.index, fill_value=0)
+            totals = {column: totals[column].to_numpy(dtype=np.int32) for column in totals.columns}
+        aggregates[campus] = CourseAggregates(
+            table.index.tolist(),
+            table.reindex(columns=GRADE_ORDER, fill_value=0).to_numpy(dtype=np.int32),
+            table.sum(axis=1).to_numpy(dtype=np.int32),
+            totals
+        )
+    return aggregates
 
 
 def precompute_gpas():
     """Precompute GPAs for all courses at startup"""
+    global course_aggregates
     print("Precomputing GPAs for all courses...")
 
-    grade_points = {
-        'A+': 4.0, 'A': 4.0, 'A-': 3.67,
-        'B+': 3.33, 'B': 3.0, 'B-': 2.67,
-        'C+': 2.33, 'C': 2.0, 'C-': 1.67,
-        'D+': 1.33, 'D': 1.0, 'F': 0.0
+    # Swap in the finished dict so readers never see a half-built one during a reload
+    course_aggregates = build_course_aggregates(df)
+
+    print(f"✅ Precomputed GPAs for {sum(map(len, course_aggregates.values()))} courses "
+          f"across {len(course_aggregates)} campuses")
+
+
+# Where per-course questions are answered: "pandas" (the frames above) or "sqlite"
+GRADE_BACKEND = os.getenv("GRADE_BACKEND", "pandas")
+GRADE_DB_PATH = os.getenv("GRADE_DB_PATH", os.path.join(BASE_DIR, "grade_store.sqlite3"))
+grade_queries = None
+
+
+def build_grade_queries(frame, version):
+    """Point grade_queries at the configured backend, (re)building the SQLite file if the data changed"""
+    global grade_queries
+    if GRADE_BACKEND == "sqlite":
+        start = time.perf_counter()
+        grade_queries = SqliteGrades.build(frame, GRADE_DB_PATH, version, GRADE_POINTS)
+        print(f"✅ Grade store {GRADE_DB_PATH} ready in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(GRADE_DB_PATH) / 1e6:.1f} MB)")
+    else:
+        grade_queries = FrameGrades(campus_frames, GRADE_POINTS)
+
+
+# {campus: SectionCube} for !sectionstats
+section_cubes = {}
+
+
+def build_section_cubes():
+    """Per-section grade totals for every campus"""
+    global section_cubes
+    section_cubes = {
+        campus: SectionCube.build(frame, GRADE_ORDER, GRADE_POINTS) for campus, frame in campus_frames.items()
     }
+    print(f"✅ Section cube: {sum(map(len, section_cubes.values())):,} sections")
 
-    for course in df['FULL_NAME'].unique():
-        course_data = df[df['FULL_NAME'] == course]
 
-        total_points = 0
-        total_students = 0
-        grade_dist = {}
+# {campus: InstructorIndex} for !prof, plus name completion for it
+instructor_indexes = {}
+instructor_name_indexes = {}
 
-        for _, row in course_data.iterrows():
-            grade = row['CRSE_GRADE_OFF']
-            count = int(row['GRADE_HDCNT'])
 
-            if grade not in grade_dist:
-                grade_dist[grade] = 0
-            grade_dist[grade] += count
+def build_instructor_indexes():
+    """Cross-course instructor profiles for every campus"""
+    set_instructor_indexes({
+        campus: InstructorIndex.build(frame, GRADE_ORDER, GRADE_POINTS) for campus, frame in campus_frames.items()
+    })
 
-            if grade in grade_points:
-                total_points += grade_points[grade] * count
-                total_students += count
 
-        avg_gpa = total_points / total_students if total_students > 0 else 0
-        gpa_cache[course] = (avg_gpa, grade_dist)
+def set_instructor_indexes(indexes):
+    """Publish instructor indexes along with their name completion"""
+    global instructor_indexes, instructor_name_indexes
+    # Last names are searchable too: 'orb' finds Daniel Orban
+    instructor_name_indexes = {
+        campus: PrefixIndex.build(
+            (name, int(graded), [name.split()[-1]]) for name, graded in zip(index.names, index.lifetime_graded)
+        )
+        for campus, index in indexes.items()
+    }
+    instructor_indexes = indexes
+    print(f"✅ Instructor index: {sum(map(len, instructor_indexes.values())):,} instructors")
 
-    print(f"✅ Precomputed GPAs for {len(gpa_cache)} courses")
 
+# {campus: SimilarityIndex} for !similar, and the dataset version it was built from
+similar_indexes = {}
+similar_version = None
+
+
+def build_similar_courses(version):
+    """Rebuild the !similar indexes, but only when the grade data actually changed"""
+    global similar_indexes, similar_version
+    if version == similar_version:
+        return
+
+    similar_indexes = {
+        campus: SimilarityIndex(aggregates.courses, aggregates.counts, aggregates.gpa)
+        for campus, aggregates in course_aggregates.items()
+    }
+    similar_version = version
+    print(f"✅ Similar-course index: {sum(map(len, similar_indexes.values())):,} courses")
+
+
+# {campus: ({course: students}, {subject: students})}, how autocomplete ranks suggestions
+course_popularity = {}
+
+
+def build_popularity():
+    global course_popularity
+    course_popularity = {
+        campus: ({name: int(total) for name, total in frame.groupby('FULL_NAME')['GRADE_HDCNT'].sum().items()},
+                 {name: int(total) for name, total in frame.groupby('SUBJECT')['GRADE_HDCNT'].sum().items()})
+        for campus, frame in campus_frames.items()
+    }
+
+
+# ============================
+# DERIVED DATA SNAPSHOT
+# ============================
+# Everything above that's built from the grade rows, saved after a full build
+# and mapped back in on the next start with the same dataset hash.
+# SNAPSHOT_PATH= (empty) turns it off.
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(BASE_DIR, "grade_snapshot.bin"))
+
+
+def save_snapshot(version):
+    if not SNAPSHOT_PATH:
+        return
+    start = time.perf_counter()
+    try:
+        size = snapshot.save(SNAPSHOT_PATH, version, {
+            'aggregates': {campus: aggregates.to_snapshot() for campus, aggregates in course_aggregates.items()},
+            'section_cubes': {campus: cube.to_snapshot() for campus, cube in section_cubes.items()},
+            'instructors': {campus: index.to_snapshot() for campus, index in instructor_indexes.items()},
+            'popularity': {
+                campus: {'courses': list(courses), 'course_totals': np.array(list(courses.values()), dtype=np.int64),
+                         'subjects': list(subjects), 'subject_totals': np.array(list(subjects.values()), dtype=np.int64)}
+                for campus, (courses, subjects) in course_popularity.items()
+            },
+        })
+        print(f"💾 Saved snapshot {SNAPSHOT_PATH} ({size / 1e6:.1f} MB, {time.perf_counter() - start:.2f}s)")
+    except (OSError, TypeError, ValueError) as e:
+        print(f"⚠️ Could not save snapshot: {e}")
+
+
+def restore_snapshot(version):
+    """Put back the derived data saved for this dataset version; False if there's no usable snapshot"""
+    global course_aggregates, section_cubes, course_popularity
+    if not SNAPSHOT_PATH:
+        return False
+    start = time.perf_counter()
+    artifacts = snapshot.load(SNAPSHOT_PATH, version)
+    if artifacts is None:
+        return False
+
+    course_aggregates = {campus: CourseAggregates.from_snapshot(state)
+                         for campus, state in artifacts['aggregates'].items()}
+    section_cubes = {campus: SectionCube.from_snapshot(state) for campus, state in artifacts['section_cubes'].items()}
+    set_instructor_indexes({campus: InstructorIndex.from_snapshot(state)
+                            for campus, state in artifacts['instructors'].items()})
+    course_popularity = {
+        campus: (dict(zip(state['courses'], state['course_totals'].tolist())),
+                 dict(zip(state['subjects'], state['subject_totals'].tolist())))
+        for campus, state in artifacts['popularity'].items()
+    }
+    print(f"✅ Restored derived data from {SNAPSHOT_PATH} in {time.perf_counter() - start:.2f}s")
+    return True
 
-# Precompute at startup
-precompute_gpas()
 
 # ============================
 # SCHEDULE BUILDER API
 # ============================
 
-BASE_API_URL = "https://schedulebuilder.umn.edu/api.php"
+# Set SCHEDULE_BUILDER_URL to point the bot at mock_schedulebuilder.py for offline testing
+BASE_API_URL = os.getenv("SCHEDULE_BUILDER_URL", "https://schedulebuilder.umn.edu/api.php")
 
 
 def get_current_term():
-    """Get current semester code - UPDATE THIS EACH SEMESTER"""
-    return "1269"  # Spring 2026
+    """Term code in session (or about to start), e.g. '1269' for Fall 2026. CURRENT_TERM overrides it."""
+    return os.getenv("CURRENT_TERM") or terms.active_term()
 
 
-def get_course_info(subject, catalog_nbr, campus="UMNTC"):
-    """Get course information from Schedule Builder"""
-    term = get_current_term()
+def get_upcoming_terms():
+    """Later terms that are already open for registration"""
+    current = get_current_term()
+    return [term for term in terms.upcoming_terms() if term > current]
 
-    try:
-        response = requests.get(BASE_API_URL, params={
-            'type': 'course',
-            'institution': campus,
-            'campus': campus,
-            'term': term,
-            'subject': subject,
-            'catalog_nbr': catalog_nbr
-        }, timeout=10)
 
-        if response.status_code == 200:
-            return response.json()
-        return None
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
 
-    except Exception as e:
-        print(f"Error fetching course: {e}")
+# UPSTREAM_FAILURE_THRESHOLD failures or timeouts in a row trip the breaker;
+# lookups then fail fast (or serve stale data) for UPSTREAM_RESET_SECONDS
+upstream_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("UPSTREAM_FAILURE_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("UPSTREAM_RESET_SECONDS", "30")),
+    on_change=lambda state: metrics.UPSTREAM_CIRCUIT_OPEN.set(0 if state == CLOSED else 1)
+)
+
+# An entry that expired less than this many seconds ago is answered from the
+# cache straight away while a background refresh fetches the new one
+STALE_WHILE_REVALIDATE = int(os.getenv("STALE_WHILE_REVALIDATE", "120"))
+
+revalidator = ThreadPoolExecutor(max_workers=4, thread_name_prefix="revalidate")
+revalidating = set()
+revalidating_lock = threading.Lock()
+
+# Fetch times of stale data served during the current command, see watch_stale_reads()
+stale_reads = contextvars.ContextVar('stale_reads', default=None)
+
+
+def watch_stale_reads():
+    """Collect the fetch times of any stale data the rest of this command is served"""
+    reads = []
+    stale_reads.set(reads)
+    return reads
+
+
+def stale_note(reads):
+    """'as of hh:mm' notice for a response built from stale data, or None"""
+    if not reads:
         return None
+    as_of = datetime.fromtimestamp(min(reads)).strftime("%H:%M")
+    return f"🕒 Class data from Schedule Builder as of {as_of}, a refresh is on the way"
 
 
-def get_course_sections(subject, catalog_nbr, campus="UMNTC"):
-    """Get section information from Schedule Builder"""
-    term = get_current_term()
+def request_schedule_builder(api_type, params, cache_key):
+    """
+    One request through the circuit breaker, caching a good answer.
+    Returns (data, ok); ok is False when Schedule Builder failed, timed out or was skipped.
+    """
+    if not upstream_breaker.allow():
+        metrics.UPSTREAM_SHORT_CIRCUITS.inc(type=api_type)
+        return None, False
+
+    status = "error"
+    start = time.perf_counter()
+    metrics.UPSTREAM_IN_FLIGHT.inc(type=api_type)
+    failed = True
 
     try:
-        response = requests.get(BASE_API_URL, params={
-            'type': 'sections',
-            'institution': campus,
-            'campus': campus,
-            'term': term,
-            'subject': subject,
-            'catalog_nbr': catalog_nbr
-        }, timeout=10)
+        response = requests.get(BASE_API_URL, params=params, timeout=UPSTREAM_TIMEOUT)
+        status = str(response.status_code)
+        # A 4xx is an answer about the request; only 5xx means Schedule Builder is in trouble
+        failed = response.status_code >= 500
 
         if response.status_code == 200:
-            return response.json()
-        return None
+            data = response.json()
+            if data:
+                live_cache.put(cache_key, data, CATALOG_CACHE_TTL if api_type in ('course', 'courses') else None)
+            return data, True
+        return None, not failed
+
+    except requests.Timeout as e:
+        status = "timeout"
+        metrics.UPSTREAM_TIMEOUTS.inc(type=api_type)
+        print(f"Error fetching {api_type}: {e}")
+        return None, False
 
     except Exception as e:
-        print(f"Error fetching sections: {e}")
-        return None
+        print(f"Error fetching {api_type}: {e}")
+        return None, False
+
+    finally:
+        if failed:
+            upstream_breaker.record_failure()
+        else:
+            upstream_breaker.record_success()
+        metrics.UPSTREAM_IN_FLIGHT.dec(type=api_type)
+        metrics.UPSTREAM_LATENCY.observe(time.perf_counter() - start, type=api_type)
+        metrics.UPSTREAM_RESPONSES.inc(type=api_type, status=status)
+
+
+def revalidate(api_type, params, cache_key):
+    """Refresh a cache entry in the background, once per key at a time"""
+    with revalidating_lock:
+        if cache_key in revalidating:
+            return
+        revalidating.add(cache_key)
+
+    def run():
+        try:
+            request_schedule_builder(api_type, params, cache_key)
+        finally:
+            with revalidating_lock:
+                revalidating.discard(cache_key)
+
+    revalidator.submit(run)
+
+
+def serve_stale(api_type, value, fetched_at, reason):
+    metrics.UPSTREAM_STALE_SERVED.inc(type=api_type, reason=reason)
+    reads = stale_reads.get()
+    if reads is not None:
+        reads.append(fetched_at)
+    return value
+
+
+def fetch_schedule_builder(api_type, subject=None, catalog_nbr=None, campus=DEFAULT_CAMPUS, term=None):
+    """Query one Schedule Builder endpoint through the cache and circuit breaker"""
+    term = term or get_current_term()
+
+    cache_key = (api_type, campus, term, subject, catalog_nbr)
+    cached = live_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    params = {
+        'type': api_type,
+        'institution': campus,
+        'campus': campus,
+        'term': term
+    }
+    if subject is not None:
+        params['subject'] = subject
+    if catalog_nbr is not None:
+        params['catalog_nbr'] = catalog_nbr
+
+    stale = live_cache.get_stale(cache_key)
+    if stale is not None:
+        value, fetched_at, expired_for = stale
+        # Only just expired, or Schedule Builder is known to be down: answer now, refresh behind the scenes
+        if expired_for <= STALE_WHILE_REVALIDATE or upstream_breaker.is_open:
+            revalidate(api_type, params, cache_key)
+            return serve_stale(api_type, value, fetched_at, "revalidating" if not upstream_breaker.is_open
+                               else "unavailable")
+
+    data, ok = request_schedule_builder(api_type, params, cache_key)
+    if not ok and stale is not None:
+        return serve_stale(api_type, stale[0], stale[1], "unavailable")
+    return data
+
+
+def get_course_info(subject, catalog_nbr, campus=DEFAULT_CAMPUS, term=None):
+    """Get course information from Schedule Builder"""
+    return fetch_schedule_builder('course', subject, catalog_nbr, campus, term)
+
+
+def get_course_sections(subject, catalog_nbr, campus=DEFAULT_CAMPUS, term=None):
+    """Get section information from Schedule Builder"""
+    return fetch_schedule_builder('sections', subject, catalog_nbr, campus, term)
+
+
+def get_term_catalog(campus=DEFAULT_CAMPUS, term=None):
+    """Get every course offered in a term (default: the current one) from Schedule Builder"""
+    catalog = fetch_schedule_builder('courses', campus=campus, term=term)
+    if isinstance(catalog, dict):
+        catalog = catalog.get('courses', [])
+    return catalog if isinstance(catalog, list) else []
+
+
+# requests is blocking, so commands run lookups in worker threads, a batch at a time
+LOOKUP_BATCH_SIZE = int(os.getenv("LOOKUP_BATCH_SIZE", "10"))
+
+
+async def get_course_info_async(subject, catalog_nbr, campus=DEFAULT_CAMPUS, term=None):
+    return await asyncio.to_thread(get_course_info, subject, catalog_nbr, campus, term)
+
+
+async def get_course_sections_async(subject, catalog_nbr, campus=DEFAULT_CAMPUS, term=None):
+    return await asyncio.to_thread(get_course_sections, subject, catalog_nbr, campus, term)
+
+
+async def get_sections_for_courses(courses, campus=DEFAULT_CAMPUS):
+    """Look up sections for several 'SUBJ NUM' course names concurrently, in order"""
+    async def lookup(course):
+        parts = course.split()
+        if len(parts) < 2:
+            return None
+        return await get_course_sections_async(parts[0], parts[1], campus)
+
+    return await asyncio.gather(*(lookup(course) for course in courses))
 
 
 # ============================
-# HELPER FUNCTIONS FOR GRADES
+# AUTOCOMPLETE INDEX
 # ============================
+# {campus: PrefixIndex}
+course_indexes = {}
+subject_indexes = {}
+
+# {(campus, term): course list} from Schedule Builder for the current term and
+# any term open for registration, merged into the indexes so brand new courses
+# can be completed too
+term_catalogs = {}
+
+# Terms the catalogs above were fetched for, and when
+catalog_terms = ()
+catalog_refreshed_at = 0.0
+
+# How many of a campus's most popular courses get their next-term info fetched ahead of time
+PREWARM_COURSES = int(os.getenv("PREWARM_COURSES", "200"))
+
+
+def build_autocomplete():
+    """Build each campus's course and subject completion indexes, ranked by total students"""
+    global course_indexes, subject_indexes
+
+    courses = {}
+    subjects = {}
+    catalogs = {}
+    for (campus, term), catalog in term_catalogs.items():
+        catalogs.setdefault(campus, []).extend(catalog)
+
+    for campus in set(course_popularity) | set(catalogs):
+        popularity = course_popularity.get(campus, ({}, {}))
+        # Copies, since catalog-only courses get added below
+        course_totals, subject_totals = dict(popularity[0]), dict(popularity[1])
+
+        for course in catalogs.get(campus, []):
+            if not isinstance(course, dict) or not course.get('subject') or not course.get('catalog_nbr'):
+                continue
+            course_totals.setdefault(f"{course['subject']} {course['catalog_nbr']}", 0)
+            subject_totals.setdefault(course['subject'], 0)
+
+        # The catalog number on its own is searchable too: '1133' finds CSCI 1133
+        courses[campus] = PrefixIndex.build(
+            (name, total, [name.split(" ", 1)[-1]]) for name, total in course_totals.items()
+        )
+        subjects[campus] = PrefixIndex.build((name, total, []) for name, total in subject_totals.items())
+
+    course_indexes = courses
+    subject_indexes = subjects
+
+    print("✅ Autocomplete index: " + ", ".join(
+        f"{campus} {len(index):,} courses" for campus, index in sorted(course_indexes.items())))
+
+
+async def refresh_term_catalogs(active_terms):
+    """Pull each campus's course list for the given terms and fold them into autocomplete"""
+    global term_catalogs
+
+    keys = [(campus, term) for term in active_terms for campus in CAMPUSES]
+    catalogs = await asyncio.gather(*(asyncio.to_thread(get_term_catalog, campus, term) for campus, term in keys))
+
+    # Keep an old copy if a fetch failed, but drop terms that are over
+    fresh = {key: term_catalogs[key] for key in keys if key in term_catalogs}
+    for key, catalog in zip(keys, catalogs):
+        if catalog:
+            fresh[key] = catalog
+    term_catalogs = fresh
+    await asyncio.to_thread(build_autocomplete)
+
+
+async def prewarm_term(term):
+    """Fetch course info for the most popular courses offered in term, so registration opens on a warm cache"""
+    campuses = {DEFAULT_CAMPUS} | {settings.get('campus', DEFAULT_CAMPUS) for settings in guild_settings.values()}
+    warmed = 0
+    for campus in sorted(campuses):
+        offered = sorted({f"{c['subject']} {c['catalog_nbr']}" for c in term_catalogs.get((campus, term), [])
+                          if isinstance(c, dict) and c.get('subject') and c.get('catalog_nbr')})
+        aggregates = campus_aggregates(campus)
+        rows = aggregates.rows(offered)
+        students = np.where(rows >= 0, aggregates.students[np.maximum(rows, 0)], 0)
+        popular = [offered[i] for i in np.argsort(-students, kind='stable')[:PREWARM_COURSES]]
+
+        for start in range(0, len(popular), LOOKUP_BATCH_SIZE):
+            batch = [course.split() for course in popular[start:start + LOOKUP_BATCH_SIZE]]
+            await asyncio.gather(*(get_course_info_async(subject, nbr, campus, term) for subject, nbr in batch))
+            warmed += len(batch)
+    print(f"🔥 Pre-warmed {warmed} courses for {terms.term_name(term)}")
+
+
+@tasks.loop(minutes=30)
+async def watch_terms():
+    """Follow term rollovers and registration openings, refreshing catalogs as they go stale"""
+    global catalog_terms, catalog_refreshed_at
+
+    current = (get_current_term(), *get_upcoming_terms())
+    stale = time.monotonic() - catalog_refreshed_at > CATALOG_CACHE_TTL
+    if current == catalog_terms and not stale:
+        return
+
+    new_terms = [term for term in current[1:] if term not in catalog_terms]
+    await refresh_term_catalogs(current)
+    catalog_terms = current
+    catalog_refreshed_at = time.monotonic()
+    print("📅 Terms: " + ", ".join(terms.term_name(term) for term in current))
+
+    for term in new_terms:
+        await prewarm_term(term)
+
+
+@watch_terms.before_loop
+async def before_watch_terms():
+    await data_ready.wait()
+
 
-def calculate_gpa_for_course(course_name):
-    """Calculate average GPA for a course (uses cache)"""
-    if course_name in gpa_cache:
-        return gpa_cache[course_name]
-    return 0, {}
+def calculate_gpa_for_course(course_name, campus=DEFAULT_CAMPUS):
+    """(average GPA, letter-grade counts in GRADE_ORDER) for a course at one campus, or (0, None)"""
+    aggregates = campus_aggregates(campus)
+    row = aggregates.row(course_name)
+    metrics.record_cache('gpa', row >= 0)
+    if row < 0:
+        return 0, None
+    return float(aggregates.gpa[row]), aggregates.counts[row]
 
 
-def format_grade_distribution(grade_dist):
-    """Format grade distribution as percentages"""
-    total = sum(grade_dist.values())
+def normalize_course(course_name):
+    """Canonical form of a user-typed course name, e.g. ' csci  1133' -> 'CSCI 1133'"""
+    return " ".join(course_name.upper().split())
+
+
+async def send_cached(ctx, command, args, build):
+    """
+    Send a historical command's response, building it only on a cache miss.
+    build() returns (content, embed); responses depend only on the grade data,
+    so the key includes the dataset version and reloads invalidate it.
+    """
+    key = (command, args, data_version)
+    payload = embed_cache.get(key)
+    if payload is None:
+        content, embed = build()
+        payload = (content, embed.to_dict() if embed is not None else None)
+        embed_cache.put(key, payload)
+
+    content, embed_data = payload
+    await respond(ctx, content, embed=discord.Embed.from_dict(embed_data) if embed_data else None)
+
+
+def format_grade_distribution(counts):
+    """Format a row of letter-grade counts as percentages of the letter-graded students"""
+    total = int(counts.sum()) if counts is not None else 0
     if total == 0:
         return "No grade data available"
 
-    result = []
-    for grade in ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'F']:
-        if grade in grade_dist and grade_dist[grade] > 0:
-            count = grade_dist[grade]
-            pct = (count / total) * 100
-            result.append(f"{grade}: {pct:.1f}% ({count} students)")
-
-    return "\n".join(result) if result else "No grade data available"
+    pct = counts * 100.0 / total
+    result = [f"{GRADE_ORDER[i]}: {pct[i]:.1f}% ({counts[i]} students)" for i in np.flatnonzero(counts)]
+    return "\n".join(result)
 
 
-def has_open_seats(sections_info):
-    """Check if a course has open seats"""
+def count_open_sections(sections_info):
+    """(open sections, total sections) for a Schedule Builder sections response"""
     sections = []
     if isinstance(sections_info, list):
         sections = sections_info
     elif isinstance(sections_info, dict):
         sections = sections_info.get('sections', [])
 
+    open_count = 0
     for section in sections:
         if isinstance(section, dict):
             enrolled = section.get('enrollment_total', section.get('enrolled', 0))
             capacity = section.get('class_capacity', section.get('capacity', 0))
             try:
                 if int(enrolled) < int(capacity):
-                    return True
+                    open_count += 1
             except:
                 pass
-    return False
+    return open_count, len(sections)
+
+
+def has_open_seats(sections_info):
+    """Check if a course has open seats"""
+    open_sections, _ = count_open_sections(sections_info)
+    return open_sections > 0
 
 
 # ============================
 # BOT EVENTS
 # ============================
 
+# Set METRICS_PORT=0 to turn the Prometheus endpoint off
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Set API_PORT (e.g. 8080) to serve the read-only JSON API from this process
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "0"))
+
+# Set SYNC_COMMANDS=0 to skip re-registering slash commands on startup
+SYNC_COMMANDS = os.getenv("SYNC_COMMANDS", "1") != "0"
+
+
+@bot.event
+async def setup_hook():
+    # Keep references so the tasks aren't garbage collected mid-load
+    bot.warm_up_task = asyncio.create_task(warm_up())
+
+    if METRICS_PORT:
+        await metrics.start_metrics_server(METRICS_HOST, METRICS_PORT)
+        print(f"📈 Metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+    if API_PORT:
+        await api.start_api_server(sys.modules[__name__], API_HOST, API_PORT)
+        print(f"🌐 Grade API on http://{API_HOST}:{API_PORT}/api/version")
+
+    report_shard_latency.start()
+    watch_terms.start()
+
+    # Register the slash versions of the hybrid commands. Only one process
+    # needs to do this when shards are spread across several.
+    # shard_launcher.py sets bot.shard_ids after the fork, so check the bot rather than the env
+    shard_ids = getattr(bot, 'shard_ids', None)
+    if SYNC_COMMANDS and (not shard_ids or 0 in shard_ids):
+        try:
+            synced = await bot.tree.sync()
+            print(f"⚡ Synced {len(synced)} slash commands")
+        except discord.HTTPException as e:
+            print(f"Error syncing slash commands: {e}")
+
+
+def shard_latencies():
+    """[(shard_id, latency_seconds)] for every shard this process runs"""
+    if isinstance(bot, commands.AutoShardedBot):
+        return bot.latencies
+    return [(bot.shard_id or 0, bot.latency)]
+
+
+@tasks.loop(seconds=30)
+async def report_shard_latency():
+    for shard_id, latency in shard_latencies():
+        # latency is inf/nan until the first heartbeat is acknowledged
+        if math.isfinite(latency):
+            metrics.SHARD_LATENCY.set(latency, shard=shard_id)
+
+
+@report_shard_latency.before_loop
+async def before_report_shard_latency():
+    await bot.wait_until_ready()
+
+
+@bot.event
+async def on_shard_ready(shard_id):
+    print(f"🧩 Shard {shard_id} ready")
+
+
 @bot.event
 async def on_ready():
     print(f"🔥 Logged in as {bot.user}")
-    print(f"📊 Loaded {len(df):,} grade records")
-    print(f"📅 Current term: {get_current_term()}")
+    if data_ready.is_set():
+        print(f"📊 Loaded grade data version {data_version}"
+              + (f" ({len(df):,} records)" if df is not None else " (from the snapshot)"))
+    else:
+        print("📊 Grade data still loading in the background")
+    print(f"📅 Current term: {terms.term_name(get_current_term())} ({get_current_term()})")
 
 
 @bot.event
 async def on_message(message):
     if message.author == bot.user:
         return
-    await bot.process_commands(message)
+    await dispatch_commands(message)
+
+
+async def dispatch_commands(message):
+    """bot.process_commands with throttling and fair queuing in front of it"""
+    if message.author.bot:
+        return
+
+    ctx = await bot.get_context(message)
+    if ctx.command is None:
+        return
+
+    retry_after, scope = throttle.check(message.author.id, message.guild.id if message.guild else None)
+    if retry_after:
+        metrics.THROTTLED.inc(scope=scope)
+        if throttle.should_warn(message.author.id, retry_after):
+            await ctx.send(f"⏳ Slow down {message.author.mention}, try again in {retry_after:.1f}s.")
+        return
+
+    guild_key = message.guild.id if message.guild else f"dm-{message.author.id}"
+    retry_after = await dispatcher.submit(
+        guild_key, lambda: bot.invoke(ctx), expensive=ctx.command.name in EXPENSIVE_COMMANDS
+    )
+    if retry_after:
+        metrics.THROTTLED.inc(scope="queue")
+        await ctx.send(f"🚦 This server has a lot of commands queued, try again in {retry_after:.0f}s.")
+
+
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.started_at = time.perf_counter()
+    responses.track(ctx)
+    metrics.COMMANDS_IN_FLIGHT.inc(command=ctx.command.qualified_name)
+
+    # Acknowledge slash commands straight away so slow lookups can't hit
+    # Discord's 3 second deadline; everything after this is a follow-up
+    if ctx.interaction and not ctx.interaction.response.is_done():
+        await ctx.defer()
+
+    # Slash commands skip the prefix dispatcher, so take an expensive slot here
+    if ctx.interaction and ctx.command.name in EXPENSIVE_COMMANDS:
+        await dispatcher.acquire_expensive()
+        ctx.holds_expensive_slot = True
+
+
+async def release_expensive_slot(ctx):
+    """
+    Give back a slash command's expensive slot, once. after_invoke doesn't run
+    for a hybrid slash command that raised, so on_command_error calls this too.
+    """
+    if getattr(ctx, 'holds_expensive_slot', False):
+        ctx.holds_expensive_slot = False
+        await dispatcher.release_expensive()
+
+
+def record_command_finished(ctx):
+    """In-flight, latency and API-call metrics for a command that got past before_invoke, recorded once"""
+    started_at = getattr(ctx, 'started_at', None)
+    if started_at is None:
+        return
+    ctx.started_at = None
+
+    name = ctx.command.qualified_name
+    metrics.COMMANDS_IN_FLIGHT.dec(command=name)
+    metrics.COMMAND_LATENCY.observe(time.perf_counter() - started_at, command=name,
+                                    status="error" if ctx.command_failed else "ok")
+    metrics.DISCORD_CALLS_PER_COMMAND.observe(getattr(ctx, 'api_calls', 0), command=name)
+
+
+@bot.after_invoke
+async def record_command_latency(ctx):
+    await release_expensive_slot(ctx)
+    record_command_finished(ctx)
+
+
+@bot.event
+async def on_command_error(ctx, error):
+    if isinstance(error, commands.CommandNotFound):
+        return
+    # A failed slash command (or a failed defer in before_invoke) never reaches after_invoke
+    await release_expensive_slot(ctx)
+    record_command_finished(ctx)
+    name = ctx.command.qualified_name if ctx.command else "unknown"
+    original = getattr(error, 'original', error)
+    metrics.COMMAND_ERRORS.inc(command=name, error=type(original).__name__)
+    if isinstance(error, GradeDataUnavailable):
+        await respond(ctx, str(error))
+        return
+    # Keep the default behaviour of printing the traceback
+    traceback.print_exception(type(error), error, error.__traceback__)
 
 
 # ============================
 # GRADE COMMANDS (CSV DATA)
 # ============================
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def grade(ctx, *, course_name: str):
     """
     Show historical grade distribution for a course
     Usage: !grade CSCI 1133
     """
-    course_name = course_name.upper().strip()
+    course_name = normalize_course(course_name)
+    campus = ctx_campus(ctx)
+    await send_cached(ctx, 'grade', (campus, course_name), lambda: grade_response(course_name, campus))
 
-    matches = df[df['FULL_NAME'] == course_name]
 
-    if matches.empty:
-        await ctx.send(f"❌ Course **{course_name}** not found in historical data.")
-        return
+def grade_response(course_name, campus):
+    aggregates = campus_aggregates(campus)
+    row = aggregates.row(course_name)
 
-    avg_gpa, grade_dist = calculate_gpa_for_course(course_name)
-    dist_text = format_grade_distribution(grade_dist)
+    if row < 0:
+        return f"❌ Course **{course_name}** not found in {campus_name(campus)} historical data.", None
 
-    sections = matches['CLASS_SECTION'].nunique()
-    total_students = matches['GRADE_HDCNT'].sum()
+    avg_gpa, grade_counts = calculate_gpa_for_course(course_name, campus)
+    dist_text = format_grade_distribution(grade_counts)
 
     embed = discord.Embed(title=f"📚 {course_name}", color=discord.Color.gold())
     embed.add_field(name="Historical Average GPA", value=f"{avg_gpa:.2f}", inline=False)
-    embed.add_field(name="Total Students (All Time)", value=f"{total_students:,}", inline=True)
-    embed.add_field(name="Historical Sections", value=str(sections), inline=True)
+    embed.add_field(name="Total Students (All Time)", value=f"{aggregates.students[row]:,}", inline=True)
+    embed.add_field(name="Historical Sections", value=str(aggregates.sections[row]), inline=True)
+    embed.add_field(name="Offered", value=aggregates.offered(row), inline=True)
     embed.add_field(name="Grade Distribution", value=dist_text, inline=False)
+    embed.set_footer(text=f"Campus: {campus_name(campus)}")
 
-    await ctx.send(embed=embed)
+    return None, embed
 
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def instructor(ctx, *, course_name: str):
     """
     Find historical instructors for a course
     Usage: !instructor CSCI 1133
     """
-    course_name = course_name.upper().strip()
-    course_data = df[df['FULL_NAME'] == course_name]
-
-    if course_data.empty:
-        await ctx.send(f"❌ Course **{course_name}** not found.")
-        return
-
-    grade_points = {
-        'A+': 4.0, 'A': 4.0, 'A-': 3.67,
-        'B+': 3.33, 'B': 3.0, 'B-': 2.67,
-        'C+': 2.33, 'C': 2.0, 'C-': 1.67,
-        'D+': 1.33, 'D': 1.0, 'F': 0.0
-    }
-
-    instructors = {}
-    for instructor in course_data['HR_NAME'].dropna().unique():
-        instructor_data = course_data[course_data['HR_NAME'] == instructor]
+    course_name = normalize_course(course_name)
+    campus = ctx_campus(ctx)
+    await send_cached(ctx, 'instructor', (campus, course_name), lambda: instructor_response(course_name, campus))
 
-        total_points = 0
-        total_students = 0
 
-        for _, row in instructor_data.iterrows():
-            grade = row['CRSE_GRADE_OFF']
-            count = int(row['GRADE_HDCNT'])
-            if grade in grade_points:
-                total_points += grade_points[grade] * count
-                total_students += count
+def instructor_response(course_name, campus):
+    if campus_aggregates(campus).row(course_name) < 0:
+        return f"❌ Course **{course_name}** not found at {campus_name(campus)}.", None
 
-        instructor_gpa = total_points / total_students if total_students > 0 else 0
-        sections = instructor_data['CLASS_SECTION'].nunique()
-        instructors[instructor] = (instructor_gpa, sections)
+    instructors = grade_queries.instructor_gpas(campus, course_name)
 
     result = []
-    for instructor, (gpa, sections) in sorted(instructors.items(), key=lambda x: x[1][0], reverse=True)[:10]:
+    for instructor, gpa, _, sections in sorted(instructors, key=lambda x: (-x[1], x[0]))[:10]:
         result.append(f"**{instructor}**: {gpa:.2f} GPA ({sections} sections)")
 
     embed = discord.Embed(title=f"👨‍🏫 Instructors for {course_name}", color=discord.Color.blue())
     embed.description = "\n".join(result) if result else "No instructor data available"
+    embed.set_footer(text=f"Campus: {campus_name(campus)}")
 
-    await ctx.send(embed=embed)
+    return None, embed
 
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def search(ctx, *, keyword: str):
     """
     Search for courses by name or description
     Usage: !search algorithms
     """
     keyword = keyword.upper().strip()
+    campus = ctx_campus(ctx)
 
-    # 1. Filter unique courses to make searching faster
-    # We create a temporary DataFrame of unique courses to avoid searching
-    # through thousands of duplicate rows (one for every grade/section)
-    unique_courses = df.drop_duplicates(subset=['FULL_NAME'])
+    # Search in both the course name and the description, sorted alphabetically
+    matches = grade_queries.search_courses(campus, keyword)
 
-    # 2. Search in both the Course Name and the Description
-    matches = unique_courses[
-        (unique_courses['FULL_NAME'].str.contains(keyword, na=False, case=False)) |
-        (unique_courses['DESCR'].str.contains(keyword, na=False, case=False))
-        ]
-
-    if matches.empty:
-        await ctx.send(f"❌ No courses found matching **{keyword}**")
+    if not matches:
+        await respond(ctx, f"❌ No {campus_name(campus)} courses found matching **{keyword}**")
         return
 
-    # 3. Sort matches alphabetically
-    sorted_matches = matches.sort_values('FULL_NAME')
-    match_count = len(sorted_matches)
+    match_count = len(matches)
 
-    # 4. Format the output
-    # We limit to 15 results to keep the embed clean and readable
-    limit = 15
+    # Format every match once; the page buttons slice this list
     result_list = []
-    for _, row in sorted_matches.head(limit).iterrows():
+    for full_name, descr in matches:
         # Truncate description if it's too long
-        descr = row['DESCR']
         if len(descr) > 60:
             descr = descr[:57] + "..."
-        result_list.append(f"**{row['FULL_NAME']}**: {descr}")
-
-    result_text = "\n".join(result_list)
+        result_list.append(f"**{full_name}**: {descr}")
 
-    embed = discord.Embed(
-        title=f"🔍 Search Results for '{keyword}'",
-        color=discord.Color.green()
-    )
-    embed.description = f"Found **{match_count}** matches:\n\n{result_text}"
-
-    if match_count > limit:
-        embed.set_footer(text=f"Showing {limit} of {match_count} results. Try being more specific!")
+    def render(lines, page, page_count):
+        embed = discord.Embed(
+            title=f"🔍 Search Results for '{keyword}'",
+            color=discord.Color.green()
+        )
+        embed.description = f"Found **{match_count}** matches:\n\n" + "\n".join(lines)
+        if page_count > 1:
+            embed.set_footer(text=f"Page {page + 1}/{page_count} · {match_count} results")
+        return embed
 
-    await ctx.send(embed=embed)
+    # 15 results per page keeps the embed clean and readable
+    await send_paginated(ctx, page_cache, ResultPages(result_list, 15, render, ctx.author.id))
 
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def easy(ctx, limit: int = 10):
     """
     Find easiest courses by GPA
     Usage: !easy 15
     """
-    # Use precomputed cache
-    sorted_courses = sorted(gpa_cache.items(), key=lambda x: x[1][0], reverse=True)
+    campus = ctx_campus(ctx)
+    await send_cached(ctx, 'easy', (campus, limit), lambda: easy_response(limit, campus))
 
-    # Filter out courses with 0 GPA
-    valid_courses = [(course, gpa, dist) for course, (gpa, dist) in sorted_courses if gpa > 0]
 
-    top_courses = valid_courses[:limit]
+def easy_response(limit, campus):
+    # Precomputed ranking, already without courses that have no GPA
+    aggregates = campus_aggregates(campus)
+    top_courses = aggregates.easiest[:limit]
 
-    result = [f"**{course}**: {gpa:.2f}" for course, gpa, _ in top_courses]
+    result = [f"**{aggregates.courses[row]}**: {aggregates.gpa[row]:.2f}" for row in top_courses]
 
     embed = discord.Embed(title=f"📈 Top {limit} Easiest Courses (by GPA)", color=discord.Color.green())
     embed.description = "\n".join(result)
+    embed.set_footer(text=f"Campus: {campus_name(campus)}")
 
-    await ctx.send(embed=embed)
+    return None, embed
 
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def hard(ctx, limit: int = 10):
     """
     Find hardest courses by GPA
     Usage: !hard 15
     """
-    # Use precomputed cache
-    sorted_courses = sorted(gpa_cache.items(), key=lambda x: x[1][0])
+    campus = ctx_campus(ctx)
+    await send_cached(ctx, 'hard', (campus, limit), lambda: hard_response(limit, campus))
 
-    # Filter out courses with 0 GPA
-    valid_courses = [(course, gpa, dist) for course, (gpa, dist) in sorted_courses if gpa > 0]
 
-    bottom_courses = valid_courses[:limit]
+def hard_response(limit, campus):
+    # Precomputed ranking, already without courses that have no GPA
+    aggregates = campus_aggregates(campus)
+    bottom_courses = aggregates.hardest[:limit]
 
-    result = [f"**{course}**: {gpa:.2f}" for course, gpa, _ in bottom_courses]
+    result = [f"**{aggregates.courses[row]}**: {aggregates.gpa[row]:.2f}" for row in bottom_courses]
 
     embed = discord.Embed(title=f"📉 Top {limit} Hardest Courses (by GPA)", color=discord.Color.red())
     embed.description = "\n".join(result)
+    embed.set_footer(text=f"Campus: {campus_name(campus)}")
 
-    await ctx.send(embed=embed)
+    return None, embed
 
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def department(ctx, dept: str):
     """
     List courses in a department
     Usage: !department CSCI
     """
     dept = dept.upper()
-    dept_courses = df[df['SUBJECT'] == dept]['FULL_NAME'].unique()
+    campus = ctx_campus(ctx)
+    course_list = grade_queries.subject_courses(campus, dept)
 
-    if len(dept_courses) == 0:
-        await ctx.send(f"❌ No courses found in department **{dept}**")
+    if not course_list:
+        await respond(ctx, f"❌ No courses found in department **{dept}** at {campus_name(campus)}")
         return
 
-    result = ", ".join(sorted(dept_courses)[:50])
+    def render(courses, page, page_count):
+        embed = discord.Embed(title=f"📂 {dept} Courses", color=discord.Color.purple())
+        embed.description = ", ".join(courses)
+        if page_count > 1:
+            embed.set_footer(text=f"Page {page + 1}/{page_count} · {len(course_list)} courses")
+        return embed
 
-    embed = discord.Embed(title=f"📂 {dept} Courses", color=discord.Color.purple())
-    embed.description = result
-    if len(dept_courses) > 50:
-        embed.set_footer(text=f"Showing 50 of {len(dept_courses)} courses")
+    await send_paginated(ctx, page_cache, ResultPages(course_list, 50, render, ctx.author.id))
 
-    await ctx.send(embed=embed)
 
+# Beyond this many courses the side-by-side table no longer fits an embed
+MAX_COMPARE = 10
 
-@bot.command()
+# Letter-grade groups shown as percentage columns in !compare
+COMPARE_GROUPS = [('A', slice(0, 3)), ('B', slice(3, 6)), ('C', slice(6, 9)), ('D/F', slice(9, 12))]
+
+
+@bot.hybrid_command()
+@requires_data()
 async def compare(ctx, *, args: str):
     """
-    Compare two courses
-    Usage: !compare CSCI 1133, CSCI 2033
+    Compare up to 10 courses side by side
+    Usage: !compare CSCI 1133, CSCI 2033, CSCI 2041
     """
     # Split by comma to allow for spaces within course names
     if "," not in args:
-        await ctx.send("❌ Please separate courses with a comma. (e.g., `!compare CSCI 1133, CSCI 2033`)")
+        await respond(ctx, "❌ Please separate courses with a comma. (e.g., `!compare CSCI 1133, CSCI 2033`)")
         return
 
-    parts = [p.strip().upper() for p in args.split(",")]
+    # Keep the order given, dropping blanks and repeats
+    parts = list(dict.fromkeys(normalize_course(p) for p in args.split(",") if p.strip()))
     if len(parts) < 2:
-        await ctx.send("❌ Please provide two courses.")
+        await respond(ctx, "❌ Please provide at least two courses.")
         return
-
-    course1, course2 = parts[0], parts[1]
-
-    gpa1, dist1 = calculate_gpa_for_course(course1)
-    gpa2, dist2 = calculate_gpa_for_course(course2)
-
-    if gpa1 == 0 or gpa2 == 0:
-        missing = []
-        if gpa1 == 0: missing.append(course1)
-        if gpa2 == 0: missing.append(course2)
-        await ctx.send(f"❌ Data not found for: {', '.join(missing)}")
+    if len(parts) > MAX_COMPARE:
+        await respond(ctx, f"❌ You can compare at most {MAX_COMPARE} courses at once.")
         return
 
-    # Calculate total students for context
-    students1 = df[df['FULL_NAME'] == course1]['GRADE_HDCNT'].sum()
-    students2 = df[df['FULL_NAME'] == course2]['GRADE_HDCNT'].sum()
+    campus = ctx_campus(ctx)
+    content, embed = compare_response(parts, campus)
+    await respond(ctx, content, embed=embed)
+
+
+def compare_response(courses, campus):
+    aggregates = course_aggregates.get(campus)
+    if aggregates is None:
+        return f"❌ No grade data for {campus_name(campus)}.", None
+
+    # One gather for every course instead of a table scan per course
+    rows = aggregates.rows(courses)
+    gpa = aggregates.gpa[np.maximum(rows, 0)]
+    found = (rows >= 0) & (gpa > 0)
+
+    missing = [course for course, ok in zip(courses, found) if not ok]
+    courses = [course for course, ok in zip(courses, found) if ok]
+    rows = rows[found]
+    if len(courses) < 2:
+        return f"❌ Data not found for: {', '.join(missing)}", None
+
+    gpa = aggregates.gpa[rows]
+    students = aggregates.students[rows]
+    offered = aggregates.terms[rows]
+    pct = aggregates.percentages(rows)
+    group_pct = np.column_stack([pct[:, cols].sum(axis=1) for _, cols in COMPARE_GROUPS])
+
+    # Everything is relative to the first course given
+    gpa_delta = gpa - gpa[0]
+    group_delta = group_pct - group_pct[0]
+
+    width = max(len(course) for course in courses)
+    header = f"{'Course':<{width}}  {'GPA':>4}  {'ΔGPA':>5}  {'Students':>8}  {'Terms':>5}" + "".join(
+        f"  {name + '%':>4}" for name, _ in COMPARE_GROUPS)
+    lines = [header]
+    for i, course in enumerate(courses):
+        delta = "—" if i == 0 else f"{gpa_delta[i]:+.2f}"
+        lines.append(f"{course:<{width}}  {gpa[i]:>4.2f}  {delta:>5}  {students[i]:>8,}  {offered[i]:>5}" + "".join(
+            f"  {value:>4.0f}" for value in group_pct[i]))
 
     embed = discord.Embed(title="⚖️ Course Comparison", color=discord.Color.orange())
+    embed.description = "```\n" + "\n".join(lines) + "\n```"
+
+    shifts = []
+    for i, course in enumerate(courses[1:], start=1):
+        biggest = int(np.argmax(np.abs(group_delta[i])))
+        name = COMPARE_GROUPS[biggest][0]
+        shifts.append(f"**{course}**: {group_delta[i, biggest]:+.1f} pts {name} vs {courses[0]}")
+    embed.add_field(name="Biggest distribution shift", value="\n".join(shifts), inline=False)
+
+    if len(courses) == 2:
+        diff = gpa[0] - gpa[1]
+        embed.set_footer(text=f"{courses[0]} is {'easier' if diff > 0 else 'harder'} by {abs(diff):.2f} GPA points."
+                              f" | Campus: {campus_name(campus)}")
+    else:
+        easiest, hardest = int(np.argmax(gpa)), int(np.argmin(gpa))
+        embed.set_footer(text=f"Easiest: {courses[easiest]} ({gpa[easiest]:.2f}) | "
+                              f"Hardest: {courses[hardest]} ({gpa[hardest]:.2f}) | Campus: {campus_name(campus)}")
 
-    # Adding a comparison visual
-    diff = gpa1 - gpa2
-    comparison_msg = f"{course1} is {'easier' if diff > 0 else 'harder'} by {abs(diff):.2f} GPA points."
-
-    embed.add_field(name=f"📘 {course1}", value=f"**GPA: {gpa1:.2f}**\nStudents: {students1:,}", inline=True)
-    embed.add_field(name=f"📙 {course2}", value=f"**GPA: {gpa2:.2f}**\nStudents: {students2:,}", inline=True)
-    embed.set_footer(text=comparison_msg)
-
-    await ctx.send(embed=embed)
+    return (f"⚠️ Data not found for: {', '.join(missing)}" if missing else None), embed
 
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def stats(ctx, *, course_name: str):
     """
     Detailed course statistics
     Usage: !stats CSCI 1133
     """
-    course_name = course_name.upper().strip()
-    course_data = df[df['FULL_NAME'] == course_name]
+    course_name = normalize_course(course_name)
+    campus = ctx_campus(ctx)
+    await send_cached(ctx, 'stats', (campus, course_name), lambda: stats_response(course_name, campus))
 
-    if course_data.empty:
-        await ctx.send(f"❌ Course **{course_name}** not found.")
-        return
 
-    gpa, grade_dist = calculate_gpa_for_course(course_name)
-    sections = course_data['CLASS_SECTION'].nunique()
-    total_students = course_data['GRADE_HDCNT'].sum()
-    instructors = course_data['HR_NAME'].nunique()
+def stats_response(course_name, campus):
+    aggregates = campus_aggregates(campus)
+    row = aggregates.row(course_name)
+
+    if row < 0:
+        return f"❌ Course **{course_name}** not found at {campus_name(campus)}.", None
 
     embed = discord.Embed(title=f"📊 Statistics for {course_name}", color=discord.Color.blue())
-    embed.add_field(name="Average GPA", value=f"{gpa:.2f}", inline=True)
-    embed.add_field(name="Total Students", value=f"{total_students:,}", inline=True)
-    embed.add_field(name="Total Sections", value=str(sections), inline=True)
-    embed.add_field(name="Instructors", value=str(instructors), inline=True)
+    embed.add_field(name="Average GPA", value=f"{aggregates.gpa[row]:.2f}", inline=True)
+    embed.add_field(name="Total Students", value=f"{aggregates.students[row]:,}", inline=True)
+    embed.add_field(name="Total Sections", value=str(aggregates.sections[row]), inline=True)
+    embed.add_field(name="Instructors", value=str(aggregates.instructors[row]), inline=True)
+    embed.add_field(name="Most Common Grade", value=aggregates.mode(row) or "N/A", inline=True)
+    embed.add_field(name="Offered", value=aggregates.offered(row), inline=True)
+    embed.set_footer(text=f"Campus: {campus_name(campus)}")
 
-    await ctx.send(embed=embed)
+    return None, embed
+
+
+@bot.hybrid_command()
+@requires_data()
+async def similar(ctx, *, course_name: str):
+    """
+    Courses graded like this one, but easier
+    Usage: !similar CSCI 1133
+    """
+    course_name = normalize_course(course_name)
+    campus = ctx_campus(ctx)
+    await send_cached(ctx, 'similar', (campus, course_name), lambda: similar_response(course_name, campus))
+
+
+def similar_response(course_name, campus):
+    index = similar_indexes.get(campus)
+    if index is None or course_name not in index:
+        return (f"❌ Not enough grade data for **{course_name}** at {campus_name(campus)} "
+                f"(needs {MIN_STUDENTS}+ graded students).", None)
+
+    gpa, _ = calculate_gpa_for_course(course_name, campus)
+    matches = index.easier_than(course_name, k=10)
+    if not matches:
+        return f"🏆 Nothing similar to **{course_name}** has a higher GPA ({gpa:.2f}).", None
+
+    result = [f"**{course}**: {other_gpa:.2f} GPA (+{other_gpa - gpa:.2f})" for course, other_gpa, _ in matches]
+
+    embed = discord.Embed(title=f"🧭 Like {course_name}, but easier", color=discord.Color.teal())
+    embed.description = "\n".join(result)
+    embed.set_footer(text=f"{course_name}: {gpa:.2f} GPA | Closest grade distribution and level first | "
+                          f"Campus: {campus_name(campus)}")
+
+    return None, embed
+
+
+@bot.hybrid_command()
+@requires_data()
+async def sectionstats(ctx, *, course_name: str):
+    """
+    How much grades vary between a course's past sections
+    Usage: !sectionstats CSCI 1133
+    """
+    course_name = normalize_course(course_name)
+    campus = ctx_campus(ctx)
+    await send_cached(ctx, 'sectionstats', (campus, course_name), lambda: sectionstats_response(course_name, campus))
+
+
+def describe_section(cube, row):
+    component = cube.component(row)
+    return (f"{terms.term_name(cube.terms[row])} sec {cube.section_names[cube.sections[row]]}"
+            f"{f' ({component})' if component else ''} - {cube.instructor_names[cube.instructors[row]]}: "
+            f"**{cube.gpa[row]:.2f}** ({cube.graded[row]:,} students)")
+
+
+def sectionstats_response(course_name, campus):
+    cube = section_cubes.get(campus)
+    summary = cube.summary(course_name) if cube is not None else None
+    if summary is None:
+        return f"❌ No graded sections of **{course_name}** at {campus_name(campus)}.", None
+
+    easiest, hardest = summary['easiest'], summary['hardest']
+    embed = discord.Embed(title=f"🔬 Section stats for {course_name}", color=discord.Color.dark_teal())
+    # Every offering of every section, unlike !grade's count of distinct section numbers
+    embed.add_field(name="Sections (all terms)", value=str(summary['sections']), inline=True)
+    embed.add_field(name="Average GPA", value=f"{summary['gpa']:.2f}", inline=True)
+    embed.add_field(name="Spread", value=f"{cube.gpa[easiest] - cube.gpa[hardest]:.2f} "
+                                         f"(σ {summary['std']:.2f})", inline=True)
+    embed.add_field(name="Easiest section", value=describe_section(cube, easiest), inline=False)
+    embed.add_field(name="Hardest section", value=describe_section(cube, hardest), inline=False)
+
+    if summary['components']:
+        embed.add_field(name="By component", value="\n".join(
+            f"**{name}**: {c['gpa']:.2f} GPA over {c['sections']} sections ({c['low']:.2f}-{c['high']:.2f})"
+            for name, c in sorted(summary['components'].items())
+        ), inline=False)
+
+    explained = summary['explained']
+    drivers = [("instructor", explained['instructor']), ("term", explained['term'])]
+    if len(summary['components']) > 1:
+        drivers.append(("lecture vs discussion/lab", explained['component']))
+    embed.add_field(name="What explains the spread (shares overlap)", value="\n".join(
+        f"{label.capitalize()}: {share:.0%} of the section-to-section variation"
+        for label, share in sorted(drivers, key=lambda d: d[1], reverse=True)
+    ), inline=False)
+
+    embed.set_footer(text=f"Sections with 5+ letter grades | Lecture/discussion labels only exist for "
+                          f"Fall 2022 & Spring 2023 | Campus: {campus_name(campus)}")
+    return None, embed
+
+
+@bot.hybrid_command()
+@requires_data()
+async def prof(ctx, *, name: str):
+    """
+    How an instructor grades across every course they've taught
+    Usage: !prof Daniel Orban
+    """
+    campus = ctx_campus(ctx)
+    name = " ".join(name.split())
+    await send_cached(ctx, 'prof', (campus, name.lower()), lambda: prof_response(name, campus))
+
+
+def prof_response(name, campus):
+    index = instructor_indexes.get(campus)
+    matches = index.resolve(name) if index is not None else []
+    if not matches:
+        return f"❌ No instructor matching **{name}** at {campus_name(campus)}.", None
+
+    i = matches[0]
+    rows = index.rows(i)
+    aggregates = campus_aggregates(campus)
+    order = sorted(range(rows.start, rows.stop), key=lambda r: index.graded[r], reverse=True)
+
+    result = []
+    weighted_delta = 0.0
+    compared = 0
+    for r in order:
+        if index.graded[r] == 0:
+            continue
+        line = (f"**{index.courses[r]}**: {index.gpa[r]:.2f} GPA · {index.graded[r]:,} students · "
+                f"{index.term_count[r]} term{'s' if index.term_count[r] != 1 else ''}")
+        course_row = aggregates.row(index.courses[r])
+        if course_row >= 0 and aggregates.graded[course_row] > index.graded[r]:
+            delta = index.gpa[r] - aggregates.gpa[course_row]
+            line += f" ({delta:+.2f} vs course)"
+            weighted_delta += delta * index.graded[r]
+            compared += index.graded[r]
+        result.append(line)
+
+    embed = discord.Embed(title=f"🧑‍🏫 {index.names[i]}", color=discord.Color.blue())
+    embed.add_field(name="Lifetime GPA", value=f"{index.lifetime_gpa[i]:.2f}", inline=True)
+    embed.add_field(name="Students", value=f"{index.lifetime_graded[i]:,}", inline=True)
+    embed.add_field(name="Courses", value=str(len(result)), inline=True)
+    if compared:
+        embed.add_field(name="vs course averages", value=f"{weighted_delta / compared:+.2f} GPA", inline=True)
+    embed.add_field(name="Last taught", value=terms.term_name(index.last_term[rows].max()), inline=True)
+
+    embed.description = "\n".join(result[:15]) if result else "No letter-graded sections on record"
+    if len(result) > 15:
+        embed.description += f"\n…and {len(result) - 15} more"
+    if len(matches) > 1:
+        embed.add_field(name="Also matched", value=", ".join(index.names[j] for j in matches[1:]), inline=False)
+    embed.set_footer(text=f"Most students first | 'vs course' compares with everyone else's sections too | "
+                          f"Campus: {campus_name(campus)}")
+
+    return None, embed
 
 
 # ============================
 # SCHEDULE BUILDER COMMANDS
 # ============================
 
-@bot.command()
+@bot.hybrid_command()
 async def schedule(ctx, *, course_name: str):
     """
     Get current semester schedule from Schedule Builder
@@ -488,22 +1739,25 @@ async def schedule(ctx, *, course_name: str):
     parts = course_name.split()
 
     if len(parts) < 2:
-        await ctx.send("❌ Please provide subject and course number (e.g., `!schedule CSCI 1133`)")
+        await respond(ctx, "❌ Please provide subject and course number (e.g., `!schedule CSCI 1133`)")
         return
 
     subject = parts[0]
     catalog_nbr = parts[1]
+    campus = ctx_campus(ctx)
 
-    await ctx.send(f"🔍 Searching Schedule Builder for **{course_name}**...")
+    await respond(ctx, f"🔍 Searching Schedule Builder for **{course_name}**...")
+    reads = watch_stale_reads()
 
-    course_info = get_course_info(subject, catalog_nbr)
+    course_info, sections = await asyncio.gather(
+        get_course_info_async(subject, catalog_nbr, campus),
+        get_course_sections_async(subject, catalog_nbr, campus)
+    )
 
     if not course_info:
-        await ctx.send(f"❌ Could not find **{course_name}** in Schedule Builder")
+        await respond(ctx, f"❌ Could not find **{course_name}** in Schedule Builder")
         return
 
-    sections = get_course_sections(subject, catalog_nbr)
-
     embed = discord.Embed(
         title=f"📅 {subject} {catalog_nbr}",
         color=discord.Color.blue()
@@ -524,12 +1778,12 @@ async def schedule(ctx, *, course_name: str):
         elif isinstance(sections, dict) and 'sections' in sections:
             embed.add_field(name="Sections Available", value=str(len(sections['sections'])), inline=True)
 
-    embed.set_footer(text=f"Term: {get_current_term()}")
+    embed.set_footer(text=f"Term: {terms.term_name(get_current_term())} | Campus: {campus_name(campus)}")
 
-    await ctx.send(embed=embed)
+    await respond(ctx, stale_note(reads), embed=embed)
 
 
-@bot.command()
+@bot.hybrid_command()
 async def sections(ctx, *, course_name: str):
     """
     Get detailed section information
@@ -539,16 +1793,18 @@ async def sections(ctx, *, course_name: str):
     parts = course_name.split()
 
     if len(parts) < 2:
-        await ctx.send("❌ Please provide subject and course number")
+        await respond(ctx, "❌ Please provide subject and course number")
         return
 
     subject = parts[0]
     catalog_nbr = parts[1]
+    campus = ctx_campus(ctx)
 
-    sections_data = get_course_sections(subject, catalog_nbr)
+    reads = watch_stale_reads()
+    sections_data = await get_course_sections_async(subject, catalog_nbr, campus)
 
     if not sections_data:
-        await ctx.send(f"❌ Could not find sections for **{course_name}**")
+        await respond(ctx, f"❌ Could not find sections for **{course_name}** at {campus_name(campus)}")
         return
 
     sections = []
@@ -558,82 +1814,76 @@ async def sections(ctx, *, course_name: str):
         sections = sections_data.get('sections', [])
 
     if not sections:
-        await ctx.send(f"❌ No sections available for **{course_name}** this semester")
+        await respond(ctx, f"❌ No sections available for **{course_name}** this semester")
         return
 
-    section_text = []
-    for i, section in enumerate(sections[:8]):
-        if isinstance(section, dict):
-            section_num = section.get('section', section.get('class_section', 'N/A'))
-            instructor = section.get('instructors', section.get('instructor', 'TBA'))
+    section_text = [format_section(section) for section in sections if isinstance(section, dict)]
 
-            if isinstance(instructor, list):
-                instructor = ", ".join(instructor)
-
-            days = section.get('days', 'TBA')
-            start_time = section.get('start_time', '')
-            end_time = section.get('end_time', '')
-            time = f"{start_time}-{end_time}" if start_time and end_time else 'TBA'
-
-            location = section.get('location', section.get('room', 'TBA'))
-            enrollment = section.get('enrollment_total', section.get('enrolled', 'N/A'))
-            capacity = section.get('class_capacity', section.get('capacity', 'N/A'))
-
-            section_text.append(
-                f"**Section {section_num}**\n"
-                f"👨‍🏫 {instructor}\n"
-                f"🕐 {days} {time}\n"
-                f"📍 {location}\n"
-                f"👥 {enrollment}/{capacity} enrolled\n"
-            )
-
-    if len(section_text) > 4:
-        embed1 = discord.Embed(
-            title=f"📋 Sections for {course_name} (Part 1)",
-            description="\n".join(section_text[:4]),
-            color=discord.Color.green()
-        )
-        await ctx.send(embed=embed1)
-
-        embed2 = discord.Embed(
-            title=f"📋 Sections for {course_name} (Part 2)",
-            description="\n".join(section_text[4:]),
-            color=discord.Color.green()
-        )
-        if len(sections) > 8:
-            embed2.set_footer(text=f"Showing 8 of {len(sections)} sections")
-        await ctx.send(embed=embed2)
-    else:
+    def render(lines, page, page_count):
         embed = discord.Embed(
             title=f"📋 Sections for {course_name}",
-            description="\n".join(section_text),
+            description="\n".join(lines),
             color=discord.Color.green()
         )
-        if len(sections) > 8:
-            embed.set_footer(text=f"Showing 8 of {len(sections)} sections")
-        await ctx.send(embed=embed)
+        if page_count > 1:
+            embed.set_footer(text=f"Page {page + 1}/{page_count} · {len(section_text)} sections")
+        return embed
 
+    await send_paginated(ctx, page_cache, ResultPages(section_text, 4, render, ctx.author.id), stale_note(reads))
 
-@bot.command()
+
+def format_section(section):
+    """One section's block of the !sections listing"""
+    section_num = section.get('section', section.get('class_section', 'N/A'))
+    instructor = section.get('instructors', section.get('instructor', 'TBA'))
+
+    if isinstance(instructor, list):
+        instructor = ", ".join(instructor)
+
+    days = section.get('days', 'TBA')
+    start_time = section.get('start_time', '')
+    end_time = section.get('end_time', '')
+    time = f"{start_time}-{end_time}" if start_time and end_time else 'TBA'
+
+    location = section.get('location', section.get('room', 'TBA'))
+    enrollment = section.get('enrollment_total', section.get('enrolled', 'N/A'))
+    capacity = section.get('class_capacity', section.get('capacity', 'N/A'))
+
+    return (
+        f"**Section {section_num}**\n"
+        f"👨‍🏫 {instructor}\n"
+        f"🕐 {days} {time}\n"
+        f"📍 {location}\n"
+        f"👥 {enrollment}/{capacity} enrolled\n"
+    )
+
+
+@bot.hybrid_command()
+@requires_data()
 async def full(ctx, *, course_name: str):
     """
     Complete course info: historical grades + current schedule
     Usage: !full CSCI 1133
     """
     course_name = course_name.upper().strip()
+    campus = ctx_campus(ctx)
 
     # Get grade data
-    gpa, grade_dist = calculate_gpa_for_course(course_name)
-    course_data = df[df['FULL_NAME'] == course_name]
+    gpa, grade_counts = calculate_gpa_for_course(course_name, campus)
+    aggregates = campus_aggregates(campus)
+    row = aggregates.row(course_name)
 
     # Get schedule data
     parts = course_name.split()
     schedule_info = None
     sections_info = None
 
+    reads = watch_stale_reads()
     if len(parts) >= 2:
-        schedule_info = get_course_info(parts[0], parts[1])
-        sections_info = get_course_sections(parts[0], parts[1])
+        schedule_info, sections_info = await asyncio.gather(
+            get_course_info_async(parts[0], parts[1], campus),
+            get_course_sections_async(parts[0], parts[1], campus)
+        )
 
     embed = discord.Embed(
         title=f"📊 Complete Analysis: {course_name}",
@@ -644,13 +1894,12 @@ async def full(ctx, *, course_name: str):
     if gpa > 0:
         embed.add_field(name="📈 Historical Avg GPA", value=f"**{gpa:.2f}**", inline=True)
 
-        if grade_dist:
-            top_grade = max(grade_dist, key=grade_dist.get)
+        top_grade = aggregates.mode(row)
+        if top_grade:
             embed.add_field(name="🎯 Most Common Grade", value=f"**{top_grade}**", inline=True)
 
-        if not course_data.empty:
-            total_students = course_data['GRADE_HDCNT'].sum()
-            embed.add_field(name="👥 Total Historical Students", value=f"**{total_students:,}**", inline=True)
+        embed.add_field(name="👥 Total Historical Students", value=f"**{aggregates.students[row]:,}**", inline=True)
+        embed.add_field(name="🗓️ Offered", value=aggregates.offered(row), inline=True)
 
     # Current schedule data
     if schedule_info and isinstance(schedule_info, dict):
@@ -658,46 +1907,30 @@ async def full(ctx, *, course_name: str):
             embed.add_field(name="💳 Credits", value=schedule_info['credits'], inline=True)
 
     if sections_info:
-        sections = []
-        if isinstance(sections_info, list):
-            sections = sections_info
-        elif isinstance(sections_info, dict):
-            sections = sections_info.get('sections', [])
-
-        if sections:
-            embed.add_field(name="📅 Current Sections", value=f"**{len(sections)}** available", inline=True)
-
-            open_sections = 0
-            for section in sections:
-                if isinstance(section, dict):
-                    enrolled = section.get('enrollment_total', section.get('enrolled', 0))
-                    capacity = section.get('class_capacity', section.get('capacity', 0))
-                    try:
-                        if int(enrolled) < int(capacity):
-                            open_sections += 1
-                    except:
-                        pass
-
+        open_sections, total_sections = count_open_sections(sections_info)
+        if total_sections:
+            embed.add_field(name="📅 Current Sections", value=f"**{total_sections}** available", inline=True)
             if open_sections > 0:
                 embed.add_field(name="✅ Open Sections", value=f"**{open_sections}**", inline=True)
 
     # Grade distribution
-    if grade_dist:
-        dist_text = format_grade_distribution(grade_dist)
+    if grade_counts is not None and grade_counts.any():
+        dist_text = format_grade_distribution(grade_counts)
         if len(dist_text) > 1024:
             dist_text = dist_text[:1020] + "..."
         embed.add_field(name="📊 Grade Distribution", value=dist_text, inline=False)
 
-    embed.set_footer(text=f"Term: {get_current_term()} | Use !sections {course_name} for detailed info")
+    embed.set_footer(text=f"Term: {terms.term_name(get_current_term())} | {campus_name(campus)} | Use !sections {course_name} for detailed info")
 
-    await ctx.send(embed=embed)
+    await respond(ctx, stale_note(reads), embed=embed)
 
 
 # ============================
 # NEW COMBINED COMMANDS
 # ============================
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def pick(ctx, dept: str, difficulty: str = "easy"):
     """
     Show easy/hard courses in a department that are offered this semester
@@ -708,43 +1941,55 @@ async def pick(ctx, dept: str, difficulty: str = "easy"):
     difficulty = difficulty.lower()
 
     if difficulty not in ["easy", "hard"]:
-        await ctx.send("❌ Difficulty must be either 'easy' or 'hard'")
+        await respond(ctx, "❌ Difficulty must be either 'easy' or 'hard'")
         return
 
-    await ctx.send(f"🔍 Finding {difficulty} **{dept}** courses offered this semester...")
+    campus = ctx_campus(ctx)
+    await respond(ctx, f"🔍 Finding {difficulty} **{dept}** courses offered this semester...")
+    reads = watch_stale_reads()
 
-    # Get all courses in department with their GPAs from cache
-    dept_courses = [(course, gpa, dist) for course, (gpa, dist) in gpa_cache.items()
-                    if course.startswith(dept + " ") and gpa > 0]
+    # The department's courses are one contiguous block of rows
+    aggregates = campus_aggregates(campus)
+    rows = aggregates.subject_rows(dept)
+    rows = rows[aggregates.gpa[rows] > 0]
 
-    if len(dept_courses) == 0:
-        await ctx.send(f"❌ No courses found in department **{dept}**")
+    if len(rows) == 0:
+        await respond(ctx, f"❌ No courses found in department **{dept}**")
         return
 
-    # Sort by difficulty
-    if difficulty == "easy":
-        sorted_courses = sorted(dept_courses, key=lambda x: x[1], reverse=True)
-    else:
-        sorted_courses = sorted(dept_courses, key=lambda x: x[1])
+    # Sort by difficulty (ties alphabetically)
+    gpas = aggregates.gpa[rows]
+    order = np.lexsort((rows, -gpas if difficulty == "easy" else gpas))
+    sorted_courses = [(aggregates.courses[row], float(aggregates.gpa[row])) for row in rows[order]]
 
-    # Check which ones are offered this semester
+    # Check which ones are offered this semester, a batch of lookups at a time,
+    # showing what has been found so far while the rest are checked
+    candidates = sorted_courses[:30]
     available_courses = []
-    for course, gpa, dist in sorted_courses[:30]:
-        if len(available_courses) >= 10:
-            break
+    for start in range(0, len(candidates), LOOKUP_BATCH_SIZE):
+        batch = candidates[start:start + LOOKUP_BATCH_SIZE]
+        lookups = await get_sections_for_courses([course for course, _ in batch], campus)
 
-        parts = course.split()
-        if len(parts) >= 2:
-            sections = get_course_sections(parts[0], parts[1])
+        for (course, gpa), sections in zip(batch, lookups):
             if sections:
-                has_seats = has_open_seats(sections)
-                available_courses.append((course, gpa, has_seats))
+                available_courses.append((course, gpa, has_open_seats(sections)))
+        available_courses = available_courses[:10]
+
+        checked = start + len(batch)
+        if len(available_courses) >= 10 or checked >= len(candidates):
+            break
+        if available_courses:
+            await respond(ctx, f"🔍 Checked {checked}/{len(candidates)} courses...",
+                          embed=pick_embed(dept, difficulty, available_courses))
 
     if not available_courses:
-        await ctx.send(f"❌ No {difficulty} **{dept}** courses found that are currently offered")
+        await respond(ctx, f"❌ No {difficulty} **{dept}** courses found that are currently offered")
         return
 
-    # Build result
+    await respond(ctx, stale_note(reads), embed=pick_embed(dept, difficulty, available_courses))
+
+
+def pick_embed(dept, difficulty, available_courses):
     result = []
     for course, gpa, has_seats in available_courses:
         seat_emoji = "✅" if has_seats else "🔒"
@@ -756,11 +2001,11 @@ async def pick(ctx, dept: str, difficulty: str = "easy"):
         color=discord.Color.green() if difficulty == "easy" else discord.Color.red()
     )
     embed.set_footer(text="✅ = Open seats | 🔒 = Full")
-
-    await ctx.send(embed=embed)
+    return embed
 
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def bestinstructor(ctx, *, course_name: str):
     """
     Show current instructors with their historical GPAs
@@ -770,19 +2015,21 @@ async def bestinstructor(ctx, *, course_name: str):
     parts = course_name.split()
 
     if len(parts) < 2:
-        await ctx.send("❌ Please provide subject and course number")
+        await respond(ctx, "❌ Please provide subject and course number")
         return
 
     subject = parts[0]
     catalog_nbr = parts[1]
 
-    await ctx.send(f"🔍 Finding best instructors for **{course_name}**...")
+    campus = ctx_campus(ctx)
+    await respond(ctx, f"🔍 Finding best instructors for **{course_name}**...")
 
     # Get current sections
-    sections_data = get_course_sections(subject, catalog_nbr)
+    reads = watch_stale_reads()
+    sections_data = await get_course_sections_async(subject, catalog_nbr, campus)
 
     if not sections_data:
-        await ctx.send(f"❌ Could not find **{course_name}** in Schedule Builder")
+        await respond(ctx, f"❌ Could not find **{course_name}** in Schedule Builder")
         return
 
     sections = []
@@ -792,7 +2039,7 @@ async def bestinstructor(ctx, *, course_name: str):
         sections = sections_data.get('sections', [])
 
     if not sections:
-        await ctx.send(f"❌ No sections available for **{course_name}** this semester")
+        await respond(ctx, f"❌ No sections available for **{course_name}** this semester")
         return
 
     # Get current instructors
@@ -806,34 +2053,19 @@ async def bestinstructor(ctx, *, course_name: str):
                 current_instructors.add(instructor)
 
     # Get historical data for these instructors
-    grade_points = {
-        'A+': 4.0, 'A': 4.0, 'A-': 3.67,
-        'B+': 3.33, 'B': 3.0, 'B-': 2.67,
-        'C+': 2.33, 'C': 2.0, 'C-': 1.67,
-        'D+': 1.33, 'D': 1.0, 'F': 0.0
-    }
+    history = grade_queries.instructor_gpas(campus, course_name)
 
     instructor_stats = {}
-    course_data = df[df['FULL_NAME'] == course_name]
-
     for instructor in current_instructors:
-        instructor_data = course_data[course_data['HR_NAME'].str.contains(instructor, case=False, na=False)]
+        # Historical names containing the live one, e.g. "Smith" matches "John Smith"
+        matched = [(gpa * graded, graded) for name, gpa, graded, _ in history if instructor.lower() in name.lower()]
+        total_students = sum(graded for _, graded in matched)
 
-        if instructor_data.empty:
-            instructor_stats[instructor] = (0, 0, "No historical data")
+        if not matched:
+            instructor_stats[instructor] = (0, 0, 0)
             continue
 
-        total_points = 0
-        total_students = 0
-
-        for _, row in instructor_data.iterrows():
-            grade = row['CRSE_GRADE_OFF']
-            count = int(row['GRADE_HDCNT'])
-            if grade in grade_points:
-                total_points += grade_points[grade] * count
-                total_students += count
-
-        instructor_gpa = total_points / total_students if total_students > 0 else 0
+        instructor_gpa = sum(points for points, _ in matched) / total_students if total_students > 0 else 0
         instructor_stats[instructor] = (instructor_gpa, total_students, instructor_gpa)
 
     # Sort by GPA
@@ -854,67 +2086,54 @@ async def bestinstructor(ctx, *, course_name: str):
     )
     embed.set_footer(text="Ranked by historical GPA")
 
-    await ctx.send(embed=embed)
+    await respond(ctx, stale_note(reads), embed=embed)
 
 
-@bot.command()
+@bot.hybrid_command()
+@requires_data()
 async def openandeasy(ctx, limit: int = 10):
     """
     Show easy classes with open seats this semester
     Usage: !openandeasy 15
     """
-    await ctx.send(f"🔍 Finding top {limit} easy courses with open seats... (this may take a moment)")
-
-    # Get courses sorted by GPA from cache
-    sorted_courses = sorted(gpa_cache.items(), key=lambda x: x[1][0], reverse=True)
+    campus = ctx_campus(ctx)
+    await respond(ctx, f"🔍 Finding top {limit} easy courses with open seats... (this may take a moment)")
+    reads = watch_stale_reads()
 
-    # Filter for high GPA courses
-    high_gpa_courses = [(course, gpa, dist) for course, (gpa, dist) in sorted_courses if gpa >= 3.0]
+    # Precomputed GPA ranking; keep high GPA courses, and don't check more than 100 of them
+    aggregates = campus_aggregates(campus)
+    rows = aggregates.easiest[:100]
+    rows = rows[aggregates.gpa[rows] >= 3.0]
+    high_gpa_courses = [(aggregates.courses[row], float(aggregates.gpa[row])) for row in rows]
 
-    # Check which ones have open seats
+    # Check which ones have open seats, a batch of lookups at a time in GPA order
     results = []
-    checked = 0
-
-    for course, gpa, dist in high_gpa_courses:
-        if len(results) >= limit:
-            break
-
-        checked += 1
-        if checked > 100:  # Don't check more than 100 courses
-            break
-
-        parts = course.split()
-        if len(parts) >= 2:
-            sections_info = get_course_sections(parts[0], parts[1])
+    for start in range(0, len(high_gpa_courses), LOOKUP_BATCH_SIZE):
+        batch = high_gpa_courses[start:start + LOOKUP_BATCH_SIZE]
+        lookups = await get_sections_for_courses([course for course, _ in batch], campus)
 
+        for (course, gpa), sections_info in zip(batch, lookups):
             if sections_info and has_open_seats(sections_info):
-                # Count open seats
-                sections = []
-                if isinstance(sections_info, list):
-                    sections = sections_info
-                elif isinstance(sections_info, dict):
-                    sections = sections_info.get('sections', [])
-
-                open_count = 0
-                total_sections = len(sections)
-
-                for section in sections:
-                    if isinstance(section, dict):
-                        enrolled = section.get('enrollment_total', section.get('enrolled', 0))
-                        capacity = section.get('class_capacity', section.get('capacity', 0))
-                        try:
-                            if int(enrolled) < int(capacity):
-                                open_count += 1
-                        except:
-                            pass
-
+                open_count, total_sections = count_open_sections(sections_info)
                 results.append((course, gpa, open_count, total_sections))
+        results = results[:limit]
+
+        checked = start + len(batch)
+        if len(results) >= limit or checked >= len(high_gpa_courses):
+            break
+        if results:
+            # Show what we have while the rest are still being checked
+            await respond(ctx, f"🔍 Checked {checked}/{len(high_gpa_courses)} courses...",
+                          embed=openandeasy_embed(results))
 
     if not results:
-        await ctx.send("❌ No easy courses with open seats found")
+        await respond(ctx, "❌ No easy courses with open seats found")
         return
 
-    # Build result
+    await respond(ctx, stale_note(reads), embed=openandeasy_embed(results))
+
+
+def openandeasy_embed(results):
     result_text = []
     for course, gpa, open_count, total_sections in results:
         result_text.append(f"✅ **{course}**: {gpa:.2f} GPA | {open_count}/{total_sections} sections open")
@@ -924,15 +2143,140 @@ async def openandeasy(ctx, limit: int = 10):
         description="\n".join(result_text),
         color=discord.Color.green()
     )
-    embed.set_footer(text=f"Only showing courses with GPA ≥ 3.0 | Term: {get_current_term()}")
+    embed.set_footer(text=f"Only showing courses with GPA ≥ 3.0 | Term: {terms.term_name(get_current_term())}")
+    return embed
+
+
+# ============================
+# SERVER SETTINGS
+# ============================
+
+@bot.hybrid_command()
+async def campus(ctx, code: str = None):
+    """
+    Show or set which campus this server's results come from
+    Usage: !campus
+    Usage: !campus UMNDL
+    """
+    current = ctx_campus(ctx)
+    if code is None:
+        options = "\n".join(f"`{c}` - {name}" for c, name in CAMPUSES.items())
+        await ctx.send(f"📍 This server uses **{campus_name(current)}** ({current}).\n"
+                       f"Admins can change it with `!campus <code>`:\n{options}")
+        return
+
+    if ctx.guild is None:
+        await ctx.send("❌ The campus can only be set in a server (DMs use the default campus)")
+        return
+    if not ctx.author.guild_permissions.manage_guild:
+        await ctx.send("❌ You need the Manage Server permission to change the campus")
+        return
+
+    # Accept the code or the campus name ('duluth', 'Twin Cities')
+    wanted = code.upper().strip()
+    for c, name in CAMPUSES.items():
+        if wanted in (c, name.upper(), name.upper().replace(" ", "")):
+            wanted = c
+            break
+    if wanted not in CAMPUSES:
+        await ctx.send(f"❌ Unknown campus **{code}**. Options: {', '.join(CAMPUSES)}")
+        return
+
+    await asyncio.to_thread(save_guild_setting, ctx.guild.id, 'campus', wanted)
+    await ctx.send(f"✅ This server now uses **{campus_name(wanted)}** grades and schedules")
+
+
+# ============================
+# ADMIN COMMANDS
+# ============================
+
+PROFILE_DIR = os.path.join(BASE_DIR, "profiles")
+active_profiler = None
+
+
+@bot.command()
+@commands.is_owner()
+async def profile(ctx, seconds: int = 30):
+    """
+    Owner only: sample live traffic and post a profile
+    Usage: !profile 60
+    """
+    global active_profiler
+
+    if active_profiler is not None:
+        await ctx.send("⏳ A profile is already running")
+        return
+
+    seconds = max(1, min(seconds, 600))
+    await ctx.send(f"🩺 Profiling live traffic for {seconds}s...")
+
+    active_profiler = SamplingProfiler()
+    active_profiler.start()
+    try:
+        await asyncio.sleep(seconds)
+        # Stopping joins the sampler thread and the report walks every stack,
+        # so keep both off the event loop
+        await asyncio.to_thread(active_profiler.stop)
+        collapsed_path, summary_path = await asyncio.to_thread(active_profiler.write_report, PROFILE_DIR)
+    finally:
+        active_profiler = None
+
+    with open(summary_path, encoding="utf-8") as f:
+        preview = "\n".join(f.read().splitlines()[:15])
+
+    await ctx.send(
+        f"✅ Profile saved to `{os.path.relpath(collapsed_path, BASE_DIR)}`\n```\n{preview[:1800]}\n```",
+        files=[discord.File(summary_path), discord.File(collapsed_path)]
+    )
+
+
+@bot.command()
+@commands.is_owner()
+async def reload(ctx):
+    """
+    Owner only: reload the grade data without restarting
+    Usage: !reload
+    """
+    global data_error
+    await respond(ctx, "🔄 Reloading grade data...")
+    old_version = data_version
+    await asyncio.to_thread(load_data)
+    # A reload that works also recovers from a failed startup load
+    data_error = None
+    data_ready.set()
+    if data_version == old_version:
+        await respond(ctx, f"✅ Reloaded, data unchanged (version `{data_version}`)")
+    else:
+        await respond(ctx, f"✅ Reloaded, version `{old_version}` → `{data_version}`, response cache cleared")
+
 
+@bot.command()
+async def shards(ctx):
+    """
+    Per-shard gateway latency for this process
+    Usage: !shards
+    """
+    guild_counts = {}
+    for guild in bot.guilds:
+        guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+    lines = []
+    for shard_id, latency in sorted(shard_latencies()):
+        ms = f"{latency * 1000:.0f} ms" if math.isfinite(latency) else "connecting"
+        marker = " ← you" if ctx.guild and ctx.guild.shard_id == shard_id else ""
+        lines.append(f"**Shard {shard_id}**: {ms} | {guild_counts.get(shard_id, 0)} servers{marker}")
+
+    embed = discord.Embed(title="🧩 Shard Latency", description="\n".join(lines), color=discord.Color.blue())
+    embed.set_footer(text=f"{bot.shard_count or 1} shards total | pid {os.getpid()}")
     await ctx.send(embed=embed)
+
+
 ## help command
 # First, remove the default help if you haven't
 bot.remove_command('help')
 
 
-@bot.command()
+@bot.hybrid_command()
 async def help(ctx):
     """
     Custom Help command with fixed UMN Maroon color
@@ -948,8 +2292,11 @@ async def help(ctx):
     embed.add_field(
         name="📊 Historical Data",
         value="`!grade [Course]` - Historical distribution\n"
-              "`!compare [C1], [C2]` - Side-by-side GPA\n"
-              "`!stats [Course]` - Deep dive stats",
+              "`!compare [C1], [C2], ...` - Side-by-side GPA (up to 10)\n"
+              "`!stats [Course]` - Deep dive stats\n"
+              "`!sectionstats [Course]` - Easiest vs hardest sections\n"
+              "`!prof [Name]` - An instructor across all their courses\n"
+              "`!similar [Course]` - Similar courses, but easier",
         inline=False
     )
 
@@ -967,7 +2314,8 @@ async def help(ctx):
         name="💡 Discovery",
         value="`!search [Keyword]` - Find courses\n"
               "`!subject [DEPT]` - List dept courses\n"
-              "`!optimize [C1, C2...]` - Find easiest sections",
+              "`!optimize [C1, C2...]` - Find easiest sections\n"
+              "`!campus [Code]` - Show or set this server's campus",
         inline=False
     )
 
@@ -975,7 +2323,54 @@ async def help(ctx):
 
     await ctx.send(embed=embed)
 
+# ============================
+# SLASH COMMAND AUTOCOMPLETE
+# ============================
+
+def autocomplete_choices(index, current, label=lambda value: value):
+    start = time.perf_counter()
+    # Discord rejects the whole response if any choice's name or value is over 100 characters
+    labels = (label(value) for value in index.complete(current))
+    choices = [app_commands.Choice(name=text, value=text) for text in labels if len(text) <= 100]
+    metrics.AUTOCOMPLETE_LATENCY.observe(time.perf_counter() - start)
+    return choices
+
+
+def campus_index(indexes, interaction):
+    """The completion index for the campus of the server the user is typing in"""
+    return indexes.get(guild_campus(interaction.guild_id)) or PrefixIndex()
+
+
+async def course_autocomplete(interaction, current: str):
+    return autocomplete_choices(campus_index(course_indexes, interaction), current)
+
+
+async def subject_autocomplete(interaction, current: str):
+    return autocomplete_choices(campus_index(subject_indexes, interaction), current)
+
+
+async def instructor_autocomplete(interaction, current: str):
+    return autocomplete_choices(campus_index(instructor_name_indexes, interaction), current)
+
+
+async def compare_autocomplete(interaction, current: str):
+    # Complete the course after the last comma, keeping the ones already typed
+    done, _, typing = current.rpartition(",")
+    prefix = ", ".join(normalize_course(part) for part in done.split(",") if part.strip())
+    return autocomplete_choices(
+        campus_index(course_indexes, interaction), typing, label=lambda value: f"{prefix}, {value}" if prefix else value
+    )
+
+
+for command in (grade, instructor, stats, sectionstats, similar, schedule, sections, full, bestinstructor):
+    command.autocomplete('course_name')(course_autocomplete)
+for command in (department, pick):
+    command.autocomplete('dept')(subject_autocomplete)
+compare.autocomplete('args')(compare_autocomplete)
+prof.autocomplete('name')(instructor_autocomplete)
+
 # ============================
 # RUN BOT
 # ============================
-bot.run(TOKEN)
+if __name__ == "__main__":
+    bot.run(TOKEN)
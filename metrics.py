@@ -0,0 +1,262 @@
+"""
+Lightweight in-process metrics with a Prometheus text exposition endpoint.
+
+No client library needed: counters, gauges and histograms are kept in plain
+dicts keyed by label values, and render() produces the text format that
+Prometheus (or `curl localhost:9108/metrics`) can read.
+"""
+import threading
+import time
+
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _label_text(self.labelnames, key), value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = self.header()
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def time(self, **labels):
+        """Context manager that observes the elapsed time of its block"""
+        return _Timer(self, labels)
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, state in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, state['counts']):
+                    cumulative += count
+                    labels = _label_text(self.labelnames, key, [("le", _format_value(float(bound)))])
+                    out.append((f"{self.name}_bucket", labels, cumulative))
+                labels = _label_text(self.labelnames, key)
+                out.append((f"{self.name}_sum", labels, state['sum']))
+                out.append((f"{self.name}_count", labels, state['count']))
+        return out
+
+    def get(self, **labels):
+        state = self._values.get(self._key(labels))
+        return dict(state) if state else {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def add_collector(self, collector):
+        """Register a callable run just before each scrape (for computed gauges)"""
+        self.collectors.append(collector)
+
+    def render(self):
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ============================
+# BOT METRICS
+# ============================
+
+COMMAND_LATENCY = Histogram(
+    "umnbot_command_duration_seconds", "Time spent running a bot command", ["command", "status"])
+COMMANDS_IN_FLIGHT = Gauge(
+    "umnbot_commands_in_flight", "Commands currently running", ["command"])
+COMMAND_ERRORS = Counter(
+    "umnbot_command_errors_total", "Commands that raised, by error type", ["command", "error"])
+
+THROTTLED = Counter(
+    "umnbot_commands_throttled_total", "Commands rejected by rate limits, by limit hit", ["scope"])
+DISPATCH_WAIT = Histogram(
+    "umnbot_dispatch_wait_seconds", "Time a prefix command spent queued before a worker picked it up")
+DISPATCH_QUEUE_DEPTH = Gauge(
+    "umnbot_dispatch_queue_depth", "Prefix commands waiting for a worker")
+
+UPSTREAM_LATENCY = Histogram(
+    "umnbot_schedulebuilder_request_duration_seconds", "Schedule Builder request latency", ["type"])
+UPSTREAM_IN_FLIGHT = Gauge(
+    "umnbot_schedulebuilder_requests_in_flight", "Schedule Builder requests currently open", ["type"])
+UPSTREAM_RESPONSES = Counter(
+    "umnbot_schedulebuilder_responses_total",
+    "Schedule Builder responses by HTTP status (or 'timeout'/'error')", ["type", "status"])
+UPSTREAM_TIMEOUTS = Counter(
+    "umnbot_schedulebuilder_timeouts_total", "Schedule Builder requests that timed out", ["type"])
+
+UPSTREAM_CIRCUIT_OPEN = Gauge(
+    "umnbot_schedulebuilder_circuit_open", "1 while the Schedule Builder circuit breaker is failing fast")
+UPSTREAM_SHORT_CIRCUITS = Counter(
+    "umnbot_schedulebuilder_short_circuits_total", "Schedule Builder requests skipped by the open breaker", ["type"])
+UPSTREAM_STALE_SERVED = Counter(
+    "umnbot_schedulebuilder_stale_served_total",
+    "Expired Schedule Builder responses served ('revalidating' or 'unavailable')", ["type", "reason"])
+
+AUTOCOMPLETE_LATENCY = Histogram(
+    "umnbot_autocomplete_duration_seconds", "Time to build slash-command autocomplete choices", [],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05))
+
+DISCORD_API_CALLS = Counter(
+    "umnbot_discord_api_calls_total", "Discord message sends and edits made by commands", ["command", "call"])
+DISCORD_CALLS_PER_COMMAND = Histogram(
+    "umnbot_discord_api_calls_per_command", "Discord sends and edits per command invocation", ["command"],
+    buckets=(1, 2, 3, 4, 6, 10))
+
+API_REQUESTS = Counter(
+    "umnbot_api_requests_total", "HTTP API requests by endpoint and status", ["endpoint", "status"])
+API_LATENCY = Histogram(
+    "umnbot_api_request_duration_seconds", "HTTP API request latency", ["endpoint"])
+
+SHARD_LATENCY = Gauge(
+    "umnbot_shard_latency_seconds", "Gateway heartbeat latency per shard", ["shard"])
+
+CACHE_REQUESTS = Counter(
+    "umnbot_cache_requests_total", "Cache lookups by result", ["cache", "result"])
+CACHE_HIT_RATIO = Gauge(
+    "umnbot_cache_hit_ratio", "Fraction of cache lookups that hit since startup", ["cache"])
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _update_hit_ratios():
+    caches = {key[0] for key in list(CACHE_REQUESTS._values)}
+    for cache in caches:
+        hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+        total = hits + CACHE_REQUESTS.get(cache=cache, result="miss")
+        CACHE_HIT_RATIO.set(hits / total if total else 0.0, cache=cache)
+
+
+REGISTRY.add_collector(_update_hit_ratios)
+
+
+# ============================
+# EXPOSITION ENDPOINT
+# ============================
+
+async def _handle_metrics(request):
+    return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8",
+                        headers={"X-Content-Type-Options": "nosniff"})
+
+
+async def start_metrics_server(host="127.0.0.1", port=9108):
+    """Serve /metrics from inside the bot's event loop; returns the AppRunner"""
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,356 @@
+"""
+Local stand-in for schedulebuilder.umn.edu/api.php
+
+Speaks the same `api.php?type=course|sections|courses` query interface as the
+real Schedule Builder so the bot can be benchmarked offline. Point the bot at it
+with:
+
+    SCHEDULE_BUILDER_URL=http://127.0.0.1:8089/api.php python main.py
+
+Modes:
+    replay            serve recorded fixtures from fixtures/schedulebuilder/
+                      when one exists for the query
+    --record          proxy misses to the real API and save the responses
+    synthesize (default, --no-synthesize to turn off)
+                      invent deterministic responses from CLASS_DATA for the
+                      requested campus when no fixture exists, so the mock
+                      answers offline (CI, benchmarks) without any recordings
+
+Fault injection:
+    --latency-ms / --jitter-ms   added delay per request
+    --error-rate                 fraction of requests answered with a 500
+    --timeout-rate               fraction of requests that hang past the client timeout
+    --rate-limit / --burst       token bucket, over-limit requests get a 429 + Retry-After
+"""
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import random
+import time
+
+import pandas as pd
+from aiohttp import web, ClientSession, ClientTimeout
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BASE_DIR, "fixtures", "schedulebuilder")
+UPSTREAM_URL = "https://schedulebuilder.umn.edu/api.php"
+
+API_TYPES = ("course", "sections", "courses")
+
+
+class MockConfig:
+    """Runtime knobs for the mock server (all can be changed while it runs)"""
+
+    def __init__(self, fixture_dir=FIXTURE_DIR, record=False, synthesize=True,
+                 latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, timeout_rate=0.0,
+                 hang_seconds=30.0, rate_limit=0.0, burst=None, upstream_url=UPSTREAM_URL):
+        self.fixture_dir = fixture_dir
+        self.record = record
+        self.synthesize = synthesize
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else max(1.0, rate_limit)
+        self.upstream_url = upstream_url
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+# ============================
+# FIXTURES
+# ============================
+
+def fixture_path(fixture_dir, params):
+    """Map a query string onto its fixture file"""
+    api_type = params.get('type', '')
+    campus = _campus(params)
+    term = params.get('term', 'ANY')
+
+    if api_type == 'courses':
+        subject = params.get('subject', 'ALL')
+        name = f"{campus}_{term}_{subject}.json"
+    else:
+        name = f"{campus}_{term}_{params.get('subject', '')}_{params.get('catalog_nbr', '')}.json"
+
+    return os.path.join(fixture_dir, api_type, name.replace("/", "_"))
+
+
+def load_fixture(fixture_dir, params):
+    """Return the recorded payload for a query, or None"""
+    path = fixture_path(fixture_dir, params)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fixture(fixture_dir, params, payload):
+    path = fixture_path(fixture_dir, params)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+# ============================
+# SYNTHETIC CATALOG
+# ============================
+
+def _campus(params):
+    return params.get('campus') or params.get('institution') or 'UMNTC'
+
+
+class SyntheticCatalog:
+    """Deterministic fake responses built from the historical grade data, per campus"""
+
+    DAYS = ["MW", "TTh", "MWF", "M", "T", "W", "Th", "F"]
+    TIMES = [("08:15", "09:05"), ("09:05", "09:55"), ("10:10", "11:00"), ("11:15", "12:30"),
+             ("13:00", "14:15"), ("14:30", "15:45"), ("16:00", "17:15"), ("18:30", "21:00")]
+    BUILDINGS = ["Keller Hall", "Smith Hall", "Tate Hall", "Amundson Hall", "Lind Hall",
+                 "Anderson Hall", "Bruininks Hall", "Mechanical Engineering"]
+
+    def __init__(self, data_dir=os.path.join(BASE_DIR, "CLASS_DATA")):
+        courses = {}
+        for path in sorted(glob.glob(os.path.join(data_dir, "*_clean*_data.csv"))):
+            header = pd.read_csv(path, nrows=0).columns
+            instructor_col = 'HR_NAME' if 'HR_NAME' in header else 'NAME'
+            campus_cols = [col for col in ('CAMPUS', 'INSTITUTION') if col in header]
+            part = pd.read_csv(path, dtype=str,
+                               usecols=['SUBJECT', 'CATALOG_NBR', 'DESCR', instructor_col, *campus_cols])
+            part = part.rename(columns={instructor_col: 'HR_NAME'})
+            # Same rule as the bot: CAMPUS, else INSTITUTION, else (Fall 2022) Twin Cities
+            campus = pd.Series("UMNTC", index=part.index)
+            for col in reversed(campus_cols):
+                campus = part[col].fillna(campus)
+            part = part.assign(CAMPUS=campus)
+            for row in part.drop_duplicates(subset=['CAMPUS', 'SUBJECT', 'CATALOG_NBR', 'HR_NAME']).itertuples(
+                    index=False):
+                key = (row.CAMPUS, row.SUBJECT, row.CATALOG_NBR)
+                entry = courses.setdefault(key, {'descr': row.DESCR, 'instructors': []})
+                if isinstance(row.HR_NAME, str) and row.HR_NAME not in entry['instructors']:
+                    entry['instructors'].append(row.HR_NAME)
+        self.courses = courses
+        print(f"✅ Synthetic catalog: {len(courses):,} courses")
+
+    def _rng(self, *parts):
+        seed = hashlib.sha1("|".join(parts).encode()).hexdigest()
+        return random.Random(int(seed[:12], 16))
+
+    def course(self, params):
+        key = (_campus(params), params.get('subject', ''), params.get('catalog_nbr', ''))
+        entry = self.courses.get(key)
+        if entry is None:
+            return None
+        rng = self._rng('course', *key)
+        return {
+            'subject': key[1],
+            'catalog_nbr': key[2],
+            'title': entry['descr'],
+            'credits': str(rng.choice([1, 2, 3, 3, 3, 4, 4])),
+            'grading': rng.choice(["A-F only", "A-F or Audit", "S-N only", "Student Option"]),
+        }
+
+    def sections(self, params):
+        key = (_campus(params), params.get('subject', ''), params.get('catalog_nbr', ''))
+        entry = self.courses.get(key)
+        if entry is None:
+            return None
+        rng = self._rng('sections', params.get('term', ''), *key)
+        instructors = entry['instructors'] or ["TBA"]
+
+        sections = []
+        for i in range(rng.choice([1, 1, 2, 3, 4, 6, 10])):
+            start, end = rng.choice(self.TIMES)
+            capacity = rng.choice([20, 24, 35, 40, 60, 120, 250])
+            sections.append({
+                'section': f"{i + 1:03d}",
+                'instructors': [rng.choice(instructors)],
+                'days': rng.choice(self.DAYS),
+                'start_time': start,
+                'end_time': end,
+                'location': f"{rng.choice(self.BUILDINGS)} {rng.randint(100, 450)}",
+                'enrollment_total': rng.randint(int(capacity * 0.6), capacity),
+                'class_capacity': capacity,
+            })
+        return {'sections': sections}
+
+    def catalog(self, params):
+        subject = params.get('subject')
+        campus = _campus(params)
+        return [
+            {'subject': subj, 'catalog_nbr': nbr, 'title': entry['descr']}
+            for (course_campus, subj, nbr), entry in sorted(self.courses.items())
+            if course_campus == campus and (not subject or subject in ('ALL', subj))
+        ]
+
+    def respond(self, params):
+        api_type = params.get('type')
+        if api_type == 'course':
+            return self.course(params)
+        if api_type == 'sections':
+            return self.sections(params)
+        if api_type == 'courses':
+            return self.catalog(params)
+        return None
+
+
+# ============================
+# SERVER
+# ============================
+
+class MockScheduleBuilder:
+    """aiohttp handler that replays fixtures and injects faults"""
+
+    def __init__(self, config):
+        self.config = config
+        self.synthetic = SyntheticCatalog() if config.synthesize else None
+        self.tokens = self.config.burst
+        self.last_refill = time.monotonic()
+        self.stats = {'requests': 0, 'by_type': {}, 'by_status': {}}
+
+    def _take_token(self):
+        """Token bucket for throttling; returns seconds to wait, 0 if allowed"""
+        rate = self.config.rate_limit
+        if rate <= 0:
+            return 0
+        now = time.monotonic()
+        self.tokens = min(self.config.burst, self.tokens + (now - self.last_refill) * rate)
+        self.last_refill = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / rate
+
+    def _count(self, api_type, status):
+        self.stats['requests'] += 1
+        self.stats['by_type'][api_type] = self.stats['by_type'].get(api_type, 0) + 1
+        self.stats['by_status'][str(status)] = self.stats['by_status'].get(str(status), 0) + 1
+
+    def _reply(self, api_type, status, payload=None, headers=None):
+        self._count(api_type, status)
+        if payload is None:
+            return web.Response(status=status, headers=headers)
+        return web.json_response(payload, status=status, headers=headers)
+
+    async def _fetch_upstream(self, params):
+        async with ClientSession(timeout=ClientTimeout(total=15)) as session:
+            async with session.get(self.config.upstream_url, params=params) as resp:
+                if resp.status != 200:
+                    return resp.status, None
+                return 200, await resp.json(content_type=None)
+
+    async def handle_api(self, request):
+        params = dict(request.query)
+        api_type = params.get('type', '')
+        config = self.config
+
+        if api_type not in API_TYPES:
+            return self._reply(api_type, 400, {'error': f"unknown type '{api_type}'"})
+
+        retry_after = self._take_token()
+        if retry_after:
+            return self._reply(api_type, 429, {'error': 'rate limited'},
+                               headers={'Retry-After': f"{retry_after:.2f}"})
+
+        delay = config.latency_ms + (random.uniform(-config.jitter_ms, config.jitter_ms) if config.jitter_ms else 0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if config.timeout_rate and random.random() < config.timeout_rate:
+            await asyncio.sleep(config.hang_seconds)
+            return self._reply(api_type, 504)
+
+        if config.error_rate and random.random() < config.error_rate:
+            return self._reply(api_type, 500, {'error': 'injected failure'})
+
+        payload = load_fixture(config.fixture_dir, params)
+
+        if payload is None and config.record:
+            status, payload = await self._fetch_upstream(params)
+            if payload is None:
+                return self._reply(api_type, status)
+            save_fixture(config.fixture_dir, params, payload)
+
+        if payload is None and self.synthetic is not None:
+            payload = self.synthetic.respond(params)
+
+        if payload is None:
+            return self._reply(api_type, 404)
+        return self._reply(api_type, 200, payload)
+
+    async def handle_stats(self, request):
+        return web.json_response({**self.stats, 'config': self.config.to_dict()})
+
+    async def handle_config(self, request):
+        """Change fault injection on the fly, e.g. to simulate an outage mid-benchmark"""
+        try:
+            updates = json.loads(await request.text())
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return web.json_response({'error': f"body must be a JSON object: {e}"}, status=400)
+        if not isinstance(updates, dict):
+            return web.json_response({'error': "body must be a JSON object"}, status=400)
+        unknown = sorted(set(updates) - set(self.config.to_dict()))
+        if unknown:
+            return web.json_response({'error': f"unknown settings: {', '.join(unknown)}"}, status=400)
+
+        for key, value in updates.items():
+            setattr(self.config, key, value)
+        return web.json_response(self.config.to_dict())
+
+
+def make_app(config=None):
+    """Build the aiohttp app (also used in-process by the benchmarks)"""
+    mock = MockScheduleBuilder(config or MockConfig())
+    app = web.Application()
+    app['mock'] = mock
+    app.router.add_get('/api.php', mock.handle_api)
+    app.router.add_get('/_stats', mock.handle_stats)
+    app.router.add_post('/_config', mock.handle_config)
+    return app
+
+
+async def start_mock_server(config=None, host="127.0.0.1", port=0):
+    """Start the server inside a running loop; returns (runner, api_url)"""
+    runner = web.AppRunner(make_app(config))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}/api.php"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Schedule Builder stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="fixture directory")
+    parser.add_argument("--record", action="store_true", help="proxy misses to the real API and save them")
+    parser.add_argument("--synthesize", action=argparse.BooleanOptionalAction, default=True,
+                        help="invent responses from CLASS_DATA on a fixture miss (default on)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/second, 0 = unlimited")
+    parser.add_argument("--burst", type=float, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        fixture_dir=args.fixtures, record=args.record, synthesize=args.synthesize,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate, hang_seconds=args.hang_seconds,
+        rate_limit=args.rate_limit, burst=args.burst,
+    )
+    print(f"🧪 Mock Schedule Builder on http://{args.host}:{args.port}/api.php")
+    web.run_app(make_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Button pagination for long result lists.
+
+A command formats its full result list once and hands it to send_paginated().
+The formatted lines are kept in a short-lived cache keyed by the message they
+were sent in, and the ◀ / ▶ buttons just slice that stored list, so paging
+never reruns the query or calls Schedule Builder again. Entries expire after
+PAGE_TTL seconds (the buttons are removed at the same time).
+"""
+import math
+import time
+from collections import OrderedDict
+
+import discord
+
+import metrics
+from responses import respond
+
+
+class ResultPages:
+    """A formatted result list plus how to turn one slice of it into an embed"""
+
+    def __init__(self, lines, per_page, render, owner_id=None):
+        self.lines = lines
+        self.per_page = per_page
+        self.render = render
+        self.owner_id = owner_id
+
+    @property
+    def page_count(self):
+        return max(1, math.ceil(len(self.lines) / self.per_page))
+
+    def embed(self, page):
+        """render(lines on the page, page index, page count) -> discord.Embed"""
+        start = page * self.per_page
+        return self.render(self.lines[start:start + self.per_page], page, self.page_count)
+
+
+class PageCache:
+    """Result sets behind paginated messages, keyed by message id"""
+
+    def __init__(self, ttl=600, maxsize=500):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def put(self, message_id, pages):
+        self.entries[message_id] = (time.monotonic() + self.ttl, pages)
+        self.entries.move_to_end(message_id)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def get(self, message_id):
+        entry = self.entries.get(message_id)
+        if entry is not None and entry[0] < time.monotonic():
+            del self.entries[message_id]
+            entry = None
+        metrics.record_cache('pages', entry is not None)
+        return entry[1] if entry else None
+
+    def discard(self, message_id):
+        self.entries.pop(message_id, None)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PageView(discord.ui.View):
+    def __init__(self, cache, page_count, owner_id=None):
+        super().__init__(timeout=cache.ttl)
+        self.cache = cache
+        self.page = 0
+        self.page_count = page_count
+        self.owner_id = owner_id
+        self.message = None
+        self._sync_buttons()
+
+    def _sync_buttons(self):
+        self.previous.disabled = self.page == 0
+        self.next.disabled = self.page >= self.page_count - 1
+        self.position.label = f"{self.page + 1}/{self.page_count}"
+
+    async def interaction_check(self, interaction):
+        if self.owner_id is not None and interaction.user.id != self.owner_id:
+            await interaction.response.send_message(
+                "Only the person who ran this command can page through it. Run it yourself to get your own copy!",
+                ephemeral=True
+            )
+            return False
+        return True
+
+    async def _turn(self, interaction, step):
+        pages = self.cache.get(interaction.message.id)
+        if pages is None:
+            self.stop()
+            await interaction.response.edit_message(view=None)
+            await interaction.followup.send("⌛ These results have expired, run the command again.", ephemeral=True)
+            return
+
+        self.page = max(0, min(self.page + step, pages.page_count - 1))
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=pages.embed(self.page), view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction, button):
+        await self._turn(interaction, -1)
+
+    @discord.ui.button(label="1/1", style=discord.ButtonStyle.secondary, disabled=True)
+    async def position(self, interaction, button):
+        pass
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction, button):
+        await self._turn(interaction, 1)
+
+    async def on_timeout(self):
+        if self.message is None:
+            return
+        self.cache.discard(self.message.id)
+        try:
+            await self.message.edit(view=None)
+        except discord.HTTPException:
+            pass
+
+
+async def send_paginated(ctx, cache, pages, content=None):
+    """Send page 1 of pages, with buttons and a cache entry only if there is more than one page"""
+    if pages.page_count == 1:
+        return await respond(ctx, content, embed=pages.embed(0))
+
+    view = PageView(cache, pages.page_count, pages.owner_id)
+    message = await respond(ctx, content, embed=pages.embed(0), view=view)
+    view.message = message
+    cache.put(message.id, pages)
+    return message
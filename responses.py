@@ -0,0 +1,84 @@
+"""
+One response message per command.
+
+respond(ctx, ...) sends a command's message the first time it's called and
+edits that same message every time after, so "🔍 Searching..." placeholders,
+progress updates and the final result cost one send plus edits instead of a
+new message each. Embeds are packed into as few messages as Discord allows
+(10 embeds and 6000 characters per message).
+
+Every send and edit made for a command is counted on the context and in the
+umnbot_discord_api_calls_total metric, and after_invoke records the per-command
+total, so it's easy to see which commands spend the per-channel rate limit.
+"""
+import metrics
+
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+
+def pack_embeds(embeds):
+    """Split embeds into per-message groups within Discord's count and size limits"""
+    groups = []
+    current, size = [], 0
+    for embed in embeds:
+        length = len(embed)
+        if current and (len(current) == MAX_EMBEDS or size + length > MAX_EMBED_CHARS):
+            groups.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += length
+    if current:
+        groups.append(current)
+    return groups
+
+
+def count_call(ctx, call):
+    ctx.api_calls = getattr(ctx, 'api_calls', 0) + 1
+    command = ctx.command.qualified_name if getattr(ctx, 'command', None) else "unknown"
+    metrics.DISCORD_API_CALLS.inc(command=command, call=call)
+
+
+def track(ctx):
+    """Count the context's direct ctx.send calls too (safe to call more than once)"""
+    if getattr(ctx, 'api_calls', None) is not None:
+        return
+    ctx.api_calls = 0
+    send = ctx.send
+
+    async def counted_send(*args, **kwargs):
+        count_call(ctx, "send")
+        return await send(*args, **kwargs)
+
+    ctx.send = counted_send
+
+
+def _message_kwargs(embeds, view):
+    kwargs = {'embeds': embeds} if embeds else {}
+    if view is not None:
+        kwargs['view'] = view
+    return kwargs
+
+
+async def respond(ctx, content=None, *, embed=None, embeds=None, view=None):
+    """
+    Send the command's response, or edit it in place if one was already sent.
+    Returns the (first) message.
+    """
+    track(ctx)
+    embeds = list(embeds) if embeds is not None else ([embed] if embed is not None else [])
+    groups = pack_embeds(embeds) or [[]]
+
+    message = getattr(ctx, 'response_message', None)
+    if message is None:
+        message = await ctx.send(content, **_message_kwargs(groups[0], view))
+        ctx.response_message = message
+    else:
+        count_call(ctx, "edit")
+        # Passing everything replaces the placeholder's text, embeds and buttons
+        await message.edit(content=content, embeds=groups[0], view=view)
+
+    # Only overflow beyond one message's limits needs another send
+    for group in groups[1:]:
+        await ctx.send(**_message_kwargs(group, None))
+    return message
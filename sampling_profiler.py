@@ -0,0 +1,105 @@
+"""
+Low-overhead sampling profiler for the running bot.
+
+A background thread snapshots every other thread's stack with
+sys._current_frames() at a fixed interval. Samples are aggregated into
+collapsed stacks ("frame;frame;frame count"), the input format for
+flamegraph.pl / speedscope / inferno, and into a top-functions summary.
+Nothing is installed on the event loop thread, so profiling live traffic
+only costs the sampling thread's time.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Flamegraph-compatible collapsed stacks, one per line"""
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def top_functions(self, limit=30):
+        """Plain-text table of the hottest functions by self and inclusive samples"""
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack[1:]):
+                inclusive[label] += count
+
+        total = sum(self.stacks.values()) or 1
+        lines = [
+            f"Sampled {self.samples} ticks over {self.duration:.1f}s "
+            f"(interval {self.interval * 1000:.0f} ms, {total} thread samples)",
+            "",
+            f"{'self %':>7} {'total %':>8}  function",
+        ]
+        for label, count in own.most_common(limit):
+            lines.append(f"{count / total * 100:>6.1f}% {inclusive[label] / total * 100:>7.1f}%  {label}")
+
+        lines.extend(["", "Hottest call paths (inclusive):"])
+        for label, count in inclusive.most_common(limit):
+            lines.append(f"{count / total * 100:>6.1f}%  {label}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, directory):
+        """Write collapsed stacks and the summary; returns (collapsed_path, summary_path)"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        collapsed_path = os.path.join(directory, f"profile-{stamp}.collapsed")
+        summary_path = os.path.join(directory, f"profile-{stamp}-top.txt")
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(self.top_functions())
+        return collapsed_path, summary_path
@@ -0,0 +1,153 @@
+"""
+Section-level grade totals.
+
+One row per (course, term, section, instructor, component) with its
+letter-grade counts (so a co-taught section has a row per instructor), kept
+as flat numpy arrays sorted by course, so all of a course's sections are one
+contiguous slice found with a binary search. Text columns are stored as small
+integer codes into a shared list of names.
+"""
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+KEYS = ['FULL_NAME', 'TERM', 'CLASS_SECTION', 'HR_NAME', 'COMPONENT_MAIN']
+
+
+def _codes(values):
+    """(int32 codes, list of names) for a column"""
+    codes, names = pd.factorize(values, sort=True)
+    return codes.astype(np.int32), list(names)
+
+
+def explained_share(values, weights, groups):
+    """Share of the weighted variance of values that the grouping explains (0..1)"""
+    total = weights.sum()
+    if total == 0 or len(values) < 2:
+        return 0.0
+    mean = (weights * values).sum() / total
+    total_ss = (weights * (values - mean) ** 2).sum()
+    if total_ss == 0:
+        return 0.0
+
+    _, inverse = np.unique(groups, return_inverse=True)
+    group_weight = np.bincount(inverse, weights=weights)
+    group_mean = np.bincount(inverse, weights=weights * values) / np.maximum(group_weight, 1e-12)
+    between_ss = (group_weight * (group_mean - mean) ** 2).sum()
+    return float(between_ss / total_ss)
+
+
+class SectionCube:
+    def __init__(self):
+        self.courses = []
+        self.row_course = np.zeros(0, dtype=np.int32)
+        self.terms = np.zeros(0, dtype=np.int16)
+        self.sections = np.zeros(0, dtype=np.int32)
+        self.section_names = []
+        self.instructors = np.zeros(0, dtype=np.int32)
+        self.instructor_names = []
+        self.components = np.zeros(0, dtype=np.int32)
+        self.component_names = []
+        self.counts = np.zeros((0, 0), dtype=np.int32)
+        self.students = np.zeros(0, dtype=np.int32)
+        self.graded = np.zeros(0, dtype=np.int32)
+        self.gpa = np.zeros(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.gpa)
+
+    @classmethod
+    def build(cls, frame, grade_order, grade_points):
+        if 'COMPONENT_MAIN' not in frame.columns:
+            # Older exports don't say whether a section is a lecture, lab, ...
+            frame = frame.assign(COMPONENT_MAIN='')
+        frame = frame[KEYS + ['CRSE_GRADE_OFF', 'GRADE_HDCNT']].fillna(
+            {'TERM': '0', 'CLASS_SECTION': '?', 'HR_NAME': "Unknown", 'COMPONENT_MAIN': ''})
+
+        by_section = frame.groupby(KEYS + ['CRSE_GRADE_OFF'])['GRADE_HDCNT'].sum().unstack(fill_value=0)
+        index = by_section.index
+
+        cube = cls()
+        course_codes, cube.courses = _codes(index.get_level_values('FULL_NAME'))
+        cube.row_course = course_codes
+        cube.terms = pd.to_numeric(index.get_level_values('TERM'), errors='coerce').fillna(0).to_numpy(np.int16)
+        cube.sections, cube.section_names = _codes(index.get_level_values('CLASS_SECTION'))
+        cube.instructors, cube.instructor_names = _codes(index.get_level_values('HR_NAME'))
+        cube.components, cube.component_names = _codes(index.get_level_values('COMPONENT_MAIN'))
+
+        cube.counts = by_section.reindex(columns=grade_order, fill_value=0).to_numpy(np.int32)
+        cube.students = by_section.sum(axis=1).to_numpy(np.int32)
+        cube.graded = cube.counts.sum(axis=1, dtype=np.int32)
+        points = cube.counts @ np.array([grade_points[g] for g in grade_order])
+        cube.gpa = np.divide(points, cube.graded, out=np.zeros(len(points)), where=cube.graded > 0).astype(np.float32)
+        return cube
+
+    def to_snapshot(self):
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_snapshot(cls, state):
+        cube = cls()
+        cube.__dict__.update(state)
+        return cube
+
+    def rows(self, course):
+        """Row range holding every section of course (empty if unknown)"""
+        i = bisect_left(self.courses, course)
+        if i == len(self.courses) or self.courses[i] != course:
+            return slice(0, 0)
+        # Rows are sorted by course, so the course's rows sit between these two
+        lo = int(np.searchsorted(self.row_course, i, side='left'))
+        hi = int(np.searchsorted(self.row_course, i, side='right'))
+        return slice(lo, hi)
+
+    def distinct_sections(self, rows):
+        """Number of different (term, section) among rows, counting a co-taught section once"""
+        return len(np.unique(self.terms[rows].astype(np.int64) << 32 | self.sections[rows]))
+
+    def component(self, row):
+        return self.component_names[self.components[row]] or None
+
+    def summary(self, course, min_students=5):
+        """
+        Section-level breakdown of one course, or None without enough graded sections.
+        Sections with fewer than min_students letter grades are skipped as noise.
+        """
+        window = self.rows(course)
+        rows = np.arange(window.start, window.stop)
+        rows = rows[self.graded[rows] >= min_students]
+        if len(rows) == 0:
+            return None
+
+        gpa = self.gpa[rows].astype(np.float64)
+        weights = self.graded[rows].astype(np.float64)
+        mean = float((gpa * weights).sum() / weights.sum())
+
+        components = {}
+        for code in np.unique(self.components[rows]):
+            name = self.component_names[code]
+            if not name:
+                continue
+            mask = self.components[rows] == code
+            components[name] = {
+                'sections': self.distinct_sections(rows[mask]),
+                'students': int(weights[mask].sum()),
+                'gpa': float((gpa[mask] * weights[mask]).sum() / weights[mask].sum()),
+                'low': float(gpa[mask].min()),
+                'high': float(gpa[mask].max()),
+            }
+
+        return {
+            'sections': self.distinct_sections(rows),
+            'gpa': mean,
+            'std': float(np.sqrt((weights * (gpa - mean) ** 2).sum() / weights.sum())),
+            'easiest': int(rows[np.argmax(gpa)]),
+            'hardest': int(rows[np.argmin(gpa)]),
+            'components': components,
+            'explained': {
+                'instructor': explained_share(gpa, weights, self.instructors[rows]),
+                'term': explained_share(gpa, weights, self.terms[rows]),
+                'component': explained_share(gpa, weights, self.components[rows]) if len(components) > 1 else 0.0,
+            },
+        }
@@ -0,0 +1,98 @@
+"""
+Run the bot as several processes, each owning a contiguous range of shards.
+
+The grade data and every derived cache are built once in the parent, then the
+shard processes are forked from it, so they start with the data already in
+memory and share those pages copy-on-write instead of each loading its own
+copy. Each child runs an AutoShardedBot for its shard range and serves its own
+metrics port (METRICS_PORT + process index).
+
+Usage:
+    python shard_launcher.py --shards 8 --processes 4
+"""
+import argparse
+import gc
+import multiprocessing
+import os
+import sys
+import time
+
+
+def shard_ranges(shard_count, processes):
+    """Split shard ids 0..N-1 into contiguous, evenly sized chunks"""
+    processes = max(1, min(processes, shard_count))
+    base, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for i in range(processes):
+        size = base + (1 if i < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def run_shards(index, shard_count, shard_ids):
+    import main
+
+    # The bot object was built in the parent before the fork; point it at this
+    # process's slice of shards before connecting
+    main.bot.shard_count = shard_count
+    main.bot.shard_ids = shard_ids
+    if main.METRICS_PORT:
+        main.METRICS_PORT += index
+
+    print(f"🧩 Process {index} (pid {os.getpid()}) running shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count}")
+    main.bot.run(main.TOKEN)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the bot across several shard processes")
+    parser.add_argument("--shards", type=int, default=None, help="total shard count (default: one per process)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--restart-delay", type=float, default=5.0)
+    args = parser.parse_args()
+
+    shard_count = args.shards or args.processes
+    os.environ["SHARD_COUNT"] = str(shard_count)
+
+    import main as bot_main
+
+    start = time.perf_counter()
+    bot_main.load_data()
+    print(f"✅ Parent built grade data in {time.perf_counter() - start:.1f}s, forking shard processes")
+
+    # Move everything allocated so far out of the collector's view, so gc passes
+    # in the children don't touch (and un-share) the parent's pages
+    gc.collect()
+    gc.freeze()
+
+    ctx = multiprocessing.get_context("fork")
+    ranges = shard_ranges(shard_count, args.processes)
+    children = {}
+    for index, shard_ids in enumerate(ranges):
+        children[index] = ctx.Process(target=run_shards, args=(index, shard_count, shard_ids), daemon=False)
+        children[index].start()
+
+    try:
+        while True:
+            time.sleep(1)
+            for index, process in list(children.items()):
+                if process.is_alive():
+                    continue
+                print(f"⚠️ Shard process {index} exited with code {process.exitcode}, "
+                      f"restarting in {args.restart_delay:.0f}s")
+                time.sleep(args.restart_delay)
+                children[index] = ctx.Process(target=run_shards, args=(index, shard_count, ranges[index]))
+                children[index].start()
+    except KeyboardInterrupt:
+        for process in children.values():
+            process.terminate()
+        for process in children.values():
+            process.join()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        sys.exit("shard_launcher.py needs fork(); run one process per shard range with SHARD_IDS instead")
+    main()
@@ -0,0 +1,74 @@
+"""
+"Like this course, but easier" lookups.
+
+Each course is a point made of its letter-grade distribution (fractions of
+the 12 grades, so big and small courses are comparable) plus its level (the
+first digit of the catalog number). Courses in another department are pushed
+further away, but not ruled out.
+
+One campus has a few thousand courses, so a query is a brute-force pass over a
+float32 matrix: a couple of vector operations and an argpartition, well under a
+millisecond. That beats a tree index at this size and needs nothing beyond numpy.
+"""
+import numpy as np
+
+# Courses with fewer letter-graded students than this are too noisy to match on
+MIN_STUDENTS = 20
+
+# How much a level step (1xxx -> 2xxx) and a different department add to the
+# squared distance; for scale, two distributions that differ by 10 points in
+# one grade are 0.01 apart
+LEVEL_WEIGHT = 0.004
+DEPT_WEIGHT = 0.02
+
+
+def course_level(course):
+    """'CSCI 4041' -> 4 (0 when the number doesn't start with a digit)"""
+    number = course.split(" ", 1)[-1]
+    return int(number[0]) if number[:1].isdigit() else 0
+
+
+class SimilarityIndex:
+    def __init__(self, courses, counts, gpa):
+        graded = counts.sum(axis=1)
+        keep = np.flatnonzero(graded >= MIN_STUDENTS)
+
+        self.courses = [courses[i] for i in keep]
+        self.ids = {course: i for i, course in enumerate(self.courses)}
+        self.gpa = gpa[keep].astype(np.float32)
+        self.dists = (counts[keep] / graded[keep, None]).astype(np.float32)
+        self.levels = np.array([course_level(c) for c in self.courses], dtype=np.float32)
+
+        subjects = [c.split(" ", 1)[0] for c in self.courses]
+        codes = {subject: i for i, subject in enumerate(sorted(set(subjects)))}
+        self.subjects = np.array([codes[s] for s in subjects], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.courses)
+
+    def __contains__(self, course):
+        return course in self.ids
+
+    def distances(self, i):
+        """Squared distance from course i to every course"""
+        diff = self.dists - self.dists[i]
+        d = np.einsum('ij,ij->i', diff, diff)
+        d += LEVEL_WEIGHT * (self.levels - self.levels[i]) ** 2
+        d += DEPT_WEIGHT * (self.subjects != self.subjects[i])
+        return d
+
+    def easier_than(self, course, k=10, min_gain=0.01):
+        """[(course, gpa, distance)] for the k closest courses at least min_gain GPA higher, closest first"""
+        i = self.ids.get(course)
+        if i is None:
+            return []
+
+        d = self.distances(i)
+        d[self.gpa < self.gpa[i] + min_gain] = np.inf
+
+        k = min(k, int(np.isfinite(d).sum()))
+        if k == 0:
+            return []
+        nearest = np.argpartition(d, k - 1)[:k]
+        nearest = nearest[np.argsort(d[nearest], kind='stable')]
+        return [(self.courses[j], float(self.gpa[j]), float(d[j])) for j in nearest]
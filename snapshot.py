@@ -0,0 +1,112 @@
+"""
+Snapshot of the derived grade artifacts, for fast warm starts.
+
+Course aggregates, section cubes, instructor indexes and the autocomplete
+popularity tables take a couple of seconds to build from the grade rows but
+only change when the CSVs do. After a full build they're written to one file
+keyed by the dataset hash; on the next start with the same data they're
+mapped straight back in instead of rebuilt.
+
+File layout:
+    b"UMNSNAP1"          magic
+    uint64 (LE)          header length
+    header               JSON: format, dataset version, artifact tree
+    padding, arrays      raw numpy buffers, each 64-byte aligned
+
+Every numpy array in the artifact tree is replaced in the header by
+{"__array__": [dtype, shape, offset]} and stored as raw bytes after it;
+strings, numbers and lists go in the JSON. Loading parses the header and
+wraps read-only views around one mmap of the file, so restoring costs a JSON
+parse and the arrays are paged in by the OS as they're touched (and shared
+between processes mapping the same file).
+
+A snapshot is only used when its format and dataset version both match;
+anything else (no file, old layout, different data, a corrupt file) returns
+None and the caller rebuilds from the CSVs.
+"""
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b"UMNSNAP1"
+ALIGN = 64
+
+# Bump whenever what the artifacts hold changes, so old snapshots are rebuilt
+FORMAT = 1
+
+
+def _pack(value, arrays, offset):
+    """Swap arrays in a nested dict for blob references; returns (tree, next offset)"""
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        offset = -(-offset // ALIGN) * ALIGN
+        arrays.append((offset, array))
+        return {'__array__': [array.dtype.str, list(array.shape), offset]}, offset + array.nbytes
+    if isinstance(value, dict):
+        tree = {}
+        for key, item in value.items():
+            tree[key], offset = _pack(item, arrays, offset)
+        return tree, offset
+    return value, offset
+
+
+def _unpack(tree, buffer, base):
+    if isinstance(tree, dict):
+        ref = tree.get('__array__')
+        if ref is not None and len(tree) == 1:
+            dtype, shape, offset = ref
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape)) if shape else 1
+            if count == 0:
+                # Empty arrays can be aligned past the end of the file
+                return np.zeros(shape, dtype)
+            return np.frombuffer(buffer, dtype, count, base + offset).reshape(shape)
+        return {key: _unpack(item, buffer, base) for key, item in tree.items()}
+    return tree
+
+
+def save(path, version, artifacts):
+    """Write artifacts (nested dicts of arrays, lists and scalars) for dataset version"""
+    arrays = []
+    tree, _ = _pack(artifacts, arrays, 0)
+    header = json.dumps({'format': FORMAT, 'version': version, 'artifacts': tree},
+                        separators=(",", ":")).encode()
+    prefix = len(MAGIC) + 8 + len(header)
+    base = -(-prefix // ALIGN) * ALIGN
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        for offset, array in arrays:
+            f.write(b"\0" * (base + offset - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def load(path, version):
+    """The artifact tree saved for version, with arrays mapped from the file; None if unusable"""
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if buffer[:len(MAGIC)] != MAGIC:
+            return None
+        (length,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(buffer[start:start + length])
+        if header.get('format') != FORMAT or header.get('version') != version:
+            return None
+        base = -(-(start + length) // ALIGN) * ALIGN
+        return _unpack(header['artifacts'], buffer, base)
+    except (ValueError, KeyError, TypeError, struct.error) as e:
+        print(f"⚠️ Ignoring unreadable snapshot {path}: {e}")
+        return None
@@ -0,0 +1,70 @@
+"""
+UMN term codes, worked out from the date.
+
+A term code is '1' (for the 2000s), the two-digit year, and a season digit:
+3 = spring, 5 = summer, 9 = fall. So 1263 is Spring 2026 and 1269 is Fall 2026.
+
+The dates below follow the usual academic calendar closely enough for picking
+which term to show; they don't need to be exact to the day.
+"""
+from datetime import date
+
+SEASONS = {3: "Spring", 5: "Summer", 9: "Fall"}
+
+# (month, day) a term becomes the active one; it stays active until the next starts
+ACTIVE_FROM = {3: (1, 1), 5: (5, 20), 9: (8, 25)}
+
+# (years before the term's year, month, day) registration opens
+REGISTRATION_OPENS = {3: (1, 11, 1), 5: (0, 4, 1), 9: (0, 4, 1)}
+
+
+def term_code(year, season):
+    return f"{year // 1000 - 1}{year % 100:02d}{season}"
+
+
+def parse_term(code):
+    """'1269' -> (2026, 9)"""
+    code = str(code)
+    return 1900 + int(code[0]) * 100 + int(code[1:3]), int(code[3])
+
+
+def term_name(code):
+    """'1269' -> 'Fall 2026'"""
+    year, season = parse_term(code)
+    return f"{SEASONS.get(season, '?')} {year}"
+
+
+def next_term(code):
+    year, season = parse_term(code)
+    order = sorted(SEASONS)
+    i = order.index(season)
+    if i + 1 < len(order):
+        return term_code(year, order[i + 1])
+    return term_code(year + 1, order[0])
+
+
+def active_term(today=None):
+    """The term in session (or about to start) on the given date"""
+    today = today or date.today()
+    season = max(s for s, (month, day) in ACTIVE_FROM.items() if (today.month, today.day) >= (month, day))
+    return term_code(today.year, season)
+
+
+def registration_opens(code):
+    year, season = parse_term(code)
+    years_before, month, day = REGISTRATION_OPENS[season]
+    return date(year - years_before, month, day)
+
+
+def upcoming_terms(today=None):
+    """Terms after the active one that are already open for registration, soonest first"""
+    today = today or date.today()
+    terms = []
+    code = next_term(active_term(today))
+    # Registration never runs more than two terms ahead
+    for _ in range(2):
+        if registration_opens(code) > today:
+            break
+        terms.append(code)
+        code = next_term(code)
+    return terms
@@ -0,0 +1,50 @@
+from autocomplete import PrefixIndex, normalize_key
+
+COURSES = [
+    ("CSCI 1133", 500, ["1133"]),
+    ("CSCI 1133H", 1000, ["1133H"]),
+    ("CSCI 1113", 900, ["1113"]),
+    ("CSCI 4041", 700, ["4041"]),
+    ("MATH 1271", 800, ["1271"]),
+    ("MATH 1133", 5, ["1133"]),
+]
+
+
+def test_normalize_key():
+    assert normalize_key(" csci  11") == "CSCI11"
+    assert normalize_key("Prof. O'Neil") == "PROFONEIL"
+    assert normalize_key("  ") == ""
+
+
+def test_short_prefixes_come_from_the_precomputed_table():
+    index = PrefixIndex.build(COURSES)
+    assert index.complete("") == ["CSCI 1133H", "CSCI 1113", "MATH 1271", "CSCI 4041", "CSCI 1133", "MATH 1133"]
+    assert index.complete("m") == ["MATH 1271", "MATH 1133"]
+    assert index.complete("c", limit=2) == ["CSCI 1133H", "CSCI 1113"]
+    assert index.complete("x") == []
+
+
+def test_longer_prefixes_rank_by_popularity():
+    index = PrefixIndex.build(COURSES)
+    assert index.complete("csci 11") == ["CSCI 1133H", "CSCI 1113", "CSCI 1133"]
+    assert index.complete("CSCI11", limit=1) == ["CSCI 1133H"]
+    assert index.complete("csci 9") == []
+
+
+def test_exact_match_ranks_first():
+    index = PrefixIndex.build(COURSES)
+    assert index.complete("csci 1133") == ["CSCI 1133", "CSCI 1133H"]
+    # Both courses numbered 1133 match their alias exactly; then popularity decides
+    assert index.complete("1133") == ["CSCI 1133", "MATH 1133", "CSCI 1133H"]
+
+
+def test_value_matched_by_several_keys_is_listed_once():
+    index = PrefixIndex.build([("Sam Smith", 10, ["Smith"]), ("Sara Lee", 5, ["Lee"])], precompute_depth=0)
+    assert index.complete("s") == ["Sam Smith", "Sara Lee"]
+    assert index.complete("sa") == ["Sam Smith", "Sara Lee"]
+    assert len(index) == 2
+
+
+def test_duplicate_entries_keep_the_highest_popularity():
+    index = PrefixIndex.build([("CSCI 1133", 1, []), ("CSCI 1113", 5, []), ("CSCI 1133", 10, [])])
+    assert index.complete("csci 11") == ["CSCI 1133", "CSCI 1113"]
@@ -0,0 +1,98 @@
+import pytest
+
+import circuit
+from circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def changes():
+    return []
+
+
+@pytest.fixture
+def breaker(clock, changes):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30.0, on_change=changes.append)
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker, changes):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.is_open
+    assert not breaker.allow()
+    assert changes == [OPEN]
+
+
+def test_success_resets_the_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_fails_fast_until_reset_timeout(breaker, clock):
+    trip(breaker)
+    clock.now += 29.9
+    assert breaker.is_open
+    assert not breaker.allow()
+
+    clock.now += 0.1
+    assert not breaker.is_open
+
+
+def test_half_open_allows_a_single_trial(breaker, clock, changes):
+    trip(breaker)
+    clock.now += 30
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Everyone else keeps failing fast while the trial is out
+    assert not breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+    assert changes == [OPEN, HALF_OPEN, CLOSED]
+
+
+def test_failed_trial_reopens_for_a_full_timeout(breaker, clock, changes):
+    trip(breaker)
+    clock.now += 30
+    assert breaker.allow()
+
+    # One failure is enough in half-open, whatever the threshold
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 1
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert changes == [OPEN, HALF_OPEN, OPEN, HALF_OPEN]
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from discord.ext import commands
+
+import main
+from fake_discord import FakeContext
+from throttle import FairDispatcher
+
+
+@pytest.fixture(autouse=True)
+def fresh_dispatcher(monkeypatch):
+    # Each test runs its own event loop, so it needs its own workers
+    monkeypatch.setattr(main, 'dispatcher', FairDispatcher(workers=2, expensive_limit=4))
+
+
+class _Response:
+    def is_done(self):
+        return True
+
+
+class _Interaction:
+    response = _Response()
+
+
+def slash_context(name):
+    ctx = FakeContext()
+    ctx.interaction = _Interaction()
+    ctx.command = main.bot.get_command(name)
+    ctx.command_failed = False
+    return ctx
+
+
+def test_failed_slash_command_releases_expensive_slot():
+    async def run():
+        for _ in range(main.dispatcher.expensive_limit + 1):
+            ctx = slash_context('full')
+            await main.start_command_timer(ctx)
+            assert main.dispatcher.expensive_running == 1
+
+            # A hybrid slash command that raises skips after_invoke and only reports the error
+            ctx.command_failed = True
+            await main.on_command_error(ctx, commands.CommandInvokeError(RuntimeError("send failed")))
+            assert main.dispatcher.expensive_running == 0
+
+    asyncio.run(run())
+
+
+def test_expensive_slot_released_once_when_both_hooks_run():
+    async def run():
+        ctx = slash_context('pick')
+        await main.start_command_timer(ctx)
+        ctx.command_failed = True
+        # The prefix path runs after_invoke and then the error handler
+        await main.record_command_latency(ctx)
+        await main.on_command_error(ctx, commands.CommandInvokeError(RuntimeError("boom")))
+        assert main.dispatcher.expensive_running == 0
+
+    asyncio.run(run())
+
+
+def test_failed_slash_command_records_metrics():
+    async def run():
+        ctx = slash_context('sections')
+        in_flight = main.metrics.COMMANDS_IN_FLIGHT.get(command='sections')
+        errors = main.metrics.COMMAND_LATENCY.get(command='sections', status="error")['count']
+        await main.start_command_timer(ctx)
+        assert main.metrics.COMMANDS_IN_FLIGHT.get(command='sections') == in_flight + 1
+
+        ctx.command_failed = True
+        await main.on_command_error(ctx, commands.CommandInvokeError(RuntimeError("send failed")))
+        await main.record_command_latency(ctx)
+        assert main.metrics.COMMANDS_IN_FLIGHT.get(command='sections') == in_flight
+        assert main.metrics.COMMAND_LATENCY.get(command='sections', status="error")['count'] == errors + 1
+
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import grade_store
+from grade_store import FrameGrades, SqliteGrades
+
+GRADE_POINTS = {'A': 4.0, 'B': 3.0, 'C': 2.0}
+
+
+def grade_rows():
+    rows = pd.DataFrame({
+        'CAMPUS': ['UMNTC'] * 5 + ['UMNDL'],
+        'SUBJECT': ['CSCI', 'CSCI', 'CSCI', 'CSCI', 'MATH', 'CSCI'],
+        'FULL_NAME': ['CSCI 1133', 'CSCI 1133', 'CSCI 1133', 'CSCI 4041', 'MATH 1271', 'CSCI 1133'],
+        'DESCR': ['Intro to Programming', 'Intro to Programming', 'Intro to Programming', 'Algorithms',
+                  'Calculus I', 'Intro to Programming'],
+        'TERM': ['1229', '1229', '1233', '1229', '1229', '1229'],
+        'CLASS_SECTION': ['001', '001', '002', '001', '001', '001'],
+        'HR_NAME': ['Ada', 'Ada', 'Grace', 'Ada', None, 'Ada'],
+        'CRSE_GRADE_OFF': ['A', 'W', 'B', 'C', 'A', 'B'],
+        'GRADE_HDCNT': [10, 2, 20, 5, 7, 3],
+    })
+    return rows
+
+
+@pytest.fixture
+def backends(tmp_path):
+    frame = grade_rows()
+    frames = {campus: part for campus, part in frame.groupby('CAMPUS')}
+    store = SqliteGrades.build(frame, str(tmp_path / "grades.sqlite3"), "v1", GRADE_POINTS)
+    return FrameGrades(frames, GRADE_POINTS), store
+
+
+def test_backends_agree(backends):
+    frames, store = backends
+    for campus in ('UMNTC', 'UMNDL', 'UMNRO'):
+        for course in ('CSCI 1133', 'CSCI 4041', 'MATH 1271', 'CSCI 9999'):
+            assert sorted(store.instructor_gpas(campus, course)) == sorted(frames.instructor_gpas(campus, course))
+        for subject in ('CSCI', 'MATH'):
+            assert store.subject_courses(campus, subject) == frames.subject_courses(campus, subject)
+        for keyword in ('intro', '1133', 'calc', '%'):
+            assert store.search_courses(campus, keyword) == frames.search_courses(campus, keyword)
+
+
+def test_instructor_gpas(backends):
+    _, store = backends
+    # W doesn't count toward the GPA or the graded students; unnamed rows are left out
+    assert sorted(store.instructor_gpas('UMNTC', 'CSCI 1133')) == [('Ada', 4.0, 10, 1), ('Grace', 3.0, 20, 1)]
+    assert store.instructor_gpas('UMNTC', 'MATH 1271') == []
+
+
+def test_store_holds_only_aggregates(backends):
+    _, store = backends
+    with sqlite3.connect(store.path) as conn:
+        tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert 'grades' not in tables
+    assert {'meta', 'courses', 'course_instructors'} <= tables
+
+
+def test_store_is_reused_only_for_the_same_version_and_format(backends, monkeypatch):
+    _, store = backends
+    assert SqliteGrades.version(store.path) == "v1"
+    monkeypatch.setattr(grade_store, 'FORMAT', grade_store.FORMAT + 1)
+    assert SqliteGrades.version(store.path) is None
+
+    SqliteGrades.build(grade_rows(), store.path, "v1", GRADE_POINTS)
+    assert SqliteGrades.version(store.path) == "v1"
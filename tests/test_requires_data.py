@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import main
+from fake_discord import FakeContext
+
+
+@pytest.fixture(autouse=True)
+def cold_start(monkeypatch):
+    # A fresh, not-yet-loaded bot for each test (events are bound to the test's loop)
+    monkeypatch.setattr(main, 'data_ready', asyncio.Event())
+    monkeypatch.setattr(main, 'data_settled', asyncio.Event())
+    monkeypatch.setattr(main, 'data_error', None)
+    monkeypatch.setattr(main, 'data_version', None)
+
+
+def broken_load(*args, **kwargs):
+    raise FileNotFoundError("CLASS_DATA/FALL2025_cleaned_data.csv")
+
+
+async def check(name):
+    """Run a command's requires_data check the way discord.py does"""
+    ctx = FakeContext()
+    ctx.command = main.bot.get_command(name)
+    for predicate in ctx.command.checks:
+        await predicate(ctx)
+    return ctx
+
+
+def test_failed_load_is_recorded(monkeypatch, capsys):
+    monkeypatch.setattr(main, 'load_data', broken_load)
+    asyncio.run(main.warm_up())
+    assert main.data_settled.is_set()
+    assert not main.data_ready.is_set()
+    assert "FileNotFoundError" in main.data_error
+    assert "Loading grade data failed" in capsys.readouterr().out
+
+
+def test_commands_waiting_on_a_failed_load_get_an_error(monkeypatch):
+    monkeypatch.setattr(main, 'load_data', broken_load)
+
+    async def run():
+        waiting = asyncio.create_task(check('grade'))
+        await asyncio.sleep(0)
+        await main.warm_up()
+        with pytest.raises(main.GradeDataUnavailable, match="couldn't be loaded"):
+            await asyncio.wait_for(waiting, 1)
+
+        # Later commands fail straight away instead of waiting
+        with pytest.raises(main.GradeDataUnavailable):
+            await asyncio.wait_for(check('stats'), 1)
+
+    asyncio.run(run())
+
+
+def test_wait_for_data_is_bounded(monkeypatch):
+    monkeypatch.setattr(main, 'DATA_WAIT_SECONDS', 0.01)
+
+    async def run():
+        with pytest.raises(main.GradeDataUnavailable, match="still loading"):
+            await check('grade')
+
+    asyncio.run(run())
+
+
+def test_waiting_command_runs_once_data_is_ready(monkeypatch):
+    monkeypatch.setattr(main, 'load_data', lambda: None)
+
+    async def run():
+        waiting = asyncio.create_task(check('grade'))
+        await asyncio.sleep(0)
+        await main.warm_up()
+        ctx = await asyncio.wait_for(waiting, 1)
+        assert "Warming up" in ctx.sent[0].content
+
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from section_cube import SectionCube
+
+GRADE_ORDER = ['A', 'B', 'C']
+GRADE_POINTS = {'A': 4.0, 'B': 3.0, 'C': 2.0}
+
+
+def grade_rows(**columns):
+    rows = {
+        'FULL_NAME': ['CSCI 1133'] * 4,
+        'TERM': ['1229', '1229', '1229', '1233'],
+        'CLASS_SECTION': ['001', '001', '002', '001'],
+        'HR_NAME': ['Ada', 'Grace', 'Ada', 'Ada'],
+        'COMPONENT_MAIN': ['LEC'] * 4,
+        'CRSE_GRADE_OFF': ['A', 'A', 'B', 'C'],
+        'GRADE_HDCNT': [10, 10, 10, 10],
+    }
+    rows.update(columns)
+    return pd.DataFrame(rows)
+
+
+def test_co_taught_section_counts_once():
+    cube = SectionCube.build(grade_rows(), GRADE_ORDER, GRADE_POINTS)
+    # One row per instructor, but 1229-001, 1229-002 and 1233-001 are three sections
+    assert len(cube) == 4
+    summary = cube.summary('CSCI 1133')
+    assert summary['sections'] == 3
+    assert summary['components']['LEC']['sections'] == 3
+
+
+def test_build_without_component_column():
+    cube = SectionCube.build(grade_rows().drop(columns=['COMPONENT_MAIN']), GRADE_ORDER, GRADE_POINTS)
+    summary = cube.summary('CSCI 1133')
+    assert summary['sections'] == 3
+    assert summary['components'] == {}
+    assert cube.component(0) is None
+
+
+def test_unknown_course():
+    cube = SectionCube.build(grade_rows(), GRADE_ORDER, GRADE_POINTS)
+    assert cube.rows('MATH 1271') == slice(0, 0)
+    assert cube.summary('MATH 1271') is None
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import snapshot
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "grade_snapshot.bin")
+
+
+def artifacts():
+    return {
+        'UMNTC': {
+            'courses': ["CSCI 1133", "MATH 1271"],
+            'counts': np.arange(24, dtype=np.int32).reshape(2, 12),
+            'gpa': np.array([3.1, 2.9], dtype=np.float64),
+            'modes': np.array([1, 4], dtype=np.int8),
+            'empty': np.zeros((0, 12), dtype=np.int32),
+            'terms': np.array([1229, 1253], dtype=np.int16),
+        },
+        'count': 2,
+        'note': "ok",
+    }
+
+
+def test_round_trip(path):
+    assert snapshot.save(path, "v1", artifacts()) > 0
+    loaded = snapshot.load(path, "v1")
+    expected = artifacts()
+
+    assert loaded['count'] == 2 and loaded['note'] == "ok"
+    assert loaded['UMNTC']['courses'] == expected['UMNTC']['courses']
+    for key in ('counts', 'gpa', 'modes', 'empty', 'terms'):
+        array = loaded['UMNTC'][key]
+        assert array.dtype == expected['UMNTC'][key].dtype
+        np.testing.assert_array_equal(array, expected['UMNTC'][key])
+
+
+def test_arrays_are_aligned_read_only_views(path):
+    snapshot.save(path, "v1", artifacts())
+    counts = snapshot.load(path, "v1")['UMNTC']['counts']
+    assert not counts.flags.writeable
+    assert counts.ctypes.data % snapshot.ALIGN == 0
+
+
+def test_other_version_or_format_is_ignored(path, monkeypatch):
+    snapshot.save(path, "v1", artifacts())
+    assert snapshot.load(path, "v2") is None
+    monkeypatch.setattr(snapshot, 'FORMAT', snapshot.FORMAT + 1)
+    assert snapshot.load(path, "v1") is None
+
+
+def test_missing_or_corrupt_file(path):
+    assert snapshot.load(path, "v1") is None
+
+    with open(path, "wb") as f:
+        f.write(b"not a snapshot")
+    assert snapshot.load(path, "v1") is None
+
+    snapshot.save(path, "v1", artifacts())
+    with open(path, "r+b") as f:
+        f.seek(len(snapshot.MAGIC) + 8)
+        f.write(b"}{")
+    assert snapshot.load(path, "v1") is None
+
+
+def test_empty_or_truncated_file(path):
+    open(path, "wb").close()
+    assert snapshot.load(path, "v1") is None
+
+    size = snapshot.save(path, "v1", artifacts())
+    with open(path, "r+b") as f:
+        f.truncate(size - 40)
+    assert snapshot.load(path, "v1") is None
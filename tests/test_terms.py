@@ -0,0 +1,52 @@
+from datetime import date
+
+import pytest
+
+from terms import active_term, next_term, parse_term, registration_opens, term_code, term_name, upcoming_terms
+
+
+def test_codes_and_names():
+    assert term_code(2026, 9) == "1269"
+    assert term_code(2030, 3) == "1303"
+    assert parse_term("1229") == (2022, 9)
+    assert parse_term(1253) == (2025, 3)
+    assert term_name("1269") == "Fall 2026"
+    assert term_name("1235") == "Summer 2023"
+
+
+def test_next_term_wraps_into_the_next_year():
+    assert next_term("1263") == "1265"
+    assert next_term("1265") == "1269"
+    assert next_term("1269") == "1273"
+    assert next_term("1299") == "1303"
+
+
+@pytest.mark.parametrize("today, code", [
+    (date(2025, 12, 31), "1259"),
+    (date(2026, 1, 1), "1263"),
+    (date(2026, 5, 19), "1263"),
+    (date(2026, 5, 20), "1265"),
+    (date(2026, 8, 24), "1265"),
+    (date(2026, 8, 25), "1269"),
+])
+def test_active_term_boundaries(today, code):
+    assert active_term(today) == code
+
+
+def test_registration_dates():
+    # Spring registration opens the November before
+    assert registration_opens("1273") == date(2026, 11, 1)
+    assert registration_opens("1275") == date(2027, 4, 1)
+    assert registration_opens("1279") == date(2027, 4, 1)
+
+
+@pytest.mark.parametrize("today, codes", [
+    (date(2026, 10, 31), []),
+    (date(2026, 11, 1), ["1273"]),
+    (date(2026, 3, 31), []),
+    # Summer and fall open together, and registration never runs more than two terms ahead
+    (date(2026, 4, 1), ["1265", "1269"]),
+    (date(2026, 6, 1), ["1269"]),
+])
+def test_upcoming_terms(today, codes):
+    assert upcoming_terms(today) == codes
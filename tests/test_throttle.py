@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+import throttle
+from throttle import FairDispatcher, Throttle, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(throttle, 'time', clock)
+    return clock
+
+
+def test_token_bucket_burst_then_refill():
+    bucket = TokenBucket(rate=2.0, capacity=3, now=0.0)
+    assert [bucket.take(0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(0.0) == pytest.approx(0.5)
+    # Half a second buys one token back, and refills never exceed the capacity
+    assert bucket.take(0.5) == 0.0
+    bucket._refill(100.0)
+    assert bucket.tokens == 3
+
+
+def test_user_limit(clock):
+    limits = Throttle(user_rate=1.0, user_burst=2, guild_rate=100.0, guild_burst=100)
+    assert limits.check("ada", "guild") == (0.0, None)
+    assert limits.check("ada", "guild") == (0.0, None)
+    retry_after, scope = limits.check("ada", "guild")
+    assert scope == "user" and retry_after == pytest.approx(1.0)
+    # Other users in the guild aren't affected
+    assert limits.check("grace", "guild") == (0.0, None)
+
+
+def test_guild_limit_refunds_user_token(clock):
+    limits = Throttle(user_rate=0.001, user_burst=1, guild_rate=1.0, guild_burst=1)
+    assert limits.check("ada", "guild") == (0.0, None)
+    assert limits.check("grace", "guild")[1] == "guild"
+    assert limits.users["grace"].tokens == 1
+
+    # Once the guild refills, grace still has the token the rejected command didn't use
+    clock.now += 1.0
+    assert limits.check("grace", "guild") == (0.0, None)
+
+
+def test_direct_messages_skip_guild_limit(clock):
+    limits = Throttle(user_rate=1.0, user_burst=5, guild_rate=1.0, guild_burst=1)
+    assert [limits.check("ada", None) for _ in range(3)] == [(0.0, None)] * 3
+    assert limits.guilds == {}
+
+
+def test_should_warn_once_per_cooldown(clock):
+    limits = Throttle(user_rate=1.0, user_burst=1, guild_rate=1.0, guild_burst=1)
+    assert limits.should_warn("ada", 5.0)
+    assert not limits.should_warn("ada", 5.0)
+    clock.now += 5.0
+    assert limits.should_warn("ada", 5.0)
+
+
+def test_idle_buckets_are_pruned(clock):
+    limits = Throttle(user_rate=1.0, user_burst=1, guild_rate=1.0, guild_burst=1, idle_seconds=60)
+    limits.check("ada", "guild")
+    clock.now += 61
+    limits.check("grace", "other")
+    assert set(limits.users) == {"grace"}
+    assert set(limits.guilds) == {"other"}
+
+
+def record(order, name, gate=None):
+    async def job():
+        order.append(name)
+        if gate is not None:
+            await gate.wait()
+    return job
+
+
+def test_dispatcher_round_robin_across_guilds():
+    async def run():
+        dispatcher = FairDispatcher(workers=1)
+        order = []
+        # Nothing runs until the test yields, so all of these are queued first
+        for name in ("a1", "a2", "a3"):
+            await dispatcher.submit("a", record(order, name))
+        await dispatcher.submit("b", record(order, "b1"))
+        await dispatcher.submit("c", record(order, "c1"))
+        await dispatcher.submit("b", record(order, "b2"))
+        while dispatcher.queued:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return order
+
+    assert asyncio.run(run()) == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+
+def test_dispatcher_rejects_when_guild_queue_is_full():
+    async def run():
+        dispatcher = FairDispatcher(workers=1, max_queue_per_guild=2)
+        order = []
+        assert await dispatcher.submit("a", record(order, "a1")) == 0.0
+        assert await dispatcher.submit("a", record(order, "a2")) == 0.0
+        assert await dispatcher.submit("a", record(order, "a3")) >= 1.0
+        # A different guild has its own queue
+        assert await dispatcher.submit("b", record(order, "b1")) == 0.0
+
+    asyncio.run(run())
+
+
+def test_expensive_head_blocks_its_guild_but_not_others():
+    async def run():
+        dispatcher = FairDispatcher(workers=2, expensive_limit=1)
+        order = []
+        gate = asyncio.Event()
+        await dispatcher.submit("a", record(order, "expensive-1", gate), expensive=True)
+        await dispatcher.submit("a", record(order, "expensive-2"), expensive=True)
+        await dispatcher.submit("a", record(order, "cheap-a"))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert order == ["expensive-1"]
+
+        # Guild a is first in line, but its head can't run, so b gets the idle worker
+        await dispatcher.submit("b", record(order, "cheap-b"))
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        # expensive-2 waits for the only slot, and guild a's cheap job waits behind it
+        assert order == ["expensive-1", "cheap-b"]
+        assert dispatcher.expensive_running == 1
+
+        gate.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert order == ["expensive-1", "cheap-b", "expensive-2", "cheap-a"]
+        assert dispatcher.expensive_running == 0
+
+    asyncio.run(run())
+
+
+def test_acquire_expensive_waits_for_a_slot():
+    async def run():
+        dispatcher = FairDispatcher(workers=1, expensive_limit=1)
+        await dispatcher.acquire_expensive()
+        waiter = asyncio.create_task(dispatcher.acquire_expensive())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await dispatcher.release_expensive()
+        await asyncio.wait_for(waiter, 1)
+        assert dispatcher.expensive_running == 1
+
+    asyncio.run(run())
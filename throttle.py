@@ -0,0 +1,202 @@
+"""
+Command throttling and fair scheduling.
+
+Throttle     per-user and per-guild token buckets; a rejected command gets the
+             number of seconds until a token is available.
+FairDispatcher
+             runs accepted commands on a fixed pool of workers, taking jobs
+             round-robin across guilds so one busy server can't starve the
+             rest, with a tighter concurrency cap for expensive commands.
+"""
+import asyncio
+import time
+from collections import deque
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity, now=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now=None):
+        """Spend a token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class Throttle:
+    def __init__(self, user_rate, user_burst, guild_rate, guild_burst, idle_seconds=600):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.guild_rate = guild_rate
+        self.guild_burst = guild_burst
+        self.idle_seconds = idle_seconds
+        self.users = {}
+        self.guilds = {}
+        self.warned_until = {}
+        self.last_prune = time.monotonic()
+
+    def check(self, user_id, guild_id):
+        """
+        Spend one token from the user's and the guild's bucket.
+        Returns (retry_after, scope): (0, None) when allowed, otherwise the
+        wait in seconds and which limit was hit ('user' or 'guild').
+        """
+        now = time.monotonic()
+        self._prune(now)
+
+        user = self.users.get(user_id)
+        if user is None:
+            user = self.users[user_id] = TokenBucket(self.user_rate, self.user_burst, now)
+        retry_after = user.take(now)
+        if retry_after:
+            return retry_after, "user"
+
+        if guild_id is None:
+            return 0.0, None
+
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            guild = self.guilds[guild_id] = TokenBucket(self.guild_rate, self.guild_burst, now)
+        retry_after = guild.take(now)
+        if retry_after:
+            # The command isn't running, so don't charge the user for it
+            user.refund()
+            return retry_after, "guild"
+
+        return 0.0, None
+
+    def should_warn(self, user_id, retry_after):
+        """Only tell a user they're throttled once per cooldown, so spam doesn't get a reply each time"""
+        now = time.monotonic()
+        if self.warned_until.get(user_id, 0) > now:
+            return False
+        self.warned_until[user_id] = now + retry_after
+        return True
+
+    def _prune(self, now):
+        if now - self.last_prune < self.idle_seconds:
+            return
+        self.last_prune = now
+        for buckets in (self.users, self.guilds):
+            for key in [k for k, b in buckets.items() if now - b.updated > self.idle_seconds]:
+                del buckets[key]
+        for key in [k for k, until in self.warned_until.items() if until < now]:
+            del self.warned_until[key]
+
+
+class FairDispatcher:
+    def __init__(self, workers=16, expensive_limit=4, max_queue_per_guild=25, on_wait=None):
+        self.workers = workers
+        self.expensive_limit = expensive_limit
+        self.max_queue_per_guild = max_queue_per_guild
+        self.on_wait = on_wait
+        self.queues = {}
+        self.ready = deque()
+        self.expensive_running = 0
+        self.avg_job_seconds = 0.5
+        self._wakeup = None
+        self._tasks = []
+
+    @property
+    def queued(self):
+        return sum(len(q) for q in self.queues.values())
+
+    def _ensure_workers(self):
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, guild_key, job, expensive=False):
+        """
+        Queue job (a zero-argument coroutine function) for guild_key.
+        Returns 0 when queued, or a retry-after estimate when the guild's queue is full.
+        """
+        self._ensure_workers()
+        queue = self.queues.get(guild_key)
+        if queue is None:
+            queue = self.queues[guild_key] = deque()
+        if len(queue) >= self.max_queue_per_guild:
+            return max(1.0, len(queue) * self.avg_job_seconds / self.workers)
+
+        async with self._wakeup:
+            queue.append((job, expensive, time.monotonic()))
+            if len(queue) == 1:
+                self.ready.append(guild_key)
+            self._wakeup.notify()
+        return 0.0
+
+    def _next_job(self):
+        """Pop the next runnable job, visiting guilds round-robin"""
+        for _ in range(len(self.ready)):
+            guild_key = self.ready.popleft()
+            queue = self.queues[guild_key]
+            job, expensive, queued_at = queue[0]
+
+            if expensive and self.expensive_running >= self.expensive_limit:
+                # Head of this guild's queue has to wait; give the next guild a turn
+                self.ready.append(guild_key)
+                continue
+
+            queue.popleft()
+            if queue:
+                self.ready.append(guild_key)
+            else:
+                del self.queues[guild_key]
+            if expensive:
+                self.expensive_running += 1
+            return job, expensive, queued_at
+        return None
+
+    async def _worker(self):
+        while True:
+            async with self._wakeup:
+                item = self._next_job()
+                while item is None:
+                    await self._wakeup.wait()
+                    item = self._next_job()
+
+            job, expensive, queued_at = item
+            if self.on_wait:
+                self.on_wait(time.monotonic() - queued_at)
+
+            start = time.monotonic()
+            try:
+                await job()
+            except Exception as e:
+                print(f"Error in dispatched command: {e!r}")
+            finally:
+                if expensive:
+                    self.expensive_running -= 1
+                self.avg_job_seconds = 0.9 * self.avg_job_seconds + 0.1 * (time.monotonic() - start)
+                async with self._wakeup:
+                    # A finished job may have unblocked an expensive one
+                    self._wakeup.notify_all()
+
+    async def acquire_expensive(self):
+        """Wait for an expensive slot outside the queue (used for slash commands)"""
+        self._ensure_workers()
+        async with self._wakeup:
+            await self._wakeup.wait_for(lambda: self.expensive_running < self.expensive_limit)
+            self.expensive_running += 1
+
+    async def release_expensive(self):
+        self.expensive_running -= 1
+        async with self._wakeup:
+            self._wakeup.notify_all()